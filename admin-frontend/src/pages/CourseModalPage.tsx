@@ -26,6 +26,7 @@ import Layout from '../components/Layout';
 import { courseModalApi, uploadApi } from '../services/adminApi';
 
 interface ModalBlock {
+  id?: number;
   type: 'text' | 'image';
   content: string;
   order: number;
@@ -131,7 +132,9 @@ export default function CourseModalPage() {
 
     setSaving(true);
     try {
+      // id сохранённых блоков — сервер обновит только изменённые
       const blocksData = blocks.map((block, index) => ({
+        ...(block.id ? { id: block.id } : {}),
         type: block.type,
         content: block.content,
         order: index,
@@ -20,6 +20,7 @@ def _hdr():
 @router.get("/admin/modules/{module_id}/blocks/")
 async def get_module_blocks(
     module_id: int,
+    fields: Optional[str] = None,
     current_admin: AdminUser = Depends(get_current_admin_user)
 ):
     """Получить все блоки модуля"""
@@ -28,7 +29,8 @@ async def get_module_blocks(
     async with httpx.AsyncClient(base_url=LEARNING_SERVICE_URL, timeout=15.0) as client:
         response = await client.get(
             f"/v1/admin/modules/{module_id}/blocks/",  # оставляем слеш для learning_service
-            headers=_hdr()
+            headers=_hdr(),
+            params={"fields": fields} if fields else None,
         )
         response.raise_for_status()
         return response.json()
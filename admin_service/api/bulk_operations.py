@@ -22,58 +22,30 @@ async def bulk_course_operations(
     if not ids:
         raise HTTPException(status_code=400, detail="Не выбраны курсы")
 
-    async with httpx.AsyncClient(base_url=CATALOG_SERVICE_URL, timeout=20.0) as c:
-        if operation == "delete":
-            results = []
-            for course_id in ids:
-                r = await c.delete(f"/v1/admin/courses/{course_id}", headers=_hdr())
-                results.append({"id": course_id, "success": r.status_code == 200 or r.status_code == 204})
-            return {"operation": "delete", "results": results}
-
-        elif operation == "toggle_free":
-            results = []
-            for course_id in ids:
-                g = await c.get(f"/v1/admin/courses/{course_id}", headers=_hdr())
-                if g.status_code != 200:
-                    results.append({"id": course_id, "success": False})
-                    continue
-                cur = g.json()
-                cur["is_free"] = not cur.get("is_free", False)
-                u = await c.put(f"/v1/admin/courses/{course_id}", headers=_hdr(), json=cur)
-                results.append({"id": course_id, "success": u.status_code == 200, "is_free": cur["is_free"]})
-            return {"operation": "toggle_free", "results": results}
-
-        elif operation == "apply_discount":
-            discount = params.get("discount", 0)
-            if not 0 <= float(discount) <= 100:
-                raise HTTPException(status_code=400, detail="Скидка должна быть от 0 до 100")
-            results = []
-            for course_id in ids:
-                r = await c.patch(
-                    f"/v1/admin/courses/{course_id}/discount/",
-                    headers=_hdr(),
-                    json={"discount": discount}
-                )
-                results.append({"id": course_id, "success": r.status_code == 200})
-            return {"operation": "apply_discount", "discount": discount, "results": results}
+    # Каждая операция — один запрос к каталогу: один statement и одна транзакция на все курсы
+    if operation == "delete":
+        path, payload = "/v1/admin/courses/bulk/delete", {"ids": ids}
+    elif operation == "toggle_free":
+        path, payload = "/v1/admin/courses/bulk/toggle-free", {"ids": ids}
+    elif operation == "apply_discount":
+        discount = params.get("discount", 0)
+        if not 0 <= float(discount) <= 100:
+            raise HTTPException(status_code=400, detail="Скидка должна быть от 0 до 100")
+        path, payload = "/v1/admin/courses/bulk/discount", {"ids": ids, "discount": discount}
+    elif operation == "reorder":
+        start_order = int(params.get("start_order", 0))
+        path = "/v1/admin/courses/reorder"
+        payload = {"items": [{"id": course_id, "order": start_order + i} for i, course_id in enumerate(ids)]}
+    elif operation == "duplicate":
+        raise HTTPException(status_code=501, detail="Дубликат курса не реализован на backend")
+    else:
+        raise HTTPException(status_code=400, detail=f"Неизвестная операция: {operation}")
 
-        elif operation == "reorder":
-            start_order = int(params.get("start_order", 0))
-            results = []
-            for i, course_id in enumerate(ids):
-                r = await c.patch(
-                    f"/v1/admin/courses/{course_id}/order/",
-                    headers=_hdr(),
-                    json={"order": start_order + i}
-                )
-                results.append({"id": course_id, "success": r.status_code == 200, "order": start_order + i})
-            return {"operation": "reorder", "results": results}
-
-        elif operation == "duplicate":
-            raise HTTPException(status_code=501, detail="Дубликат курса не реализован на backend")
-
-        else:
-            raise HTTPException(status_code=400, detail=f"Неизвестная операция: {operation}")
+    async with httpx.AsyncClient(base_url=CATALOG_SERVICE_URL, timeout=20.0) as c:
+        r = await c.post(path, headers=_hdr(), json=payload)
+    if r.status_code != 200:
+        raise HTTPException(status_code=r.status_code, detail=f"Ошибка каталога: {r.text}")
+    return r.json()
 
 @router.post("/modules/")
 async def bulk_module_operations(
@@ -1,5 +1,7 @@
 # admin_service/api/courses.py
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from utils.auth import get_current_admin_user
 from services import catalog_api
@@ -7,8 +9,8 @@ from services import catalog_api
 router = APIRouter(prefix="/admin/courses", tags=["Admin - Courses"])
 
 @router.get("/", dependencies=[Depends(get_current_admin_user)])
-async def list_courses():
-    return await catalog_api.list_courses()
+async def list_courses(fields: Optional[str] = None):
+    return await catalog_api.list_courses({"fields": fields} if fields else None)
 
 @router.get("/{course_id}", dependencies=[Depends(get_current_admin_user)])
 async def get_course(course_id: int):
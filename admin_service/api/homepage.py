@@ -209,15 +209,11 @@ async def reorder_banners(
     """Изменить порядок отображения баннеров"""
     logger.info(f"Admin {current_admin.username} reordering banners")
     
+    # Один запрос: каталог обновляет все баннеры одним UPDATE ... FROM unnest
+    items = [{"id": int(banner_id), "order": int(new_order)} for banner_id, new_order in order_map.items()]
     async with httpx.AsyncClient(base_url=CATALOG_SERVICE_URL, timeout=15.0) as client:
-        # Обновляем порядок для каждого баннера
-        for banner_id, new_order in order_map.items():
-            response = await client.put(
-                f"/v1/admin/banners/{banner_id}",
-                headers=_hdr(),
-                json={"order": new_order}
-            )
-            response.raise_for_status()
+        response = await client.post("/v1/admin/banners/reorder", headers=_hdr(), json={"items": items})
+        response.raise_for_status()
         
         return {"message": "Порядок баннеров обновлен"}
 
@@ -268,6 +264,22 @@ async def add_promo(
         raise HTTPException(status_code=500, detail=f"Ошибка создания промо-изображения: {str(e)}")
 
 
+@router.post("/promos/reorder/")
+async def reorder_promos(
+    order_map: dict = Body(...),  # {promo_id: new_order}
+    current_admin: AdminUser = Depends(get_current_admin_user)
+):
+    """Изменить порядок промо-изображений"""
+    logger.info(f"Admin {current_admin.username} reordering promos")
+    
+    items = [{"id": int(promo_id), "order": int(new_order)} for promo_id, new_order in order_map.items()]
+    async with httpx.AsyncClient(base_url=CATALOG_SERVICE_URL, timeout=15.0) as client:
+        response = await client.post("/v1/admin/promos/reorder", headers=_hdr(), json={"items": items})
+        response.raise_for_status()
+        
+        return {"message": "Порядок промо-изображений обновлен"}
+
+
 @router.put("/promos/{promo_id}", summary="Обновить промо-изображение")
 async def edit_promo(
     promo_id: int,
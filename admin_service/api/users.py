@@ -72,23 +72,29 @@ async def get_users(
             )
             users_data = auth_response.json()
             
-            # Для каждого пользователя получаем количество купленных курсов
-            for user in users_data.get("users", []):
-                user_id = user.get("id")
-                if user_id:
-                    try:
-                        # Получаем статистику курсов пользователя
-                        courses_response = await make_http_request(
-                            client, "GET",
-                            f"{CATALOG_SERVICE_URL}/internal/users/{user_id}/courses-count/"
-                        )
-                        courses_stats = courses_response.json()
-                        user["courses_count"] = courses_stats.get("count", 0)
-                        user["completed_courses"] = courses_stats.get("completed", 0)
-                    except HTTPException:
-                        # Если не удалось получить статистику курсов, ставим 0
-                        user["courses_count"] = 0
-                        user["completed_courses"] = 0
+            # Курсы всей страницы — одним запросом к каталогу
+            users = users_data.get("users", [])
+            user_ids = [user["id"] for user in users if user.get("id")]
+            summary = {}
+            if user_ids:
+                try:
+                    summary_response = await make_http_request(
+                        client, "POST",
+                        f"{CATALOG_SERVICE_URL}/v1/internal/users/courses-summary",
+                        json={"user_ids": user_ids},
+                        headers=_hdr(),
+                    )
+                    summary = summary_response.json().get("users", {})
+                except HTTPException:
+                    # Если не удалось получить статистику курсов, ставим 0
+                    summary = {}
+
+            for user in users:
+                courses_stats = summary.get(str(user.get("id")), {})
+                user["courses_count"] = courses_stats.get("count", 0)
+                user["completed_courses"] = 0
+                user["last_purchased_at"] = courses_stats.get("last_purchased_at")
+                user["course_ids"] = courses_stats.get("course_ids", [])
             
             return users_data
             
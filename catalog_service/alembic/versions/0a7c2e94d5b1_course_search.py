@@ -0,0 +1,46 @@
+# /catalog_service/alembic/versions/0a7c2e94d5b1_course_search.py
+
+"""course search
+
+Revision ID: 0a7c2e94d5b1
+Revises: f1b6d3a85c29
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0a7c2e94d5b1'
+down_revision = 'f1b6d3a85c29'
+branch_labels = None
+depends_on = None
+
+# то же выражение, что models.course.SEARCH_VECTOR_SQL (миграция не импортирует модели)
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(full_description, '')), 'C')"
+)
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # generated-колонка: пересчитывается самой БД при любом UPDATE/INSERT, без триггеров
+    op.add_column(
+        "courses_course",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True)),
+    )
+    op.create_index(
+        "ix_courses_course_search_vector", "courses_course", ["search_vector"], postgresql_using="gin"
+    )
+    # опечатки: :q <% title (word_similarity) по триграммам
+    op.create_index(
+        "ix_courses_course_title_trgm", "courses_course", ["title"],
+        postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+def downgrade():
+    op.drop_index("ix_courses_course_title_trgm", table_name="courses_course")
+    op.drop_index("ix_courses_course_search_vector", table_name="courses_course")
+    op.drop_column("courses_course", "search_vector")
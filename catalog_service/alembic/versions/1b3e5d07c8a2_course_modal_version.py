@@ -0,0 +1,29 @@
+# /catalog_service/alembic/versions/1b3e5d07c8a2_course_modal_version.py
+
+"""course modal version
+
+Revision ID: 1b3e5d07c8a2
+Revises: 0a7c2e94d5b1
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '1b3e5d07c8a2'
+down_revision = '0a7c2e94d5b1'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column(
+        "course_modals",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+    # блоки модалки читаются и диффаются по modal_id
+    op.create_index("ix_course_modal_blocks_modal_id", "course_modal_blocks", ["modal_id"])
+
+def downgrade():
+    op.drop_index("ix_course_modal_blocks_modal_id", table_name="course_modal_blocks")
+    op.drop_column("course_modals", "version")
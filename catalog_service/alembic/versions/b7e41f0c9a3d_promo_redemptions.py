@@ -0,0 +1,31 @@
+# /catalog_service/alembic/versions/b7e41f0c9a3d_promo_redemptions.py
+
+"""promo redemptions log
+
+Revision ID: b7e41f0c9a3d
+Revises: 86c2cc90a1d2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b7e41f0c9a3d'
+down_revision = '86c2cc90a1d2'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "promo_redemptions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("promocode_id", sa.Integer(), sa.ForeignKey("promocodes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=True),
+        sa.Column("redeemed_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.UniqueConstraint("promocode_id", "user_id", name="uq_promo_redemption_user"),
+    )
+
+def downgrade():
+    op.drop_table("promo_redemptions")
@@ -0,0 +1,83 @@
+# /catalog_service/alembic/versions/c4d19a7e2f60_purchase_ledger.py
+
+"""purchase ledger and revenue rollups
+
+Revision ID: c4d19a7e2f60
+Revises: b7e41f0c9a3d
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c4d19a7e2f60'
+down_revision = 'b7e41f0c9a3d'
+branch_labels = None
+depends_on = None
+
+def _rollup(name, period):
+    op.create_table(
+        name,
+        sa.Column(period, sa.Date(), primary_key=True),
+        sa.Column("course_id", sa.Integer(), primary_key=True),
+        sa.Column("currency", sa.String(3), primary_key=True),
+        sa.Column("purchases", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.DECIMAL(14, 2), nullable=False, server_default="0"),
+    )
+
+def upgrade():
+    op.create_table(
+        "purchases",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("course_title", sa.String(255), nullable=False),
+        sa.Column("source", sa.String(20), nullable=False),
+        sa.Column("list_price", sa.DECIMAL(10, 2), nullable=False, server_default="0"),
+        sa.Column("discount_percent", sa.DECIMAL(5, 2), nullable=False, server_default="0"),
+        sa.Column("amount", sa.DECIMAL(10, 2), nullable=False, server_default="0"),
+        sa.Column("currency", sa.String(3), nullable=False),
+        sa.Column("promo_code", sa.String(50), nullable=True),
+        sa.Column("purchased_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_purchases_purchased_at", "purchases", ["purchased_at"])
+    op.create_index("ix_purchases_course_id", "purchases", ["course_id"])
+    _rollup("revenue_daily", "day")
+    _rollup("revenue_monthly", "month")
+
+    # История цен не хранилась: существующие доступы оцениваются по текущей цене курса,
+    # скидка — если покупка попала в её текущее окно. Это приближение, source='backfill'.
+    op.execute("""
+        INSERT INTO purchases (user_id, course_id, course_title, source, list_price, discount_percent,
+                               amount, currency, purchased_at)
+        SELECT a.user_id, a.course_id, c.title, 'backfill',
+               p.list_price, p.discount, round(p.list_price * (100 - p.discount) / 100, 2),
+               'RUB', COALESCE(a.purchased_at, now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        FROM courses_courseaccess a
+        JOIN courses_course c ON c.id = a.course_id
+        CROSS JOIN LATERAL (
+            SELECT CASE WHEN c.is_free THEN 0 ELSE COALESCE(c.price, 0) END AS list_price,
+                   CASE WHEN NOT c.is_free AND c.discount > 0
+                             AND (a.purchased_at AT TIME ZONE 'UTC') >= c.discount_start
+                             AND (a.purchased_at AT TIME ZONE 'UTC') < c.discount_until
+                        THEN c.discount ELSE 0 END AS discount
+        ) p
+    """)
+    op.execute("""
+        INSERT INTO revenue_daily (day, course_id, currency, purchases, revenue)
+        SELECT (purchased_at AT TIME ZONE 'UTC')::date, course_id, currency, count(*), sum(amount)
+        FROM purchases GROUP BY 1, 2, 3
+    """)
+    op.execute("""
+        INSERT INTO revenue_monthly (month, course_id, currency, purchases, revenue)
+        SELECT day - (extract(day FROM day)::int - 1), course_id, currency, sum(purchases), sum(revenue)
+        FROM revenue_daily GROUP BY 1, 2, 3
+    """)
+
+def downgrade():
+    op.drop_table("revenue_monthly")
+    op.drop_table("revenue_daily")
+    op.drop_index("ix_purchases_course_id", table_name="purchases")
+    op.drop_index("ix_purchases_purchased_at", table_name="purchases")
+    op.drop_table("purchases")
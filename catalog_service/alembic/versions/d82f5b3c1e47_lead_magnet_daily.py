@@ -0,0 +1,39 @@
+# /catalog_service/alembic/versions/d82f5b3c1e47_lead_magnet_daily.py
+
+"""lead magnet conversion rollup
+
+Revision ID: d82f5b3c1e47
+Revises: c4d19a7e2f60
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'd82f5b3c1e47'
+down_revision = 'c4d19a7e2f60'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # лиды связки по курсу и времени; апселл ищется по uq_user_course (user_id, course_id)
+    op.create_index("ix_courseaccess_course_purchased", "courses_courseaccess", ["course_id", "purchased_at"])
+    op.add_column("marketing_lead_magnets", sa.Column("stats_refreshed_at", sa.DateTime(), nullable=True))
+    op.create_table(
+        "marketing_lead_magnet_daily",
+        sa.Column(
+            "lead_magnet_id", sa.Integer(),
+            sa.ForeignKey("marketing_lead_magnets.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("leads", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("converted", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("converted_within", postgresql.ARRAY(sa.Integer()), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("marketing_lead_magnet_daily")
+    op.drop_column("marketing_lead_magnets", "stats_refreshed_at")
+    op.drop_index("ix_courseaccess_course_purchased", table_name="courses_courseaccess")
@@ -0,0 +1,49 @@
+# /catalog_service/alembic/versions/e5a0c7d24b18_entitlement_jobs.py
+
+"""bulk entitlement jobs
+
+Revision ID: e5a0c7d24b18
+Revises: d82f5b3c1e47
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e5a0c7d24b18'
+down_revision = 'd82f5b3c1e47'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "entitlement_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("op", sa.String(10), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("phase", sa.String(20), nullable=True),
+        sa.Column("total_rows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("staged_rows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("applied", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("skipped", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("invalid", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True, server_default=sa.text("now()")),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "entitlement_job_rows",
+        sa.Column(
+            "job_id", sa.Integer(), sa.ForeignKey("entitlement_jobs.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("line", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("course_id", sa.Integer(), nullable=True),
+        sa.Column("source", sa.String(50), nullable=True),
+        sa.Column("outcome", sa.String(20), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("entitlement_job_rows")
+    op.drop_table("entitlement_jobs")
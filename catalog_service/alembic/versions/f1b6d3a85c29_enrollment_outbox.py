@@ -0,0 +1,38 @@
+# /catalog_service/alembic/versions/f1b6d3a85c29_enrollment_outbox.py
+
+"""enrollment outbox
+
+Revision ID: f1b6d3a85c29
+Revises: e5a0c7d24b18
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f1b6d3a85c29'
+down_revision = 'e5a0c7d24b18'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "enrollment_outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("event", sa.String(10), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(50), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False, server_default=sa.text("(now() AT TIME ZONE 'utc')")),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+    )
+    # релей читает только неопубликованный хвост
+    op.create_index(
+        "ix_enrollment_outbox_unpublished", "enrollment_outbox", ["id"],
+        postgresql_where=sa.text("published_at IS NULL"),
+    )
+
+def downgrade():
+    op.drop_index("ix_enrollment_outbox_unpublished", table_name="enrollment_outbox")
+    op.drop_table("enrollment_outbox")
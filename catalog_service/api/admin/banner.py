@@ -8,6 +8,9 @@ from typing import List
 from schemas.banner import BannerSchema, BannerCreateSchema, BannerUpdateSchema
 from db.dependencies import get_db_session
 from models.banner import Banner
+from utils.cache import cache
+from schemas.bulk import ReorderSchema
+from services.bulk import reorder, results
 
 router = APIRouter(prefix="/banners")
 
@@ -21,9 +24,17 @@ async def create_banner(data: BannerCreateSchema, db: AsyncSession = Depends(get
     banner = Banner(**data.model_dump())
     db.add(banner)
     await db.commit()
+    await cache.invalidate("banners")
     await db.refresh(banner)
     return {"id": banner.id, "message": "Баннер создан"}
 
+@router.post("/reorder")
+async def reorder_banners(data: ReorderSchema, db: AsyncSession = Depends(get_db_session)):
+    done = await reorder(db, Banner, [(item.id, item.order) for item in data.items])
+    await db.commit()
+    await cache.invalidate("banners")
+    return {"results": results([item.id for item in data.items], done)}
+
 @router.get("/{banner_id}", response_model=BannerSchema)
 async def get_banner(banner_id: int, db: AsyncSession = Depends(get_db_session)):
     result = await db.execute(select(Banner).where(Banner.id == banner_id))
@@ -40,6 +51,7 @@ async def delete_banner(banner_id: int, db: AsyncSession = Depends(get_db_sessio
         raise HTTPException(status_code=404, detail="Баннер не найден")
     await db.delete(banner)
     await db.commit()
+    await cache.invalidate("banners")
     return Response(status_code=204)
 
 @router.put("/{banner_id}", response_model=BannerSchema)
@@ -56,5 +68,6 @@ async def update_banner(banner_id: int, data: BannerUpdateSchema, db: AsyncSessi
         setattr(banner, k, v)
 
     await db.commit()
+    await cache.invalidate("banners")
     await db.refresh(banner)
     return banner
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
 from typing import Optional
 
 from db.dependencies import get_db_session
@@ -14,6 +14,7 @@ from schemas.course_modal import (
     CourseModalSchema,
     CourseModalBlockSchema,
 )
+from utils.cache import cache, course_tag
 
 router = APIRouter(prefix="/course-modals")
 
@@ -47,6 +48,7 @@ async def get_course_modal(course_id: int, db: AsyncSession = Depends(get_db_ses
         id=modal.id,
         course_id=modal.course_id,
         title=modal.title,
+        version=modal.version,
         blocks=[CourseModalBlockSchema.model_validate(block, from_attributes=True) for block in blocks]
     )
 
@@ -90,68 +92,110 @@ async def create_course_modal(
         blocks.append(block)
     
     await db.commit()
+    await cache.invalidate(course_tag(course_id))
     
     return CourseModalSchema(
         id=modal.id,
         course_id=modal.course_id,
         title=modal.title,
+        version=modal.version,
         blocks=[CourseModalBlockSchema.model_validate(block, from_attributes=True) for block in blocks]
     )
 
+def _diff_blocks(existing, incoming):
+    """
+    (updates, inserts, removed_ids). Блоки сопоставляются по id; блок без id, совпадающий
+    с ещё не сопоставленным сохранённым (type, content, order), считается тем же (старые клиенты).
+    """
+    by_id = {b.id: b for b in existing}
+    unmatched = dict(by_id)
+    updates, inserts, pending = [], [], []
+    for data in incoming:
+        values = {"type": data.type, "content": data.content, "order": data.order}
+        old = unmatched.pop(data.id, None) if data.id is not None else None
+        if old is None:
+            pending.append(values)
+        elif (old.type, old.content, old.order) != (data.type, data.content, data.order):
+            updates.append({"id": old.id, **values})
+    for values in pending:
+        same = next(
+            (b for b in unmatched.values() if (b.type, b.content, b.order) == tuple(values.values())), None
+        )
+        if same is not None:
+            unmatched.pop(same.id)
+        else:
+            inserts.append(values)
+    return updates, inserts, list(unmatched)
+
+
 @router.put("/{course_id}", response_model=CourseModalSchema)
 async def update_course_modal(
     course_id: int, 
     data: CourseModalUpdate, 
     db: AsyncSession = Depends(get_db_session)
 ):
-    """Обновить модальное окно курса"""
-    # Получаем существующее модальное окно
+    """Обновить модальное окно курса: блоки — диффом (UPDATE изменённых, INSERT новых, один DELETE)"""
     result = await db.execute(
-        select(CourseModal).where(CourseModal.course_id == course_id)
+        select(CourseModal).where(CourseModal.course_id == course_id).with_for_update()
     )
     modal = result.scalar_one_or_none()
     if not modal:
         raise HTTPException(status_code=404, detail="Модальное окно не найдено")
-    
-    # Обновляем заголовок
-    if data.title is not None:
-        modal.title = data.title
-    
-    # Обновляем блоки
+
+    blocks_result = await db.execute(
+        select(CourseModalBlock)
+        .where(CourseModalBlock.modal_id == modal.id)
+        .order_by(CourseModalBlock.order)
+    )
+    blocks = blocks_result.scalars().all()
+
+    changed = data.title is not None and data.title != modal.title
     if data.blocks is not None:
-        # Удаляем старые блоки
-        old_blocks_result = await db.execute(
-            select(CourseModalBlock).where(CourseModalBlock.modal_id == modal.id)
+        updates, inserts, removed = _diff_blocks(blocks, data.blocks)
+        if removed:
+            await db.execute(delete(CourseModalBlock).where(CourseModalBlock.id.in_(removed)))
+        if updates:
+            # bulk UPDATE по первичному ключу — executemany одним statement'ом
+            await db.execute(update(CourseModalBlock), updates)
+        if inserts:
+            await db.execute(insert(CourseModalBlock), [{"modal_id": modal.id, **v} for v in inserts])
+        changed = changed or bool(updates or inserts or removed)
+
+    if not changed:
+        # ответ собираем до rollback: он экспайрит загруженные объекты даже при expire_on_commit=False
+        unchanged = CourseModalSchema(
+            id=modal.id,
+            course_id=modal.course_id,
+            title=modal.title,
+            version=modal.version,
+            blocks=[CourseModalBlockSchema.model_validate(block, from_attributes=True) for block in blocks]
         )
-        old_blocks = old_blocks_result.scalars().all()
-        for block in old_blocks:
-            await db.delete(block)
-        
-        # Создаем новые блоки
-        for block_data in data.blocks:
-            block = CourseModalBlock(
-                modal_id=modal.id,
-                type=block_data.type,
-                content=block_data.content,
-                order=block_data.order
-            )
-            db.add(block)
-    
+        await db.rollback()  # отпускаем FOR UPDATE
+        return unchanged
+
+    values = {"version": CourseModal.version + 1}
+    if data.title is not None:
+        values["title"] = data.title
+    version = (await db.execute(
+        update(CourseModal).where(CourseModal.id == modal.id).values(**values).returning(CourseModal.version)
+    )).scalar_one()
     await db.commit()
-    await db.refresh(modal)
-    
-    # Получаем обновленные блоки
+    await cache.invalidate(course_tag(course_id))
+
+    # bulk UPDATE не трогает объекты в сессии — перечитываем поверх них
     blocks_result = await db.execute(
         select(CourseModalBlock)
         .where(CourseModalBlock.modal_id == modal.id)
         .order_by(CourseModalBlock.order)
+        .execution_options(populate_existing=True)
     )
     blocks = blocks_result.scalars().all()
-    
+
     return CourseModalSchema(
         id=modal.id,
         course_id=modal.course_id,
-        title=modal.title,
+        title=data.title if data.title is not None else modal.title,
+        version=version,
         blocks=[CourseModalBlockSchema.model_validate(block, from_attributes=True) for block in blocks]
     )
 
@@ -167,5 +211,6 @@ async def delete_course_modal(course_id: int, db: AsyncSession = Depends(get_db_
     
     await db.delete(modal)
     await db.commit()
+    await cache.invalidate(course_tag(course_id))
     
     return Response(status_code=204)
\ No newline at end of file
@@ -1,14 +1,24 @@
 # catalog_service/api/admin/courses.py
 
-from fastapi import APIRouter, Depends, HTTPException, Response, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Body
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import timezone
-from typing import List
+from sqlalchemy.orm import load_only
+from datetime import datetime, timezone
+from typing import List, Optional
 
 from db.dependencies import get_db_session
 from models.course import Course
-from schemas.course import CourseCreate, CourseUpdate
+from schemas.course import AdminCourseListSchema, CourseCreate, CourseUpdate
+from schemas.bulk import BulkIdsSchema, BulkDiscountSchema, ReorderSchema
+from services.access import record_bulk, revoke_course_holders
+from services.enrollment_events import relay
+from services.bulk import delete_many, reorder, results, update_many
+from services.course_list import get_discount_info
+from utils.cache import cache, course_tag
+from utils.fields import columns_for, parse_fields
 
 router = APIRouter(prefix="/courses")
 
@@ -19,10 +29,32 @@ def _norm_aware(dt):
     return dt
 
 
-@router.get("/", summary="Список курсов (админ)")
-async def admin_list_courses(db: AsyncSession = Depends(get_db_session)):
-    res = await db.execute(select(Course).order_by(Course.order.asc()))
-    return res.scalars().all()
+ADMIN_LIST_FIELDS = tuple(AdminCourseListSchema.model_fields)
+_DERIVED = {"is_discount_active": ("discount", "discount_start", "discount_until")}
+
+
+def _list_row(course: Course, fields, now: datetime) -> dict:
+    row = {}
+    for f in fields:
+        if f == "is_discount_active":
+            row[f] = get_discount_info(course, now)[0]
+        else:
+            row[f] = getattr(course, f)
+    return row
+
+
+@router.get("/", response_model=List[AdminCourseListSchema], summary="Список курсов (админ)")
+async def admin_list_courses(
+    fields: Optional[str] = Query(None, description="поля через запятую, например id,title,price"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    # только колонки таблицы: full_description, видео и баннер не читаются
+    selected = parse_fields(fields, ADMIN_LIST_FIELDS)
+    res = await db.execute(
+        select(Course).options(load_only(*columns_for(Course, selected, _DERIVED))).order_by(Course.order.asc())
+    )
+    now = datetime.now(timezone.utc)
+    return JSONResponse(jsonable_encoder([_list_row(c, selected, now) for c in res.scalars()]))
 
 @router.post("/", summary="Создать курс")
 async def admin_create_course(data: CourseCreate, db: AsyncSession = Depends(get_db_session)):
@@ -35,6 +67,7 @@ async def admin_create_course(data: CourseCreate, db: AsyncSession = Depends(get
     course = Course(**data_dict)
     db.add(course)
     await db.commit()
+    await cache.invalidate("courses")
     await db.refresh(course)
     
     # Возвращаем полный объект курса вместо только {id, message}
@@ -60,6 +93,7 @@ async def admin_update_course(course_id: int, data: CourseUpdate, db: AsyncSessi
         setattr(course, k, v)
 
     await db.commit()
+    await cache.invalidate(course_tag(course_id), "courses")
     await db.refresh(course)
     return {"id": course.id, "message": "Курс обновлён"}
 
@@ -69,8 +103,12 @@ async def admin_delete_course(course_id: int, db: AsyncSession = Depends(get_db_
     course = res.scalar_one_or_none()
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
+    holders = await revoke_course_holders(db, [course_id])
     await db.delete(course)
     await db.commit()
+    relay.notify()
+    await record_bulk(holders, "revoke")
+    await cache.invalidate(course_tag(course_id), "courses")
     return Response(status_code=204)
 
 @router.get("/{course_id}", response_model=CourseCreate, summary="Получить курс (админ)")
@@ -91,6 +129,7 @@ async def apply_course_discount(course_id: int, discount: float = Body(..., embe
         raise HTTPException(status_code=400, detail="Скидка должна быть от 0 до 100")
     course.discount = discount
     await db.commit()
+    await cache.invalidate(course_tag(course_id), "courses")
     return {"success": True, "discount": discount}
 
 @router.patch("/{course_id}/order/", summary="Изменить порядок курса")
@@ -101,6 +140,7 @@ async def update_course_order(course_id: int, order: int = Body(..., embed=True)
         raise HTTPException(status_code=404, detail="Курс не найден")
     course.order = order
     await db.commit()
+    await cache.invalidate(course_tag(course_id), "courses")
     return {"success": True, "order": order}
 
 @router.post("/{course_id}/duplicate/", summary="Дублировать курс (метаданные)")
@@ -127,4 +167,41 @@ async def duplicate_course(course_id: int, db: AsyncSession = Depends(get_db_ses
     )
     db.add(new_course)
     await db.commit()
+    await cache.invalidate("courses")
     return {"id": new_course.id, "message": "Курс успешно дублирован"}
+
+# ---------- массовые операции: один statement и одна транзакция на пачку ----------
+
+async def _invalidate_courses(ids) -> None:
+    await cache.invalidate(*(course_tag(i) for i in ids), "courses")
+
+@router.post("/bulk/delete", summary="Удалить курсы")
+async def bulk_delete_courses(data: BulkIdsSchema, db: AsyncSession = Depends(get_db_session)):
+    holders = await revoke_course_holders(db, data.ids)
+    done = await delete_many(db, Course, data.ids)
+    await db.commit()
+    relay.notify()
+    await record_bulk(holders, "revoke")
+    await _invalidate_courses(done)
+    return {"operation": "delete", "results": results(data.ids, done)}
+
+@router.post("/bulk/toggle-free", summary="Переключить бесплатность курсов")
+async def bulk_toggle_free(data: BulkIdsSchema, db: AsyncSession = Depends(get_db_session)):
+    done = await update_many(db, Course, data.ids, {"is_free": ~Course.is_free}, returning=(Course.is_free,))
+    await db.commit()
+    await _invalidate_courses(done)
+    return {"operation": "toggle_free", "results": results(data.ids, done)}
+
+@router.post("/bulk/discount", summary="Применить скидку к курсам")
+async def bulk_apply_discount(data: BulkDiscountSchema, db: AsyncSession = Depends(get_db_session)):
+    done = await update_many(db, Course, data.ids, {"discount": data.discount})
+    await db.commit()
+    await _invalidate_courses(done)
+    return {"operation": "apply_discount", "discount": data.discount, "results": results(data.ids, done)}
+
+@router.post("/reorder", summary="Изменить порядок курсов")
+async def reorder_courses(data: ReorderSchema, db: AsyncSession = Depends(get_db_session)):
+    done = await reorder(db, Course, [(item.id, item.order) for item in data.items])
+    await db.commit()
+    await _invalidate_courses(done)
+    return {"operation": "reorder", "results": results([item.id for item in data.items], done)}
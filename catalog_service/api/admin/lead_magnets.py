@@ -1,5 +1,8 @@
 # catalog_service/api/admin/lead_magnets.py
 
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -8,6 +11,7 @@ from db.dependencies import get_db_session
 from models.lead_magnet import LeadMagnet
 from models.course import Course
 from schemas.lead_magnet import LeadMagnetCreate, LeadMagnetRead
+from services.lead_magnet_stats import calculate_lead_magnet_stats, get_lead_magnet, refresh_lead_magnet
 
 router = APIRouter(prefix="/lead-magnets")
 
@@ -60,4 +64,23 @@ async def delete_lead_magnet(
         raise HTTPException(status_code=404, detail="Связка не найдена")
 
     await session.delete(lead_magnet)
-    await session.commit()
\ No newline at end of file
+    await session.commit()
+
+@router.get("/{lead_magnet_id}/stats", summary="Конверсия связки")
+async def lead_magnet_stats(
+    lead_magnet_id: int,
+    since: Optional[date] = None,   # окно когорт по дате получения лид-курса, [since, until)
+    until: Optional[date] = None,
+    exact: bool = False,            # точные перцентили одним запросом вместо агрегата
+    session: AsyncSession = Depends(get_db_session),
+):
+    return await calculate_lead_magnet_stats(lead_magnet_id, session, since=since, until=until, exact=exact)
+
+@router.post("/{lead_magnet_id}/stats/refresh", summary="Пересчитать агрегат конверсии")
+async def refresh_lead_magnet_stats(
+    lead_magnet_id: int,
+    full: bool = False,
+    session: AsyncSession = Depends(get_db_session),
+):
+    lead_magnet = await get_lead_magnet(session, lead_magnet_id)
+    return {"days": await refresh_lead_magnet(session, lead_magnet, full=full)}
@@ -7,6 +7,9 @@ from sqlalchemy import select
 from db.dependencies import get_db_session
 from models.promo import PromoImage
 from schemas.promo import PromoSchema, PromoCreateSchema, PromoUpdateSchema
+from schemas.bulk import ReorderSchema
+from services.bulk import reorder, results
+from utils.cache import cache
 
 from typing import List
 
@@ -24,9 +27,17 @@ async def create_promo(data: PromoCreateSchema, db: AsyncSession = Depends(get_d
     promo = PromoImage(**data.model_dump())
     db.add(promo)
     await db.commit()
+    await cache.invalidate("promos")
     await db.refresh(promo)
     return {"id": promo.id, "message": "Промо добавлено"}
 
+@router.post("/reorder")
+async def reorder_promos(data: ReorderSchema, db: AsyncSession = Depends(get_db_session)):
+    done = await reorder(db, PromoImage, [(item.id, item.order) for item in data.items])
+    await db.commit()
+    await cache.invalidate("promos")
+    return {"results": results([item.id for item in data.items], done)}
+
 @router.put("/{promo_id}", response_model=PromoSchema)
 async def update_promo(promo_id: int, data: PromoUpdateSchema, db: AsyncSession = Depends(get_db_session)):
     result = await db.execute(select(PromoImage).where(PromoImage.id == promo_id))
@@ -36,6 +47,7 @@ async def update_promo(promo_id: int, data: PromoUpdateSchema, db: AsyncSession
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(promo, k, v)
     await db.commit()
+    await cache.invalidate("promos")
     await db.refresh(promo)
     return promo
 
@@ -50,6 +62,7 @@ async def update_promo(promo_id: int, data: PromoCreateSchema, db: AsyncSession
         setattr(promo, k, v)
 
     await db.commit()
+    await cache.invalidate("promos")
     await db.refresh(promo)
     return promo
 
@@ -61,4 +74,5 @@ async def delete_promo(promo_id: int, db: AsyncSession = Depends(get_db_session)
         raise HTTPException(status_code=404, detail="Промо не найдено")
     await db.delete(promo)
     await db.commit()
+    await cache.invalidate("promos")
     return Response(status_code=204)
\ No newline at end of file
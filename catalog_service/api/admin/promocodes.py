@@ -9,6 +9,7 @@ from pydantic import BaseModel, ConfigDict, Field
 
 from db.dependencies import get_db_session
 from models.promocode import PromoCode
+from services.promocodes import release_shards, shard_remaining
 
 
 router = APIRouter(prefix="/promocodes")
@@ -46,7 +47,13 @@ class PromoCodeResponse(BaseModel):
 @router.get("/", response_model=List[PromoCodeResponse])
 async def list_promocodes(db: AsyncSession = Depends(get_db_session)):
     result = await db.execute(select(PromoCode))
-    return result.scalars().all()
+    promos = result.scalars().all()
+    # у «горячих» кодов остаток лежит в шардах Redis (services/promocodes.py)
+    in_shards = await shard_remaining(p.id for p in promos)
+    return [
+        PromoCodeResponse.model_validate(p).model_copy(update={"uses_left": p.uses_left + in_shards.get(p.id, 0)})
+        for p in promos
+    ]
 
 @router.post("/", response_model=PromoCodeResponse)
 async def create_promocode(data: PromoCodeCreate, db: AsyncSession = Depends(get_db_session)):
@@ -89,6 +96,8 @@ async def create_promocode(data: PromoCodeCreate, db: AsyncSession = Depends(get
 
 @router.put("/{promo_id}", response_model=PromoCodeResponse)
 async def update_promocode(promo_id: int, data: PromoCodeUpdate, db: AsyncSession = Depends(get_db_session)):
+    # правим по данным БД: остаток из шардов возвращается в uses_left, следующее погашение вооружит заново
+    await release_shards(db, promo_id)
     result = await db.execute(select(PromoCode).where(PromoCode.id == promo_id))
     promo = result.scalar_one_or_none()
     if not promo:
@@ -117,5 +126,6 @@ async def delete_promocode(promo_id: int, db: AsyncSession = Depends(get_db_sess
 
     await db.delete(promo)
     await db.commit()
+    await release_shards(db, promo_id)  # строки уже нет — просто очищаем шарды
     return Response(status_code=204)
 
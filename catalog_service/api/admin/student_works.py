@@ -14,6 +14,7 @@ from schemas.student_works import (
     StudentWorksSectionSchema,
     StudentWorkSchema
 )
+from utils.cache import cache, course_tag
 
 router = APIRouter(prefix="/student-works")
 
@@ -96,6 +97,7 @@ async def create_student_works_section(
         works.append(work)
     
     await db.commit()
+    await cache.invalidate(course_tag(course_id))
     
     return StudentWorksSectionSchema(
         id=section.id,
@@ -148,6 +150,7 @@ async def update_student_works_section(
             db.add(work)
     
     await db.commit()
+    await cache.invalidate(course_tag(course_id))
     await db.refresh(section)
     
     # Получаем обновленные работы
@@ -178,5 +181,6 @@ async def delete_student_works_section(course_id: int, db: AsyncSession = Depend
     
     await db.delete(section)
     await db.commit()
+    await cache.invalidate(course_tag(course_id))
     
     return Response(status_code=204)
\ No newline at end of file
@@ -1,6 +1,51 @@
 #catalog_service/health.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from services.enrollment_events import relay
+from services.static_export import exporter
+from utils.admin_auth import AdminAuth
+from utils.cache import cache
+from utils.logging_config import get_logging_stats
+from utils.rate_limit import limiter
+from utils.sql_stats import sql_metrics
+
 router = APIRouter()
 @router.get("/health")
 async def health(): return {"ok": True}
+
+
+@router.get("/metrics/sql", dependencies=[Depends(AdminAuth())])
+async def sql_metrics_snapshot():
+    # агрегаты SqlStatsMiddleware по маршрутам, с момента старта процесса
+    return sql_metrics.snapshot()
+
+
+@router.get("/metrics/logging")
+async def logging_metrics_snapshot():
+    # очередь логов этого процесса: отброшено при переполнении и сэмплингом
+    return get_logging_stats()
+
+
+@router.get("/metrics/cache")
+async def cache_metrics_snapshot():
+    # hit/stale/miss по группам ключей Redis-кэша
+    return cache.metrics.snapshot()
+
+
+@router.get("/metrics/ratelimit")
+async def rate_limit_metrics_snapshot():
+    # решения лимитера этого процесса; rejected_local — отбиты без Redis
+    return limiter.stats
+
+
+@router.get("/metrics/enrollment")
+async def enrollment_relay_metrics_snapshot():
+    # релей outbox этого процесса; отставание групп — /v1/internal/access/enrollment/lag
+    return relay.stats
+
+
+@router.get("/metrics/static-export")
+async def static_export_metrics_snapshot():
+    # экспорты этого процесса; version — последний записанный/прочитанный указатель
+    return exporter.stats
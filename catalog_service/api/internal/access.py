@@ -1,37 +1,114 @@
 # catalog_service/api/internal/access.py
 
 
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from db.dependencies import get_db_session
-from models.course import Course
-from models.access import CourseAccess
+from services.access import has_course, verify_pairs, verify_user_courses
+from services.course_list import get_course_list_document
+from services.enrollment_events import STREAM, ensure_group, lag, read_events, republish_from, set_group_offset
+from utils.cache import cache, pack, unpack
+
+MSGPACK = "application/msgpack"
+MAX_BATCH_PAIRS = 5000
 
 router = APIRouter(prefix="/access")
 
 @router.post("/verify", summary="Проверка доступа")
-async def access_verify(payload: dict = Body(...), db: AsyncSession = Depends(get_db_session)):
+async def access_verify(payload: dict = Body(...)):
     user_id = int(payload.get("user_id"))
     course_id = int(payload.get("course_id"))
 
-    res = await db.execute(select(Course).where(Course.id == course_id))
-    course = res.scalar_one_or_none()
+    # курс и is_free — из кэшированного документа каталога, права — из кэша пользователя
+    doc = await get_course_list_document()
+    course = next((c for c in doc["courses"] if c["id"] == course_id), None)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
 
-    if course.is_free:
+    if course["is_free"]:
         return {"has_access": True}
 
-    acc_res = await db.execute(
-        select(CourseAccess).where(
-            CourseAccess.user_id == user_id,
-            CourseAccess.course_id == course_id
-        )
-    )
-    return {"has_access": acc_res.scalar_one_or_none() is not None}
-
-@router.post("/enrollment/events", summary="Событие доступа (grant|revoke)")
-async def enrollment_event(payload: dict = Body(...)):
-    return {"accepted": True}
+    return {"has_access": await has_course(user_id, course_id)}
+
+async def _read_payload(request: Request) -> dict:
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith(MSGPACK):
+            return unpack(body)
+        return await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Некорректное тело запроса")
+
+
+def _parse_batch(payload) -> tuple:
+    """{"user_id": 1, "course_ids": [..]} или {"pairs": [[user_id, course_id], ..]}."""
+    try:
+        if "pairs" in payload:
+            pairs = list(dict.fromkeys((int(u), int(c)) for u, c in payload["pairs"]))
+            return None, pairs
+        user_id = int(payload["user_id"])
+        course_ids = list(dict.fromkeys(int(c) for c in payload["course_ids"]))
+        return user_id, course_ids
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="Ожидается user_id + course_ids или pairs")
+
+
+@router.post("/verify-batch", summary="Пакетная проверка доступа")
+async def access_verify_batch(request: Request, db: AsyncSession = Depends(get_db_session)):
+    """
+    Ответ: {"access": {user_id: {course_id: true | false | null}}}, null — курса нет.
+    Тело и ответ — JSON или msgpack (Content-Type / Accept: application/msgpack).
+    """
+    user_id, items = _parse_batch(await _read_payload(request))
+    if len(items) > MAX_BATCH_PAIRS:
+        raise HTTPException(status_code=413, detail=f"Не больше {MAX_BATCH_PAIRS} пар за запрос")
+
+    if not items:
+        access = {}
+    elif user_id is not None:
+        access = {user_id: await verify_user_courses(db, user_id, items)}
+    else:
+        access = await verify_pairs(db, items)
+
+    # ключи — строки в обоих форматах: msgpack.unpackb по умолчанию не принимает int-ключи
+    body = {"access": {str(u): {str(c): v for c, v in m.items()} for u, m in access.items()}}
+    if MSGPACK in request.headers.get("accept", ""):
+        return Response(content=pack(body), media_type=MSGPACK)
+    return JSONResponse(body)
+
+
+# ---------- поток событий доступа (services/enrollment_events.py) ----------
+
+def _require_stream():
+    if cache.client is None:
+        raise HTTPException(status_code=503, detail="Поток событий недоступен: нет Redis")
+
+@router.get("/enrollment/events", summary="События доступа (grant|revoke) из потока")
+async def enrollment_events(after: str = "-", count: int = Query(100, ge=1, le=1000)):
+    """Чтение без группы, после id сообщения after (не включая); потребителям — consumer groups."""
+    _require_stream()
+    return {"stream": STREAM, "events": await read_events(after, count)}
+
+@router.post("/enrollment/groups", summary="Создать группу потребителей")
+async def enrollment_create_group(group: str = Body(..., embed=True), start: str = Body("$", embed=True)):
+    _require_stream()
+    return {"stream": STREAM, "group": group, "created": await ensure_group(group, start)}
+
+@router.post("/enrollment/groups/{group}/offset", summary="Повтор для группы с id сообщения")
+async def enrollment_group_offset(group: str, stream_id: str = Body(..., embed=True)):
+    _require_stream()
+    try:
+        await set_group_offset(group, stream_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"group": group, "stream_id": stream_id}
+
+@router.post("/enrollment/republish", summary="Опубликовать заново из outbox")
+async def enrollment_republish(outbox_id: int = Body(..., embed=True), db: AsyncSession = Depends(get_db_session)):
+    return {"requeued": await republish_from(db, outbox_id)}
+
+@router.get("/enrollment/lag", summary="Отставание релея и групп потребителей")
+async def enrollment_lag(db: AsyncSession = Depends(get_db_session)):
+    return await lag(db)
@@ -0,0 +1,13 @@
+# catalog_service/api/internal/dashboard.py
+
+from fastapi import APIRouter, Body, Response
+
+from services.dashboard import invalidate_dashboard
+
+router = APIRouter(prefix="/dashboard")
+
+@router.post("/invalidate", summary="Сбросить dashboard пользователя", status_code=204)
+async def invalidate_user_dashboard(user_id: int = Body(..., embed=True)):
+    """Зовут learning (завершён модуль) и points (изменился баланс)."""
+    await invalidate_dashboard(user_id)
+    return Response(status_code=204)
@@ -0,0 +1,84 @@
+# catalog_service/api/internal/entitlements.py
+
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.dependencies import get_db_session
+from models.entitlement_job import EntitlementJob, EntitlementJobRow
+from services.entitlement_jobs import APPLIED, create_job, spool, start_job
+
+router = APIRouter(prefix="/entitlements")
+
+@router.post("/jobs", summary="Пакетная выдача/отзыв доступов", status_code=202)
+async def create_entitlement_job(request: Request, op: str = Query("grant", pattern="^(grant|revoke)$")):
+    """
+    Тело — CSV (user_id,course_id[,source], заголовок необязателен) или NDJSON
+    ({"user_id": .., "course_id": .., "source": ..} на строку, Content-Type с "json").
+    Ответ 202 сразу после приёма файла; прогресс — GET /jobs/{job_id}.
+    """
+    fmt = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+    try:
+        path, total_rows = await spool(request.stream(), fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if not total_rows:
+        raise HTTPException(status_code=400, detail="Пустой файл")
+
+    job = await create_job(op, total_rows)
+    start_job(job.id, op, path, fmt)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status, "total_rows": total_rows},
+        headers={"Location": f"{request.url.path.rstrip('/')}/{job.id}"},
+    )
+
+@router.get("/jobs/{job_id}", summary="Состояние задания")
+async def get_entitlement_job(job_id: int, db: AsyncSession = Depends(get_db_session)):
+    job = (await db.execute(select(EntitlementJob).where(EntitlementJob.id == job_id))).scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Задание не найдено")
+    return {
+        "job_id": job.id,
+        "op": job.op,
+        "status": job.status,
+        "phase": job.phase,
+        "total_rows": job.total_rows,
+        "staged_rows": job.staged_rows,
+        "progress": round(job.staged_rows / job.total_rows, 4) if job.total_rows else 0.0,
+        APPLIED[job.op]: job.applied,
+        "skipped": job.skipped,
+        "invalid": job.invalid,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+@router.get("/jobs/{job_id}/rows", summary="Итог по строкам задания")
+async def get_entitlement_job_rows(
+    job_id: int,
+    outcome: Optional[str] = None,
+    after: int = Query(0, ge=0, description="номер строки, после которой продолжить"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db_session),
+):
+    query = (
+        select(EntitlementJobRow)
+        .where(EntitlementJobRow.job_id == job_id, EntitlementJobRow.line > after)
+        .order_by(EntitlementJobRow.line)
+        .limit(limit)
+    )
+    if outcome:
+        query = query.where(EntitlementJobRow.outcome == outcome)
+    rows = (await db.execute(query)).scalars().all()
+    return {
+        "rows": [
+            {"line": r.line, "user_id": r.user_id, "course_id": r.course_id, "source": r.source, "outcome": r.outcome}
+            for r in rows
+        ],
+        "next_after": rows[-1].line if len(rows) == limit else None,
+    }
@@ -2,12 +2,13 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, extract
-from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from datetime import date, datetime, timedelta, timezone
 
 from db.dependencies import get_db_session
 from models.course import Course
 from models.access import CourseAccess
+from models.purchase import Purchase, RevenueDaily, RevenueMonthly
 
 router = APIRouter(prefix="/statistics")
 
@@ -20,31 +21,36 @@ async def stats_courses(db: AsyncSession = Depends(get_db_session)):
 
 @router.get("/revenue", summary="Статистика доходов")
 async def stats_revenue(db: AsyncSession = Depends(get_db_session)):
-    res = await db.execute(
-        select(func.sum(func.coalesce(Course.price, 0) * (1 - func.coalesce(Course.discount, 0) / 100)))
-        .select_from(Course.__table__.join(CourseAccess.__table__, Course.id == CourseAccess.course_id))
-        .where(Course.is_free == False)
-    )
-    revenue = res.scalar()
+    # месячный агрегат: строк — курсы × месяцы, а не покупки
+    revenue = (await db.execute(select(func.sum(RevenueMonthly.revenue)))).scalar()
     return {"total": float(revenue) if revenue else 0.0}
 
 @router.get("/revenue-by-month", summary="Доходы по месяцам")
 async def stats_revenue_by_month(months: int = 12, db: AsyncSession = Depends(get_db_session)):
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=months * 30)
+    today = datetime.now(timezone.utc).date()
+    total = today.year * 12 + today.month - 1 - (months - 1)
+    start_month = date(total // 12, total % 12 + 1, 1)
     res = await db.execute(
-        select(
-            extract('year', CourseAccess.purchased_at).label('year'),
-            extract('month', CourseAccess.purchased_at).label('month'),
-            func.sum(func.coalesce(Course.price, 0) * (1 - func.coalesce(Course.discount, 0) / 100)).label('revenue')
-        )
-        .select_from(CourseAccess.__table__.join(Course.__table__, CourseAccess.course_id == Course.id))
-        .where(CourseAccess.purchased_at >= start_date, Course.is_free == False)
-        .group_by(extract('year', CourseAccess.purchased_at), extract('month', CourseAccess.purchased_at))
-        .order_by(extract('year', CourseAccess.purchased_at), extract('month', CourseAccess.purchased_at))
+        select(RevenueMonthly.month, func.sum(RevenueMonthly.revenue))
+        .where(RevenueMonthly.month >= start_month)
+        .group_by(RevenueMonthly.month)
+        .order_by(RevenueMonthly.month)
     )
-    rows = res.all()
-    return [{"month": f"{int(y)}-{int(m):02d}", "revenue": float(r or 0.0)} for y, m, r in rows]
+    return [{"month": m.strftime("%Y-%m"), "revenue": float(r or 0.0)} for m, r in res.all()]
+
+@router.get("/revenue-by-day", summary="Доходы по дням")
+async def stats_revenue_by_day(days: int = 30, db: AsyncSession = Depends(get_db_session)):
+    start_day = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    res = await db.execute(
+        select(RevenueDaily.day, func.sum(RevenueDaily.purchases), func.sum(RevenueDaily.revenue))
+        .where(RevenueDaily.day >= start_day)
+        .group_by(RevenueDaily.day)
+        .order_by(RevenueDaily.day)
+    )
+    return [
+        {"day": d.isoformat(), "purchases": int(n or 0), "revenue": float(r or 0.0)}
+        for d, n, r in res.all()
+    ]
 
 @router.get("/courses/{course_id}", summary="Статистика по курсу")
 async def stats_course(course_id: int, db: AsyncSession = Depends(get_db_session)):
@@ -54,34 +60,35 @@ async def stats_course(course_id: int, db: AsyncSession = Depends(get_db_session
         raise HTTPException(status_code=404, detail="Курс не найден")
 
     enrollments = (await db.execute(select(func.count(CourseAccess.id)).where(CourseAccess.course_id == course_id))).scalar()
-    revenue = 0.0 if course.is_free else float((course.price or 0) * (1 - (course.discount or 0)/100) * (enrollments or 0))
+    revenue = (await db.execute(
+        select(func.sum(RevenueMonthly.revenue)).where(RevenueMonthly.course_id == course_id)
+    )).scalar()
     return {
         "course_id": course_id,
         "title": course.title,
         "enrollments": enrollments or 0,
         "total_modules": 0,
         "average_completion": 0.0,
-        "revenue": revenue,
+        "revenue": float(revenue) if revenue else 0.0,
         "is_free": course.is_free
     }
 
 @router.get("/recent-purchases", summary="Последние покупки")
 async def stats_recent_purchases(limit: int = 10, db: AsyncSession = Depends(get_db_session)):
+    # ix_purchases_purchased_at: index scan backward + limit; сумма — фактически уплаченная
     res = await db.execute(
-        select(CourseAccess.user_id, CourseAccess.purchased_at, Course.title, Course.price, Course.discount)
-        .select_from(CourseAccess.__table__.join(Course.__table__, CourseAccess.course_id == Course.id))
-        .where(Course.is_free == False)
-        .order_by(CourseAccess.purchased_at.desc())
+        select(Purchase.user_id, Purchase.purchased_at, Purchase.course_title, Purchase.amount)
+        .where(Purchase.amount > 0)
+        .order_by(Purchase.purchased_at.desc())
         .limit(limit)
     )
-    rows = res.all()
     return [
         {
             "user_id": r.user_id,
             "purchased_at": r.purchased_at.isoformat(),
-            "course_title": r.title,
-            "amount": float((r.price or 0) * (1 - (r.discount or 0)/100))
-        } for r in rows
+            "course_title": r.course_title,
+            "amount": float(r.amount),
+        } for r in res.all()
     ]
 
 @router.get("/popular-courses", summary="Популярные курсы")
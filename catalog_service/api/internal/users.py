@@ -3,48 +3,73 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from decimal import Decimal
+from typing import List, Optional
 
 from db.dependencies import get_db_session
 from models.course import Course
 from models.access import CourseAccess
+from services.access import get_entitlements, record_grant, record_revoke, summarize_users
+from services.course_list import get_course_list_document
+from services.purchases import record_purchase
+from services.enrollment_events import add_event, relay
 
 router = APIRouter(prefix="/users")
 
+MAX_SUMMARY_USERS = 1000
+
+
+@router.post("/courses-summary", summary="Сводка по курсам для списка пользователей")
+async def get_users_courses_summary(
+    user_ids: List[int] = Body(..., embed=True),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Страница админской таблицы пользователей — один запрос вместо courses-count на каждого."""
+    if len(user_ids) > MAX_SUMMARY_USERS:
+        raise HTTPException(status_code=413, detail=f"Не больше {MAX_SUMMARY_USERS} пользователей за запрос")
+    summary = await summarize_users(db, list(dict.fromkeys(user_ids)))
+    return {"users": {str(user_id): item for user_id, item in summary.items()}}
+
 @router.get("/{user_id}/courses", summary="Курсы пользователя")
-async def get_user_courses(user_id: int, db: AsyncSession = Depends(get_db_session)):
-    res = await db.execute(
-        select(Course.id, Course.title, CourseAccess.purchased_at)
-        .select_from(Course.__table__.join(CourseAccess.__table__, Course.id == CourseAccess.course_id))
-        .where(CourseAccess.user_id == user_id)
-    )
-    items = res.all()
+async def get_user_courses(user_id: int):
+    owned = await get_entitlements(user_id)
+    titles = {c["id"]: c["title"] for c in (await get_course_list_document())["courses"]} if owned else {}
     return {"courses": [
-        {"course_id": c.id, "course_title": c.title, "purchased_at": c.purchased_at.isoformat()} for c in items
+        {"course_id": course_id, "course_title": titles[course_id], "purchased_at": purchased_at}
+        for course_id, purchased_at in owned.items() if course_id in titles
     ]}
 
 @router.get("/{user_id}/courses-count", summary="Кол-во курсов пользователя")
-async def get_user_courses_count(user_id: int, db: AsyncSession = Depends(get_db_session)):
-    res = await db.execute(select(func.count(CourseAccess.id)).where(CourseAccess.user_id == user_id))
-    return {"count": res.scalar()}
+async def get_user_courses_count(user_id: int):
+    return {"count": len(await get_entitlements(user_id))}
 
 # internal/users.py
 @router.post("/{user_id}/grant-access", summary="Выдать доступ")
-async def grant_course_access(user_id: int, course_id: int = Body(..., embed=True), db: AsyncSession = Depends(get_db_session)):
+async def grant_course_access(
+    user_id: int,
+    course_id: int = Body(..., embed=True),
+    amount: Optional[Decimal] = Body(None, embed=True),  # None — текущая цена курса
+    promo_code: Optional[str] = Body(None, embed=True),
+    db: AsyncSession = Depends(get_db_session),
+):
     res = await db.execute(select(Course).where(Course.id == course_id))
-    if not res.scalar_one_or_none():
+    course = res.scalar_one_or_none()
+    if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
 
-    async with db.begin():
-        dup = await db.execute(
-            select(CourseAccess)
-            .where(CourseAccess.user_id == user_id, CourseAccess.course_id == course_id)
-            .with_for_update()
-        )
-        if dup.scalar_one_or_none():
-            raise HTTPException(status_code=409, detail="Доступ уже предоставлен")
-
-        db.add(CourseAccess(user_id=user_id, course_id=course_id))
+    access = CourseAccess(user_id=user_id, course_id=course_id)
+    db.add(access)
+    try:
+        await record_purchase(db, user_id, course, source="grant", amount=amount, promo_code=promo_code)
+        add_event(db, "grant", user_id, course_id, "grant")
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Доступ уже предоставлен")
+    relay.notify()
+    await record_grant(user_id, course_id, access.purchased_at)
     return {"success": True}
 
 
@@ -57,5 +82,8 @@ async def remove_course_access(user_id: int, course_id: int, db: AsyncSession =
     if not access:
         raise HTTPException(status_code=404, detail="Доступ не найден")
     await db.delete(access)
+    add_event(db, "revoke", user_id, course_id, "revoke")
     await db.commit()
+    relay.notify()
+    await record_revoke(user_id, course_id)
     return {"success": True}
@@ -1,16 +1,28 @@
 # catalog_service/api/public/banners.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Request, Response
 from sqlalchemy import select
 from typing import List
 
-from db.dependencies import get_db_session
+from db.init_db import async_session_maker
 from models.banner import Banner
 from schemas.banner import BannerSchema
+from utils.cache import cache, CacheKeys
+from utils.http_cache import conditional
 
 router = APIRouter(prefix="/banners", tags=["Public - Banners"])
 
+
+async def _load_banners() -> list:
+    # своя сессия: загрузчик может выполняться в фоне (stale-while-revalidate)
+    async with async_session_maker() as db:
+        res = await db.execute(select(Banner).order_by(Banner.order.asc()))
+        return [BannerSchema.model_validate(b).model_dump() for b in res.scalars().all()]
+
+
 @router.get("/", response_model=List[BannerSchema], summary="Публичные баннеры")
-async def list_public_banners(db: AsyncSession = Depends(get_db_session)):
-    res = await db.execute(select(Banner).order_by(Banner.order.asc()))
-    return res.scalars().all()
+async def list_public_banners(request: Request, response: Response):
+    validator = await conditional(request, ["banners"])
+    if validator.matches(request):
+        return validator.not_modified()
+    validator.apply(response)
+    return await cache.get_or_set(CacheKeys.banners(), _load_banners, ttl=300, tags=["banners"])
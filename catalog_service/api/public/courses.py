@@ -1,10 +1,11 @@
 # catalog_service/api/public/courses.py
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
-from datetime import datetime, timezone
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 
 from core.config import settings
 from db.dependencies import get_db_session
@@ -12,123 +13,100 @@ from models.course import Course
 from models.access import CourseAccess
 from utils.auth import get_current_user_id
 from utils.rate_limit import limiter
+from utils.cache import course_tag
+from utils.http_cache import conditional
+from utils.fields import parse_fields, project
+from services.access import has_course, record_grant
+from services.course_list import LIST_FIELDS, get_course_list
+from services.course_search import search_courses
+from services.course_page import get_course_page
+from services.purchases import record_purchase
+from services.enrollment_events import add_event, relay
 from schemas.course import (
-    CourseListSchema, CourseDetailSchema, 
+    CourseListSchema, CourseDetailSchema, CoursePageSchema, CourseSearchSchema,
     BuyCourseRequest, BuyCourseResponse,
 )
 
 
 router = APIRouter(prefix="/courses")
 
-def get_discount_info(course: Course):
-    now = datetime.now(timezone.utc)
-    is_active = (
-        course.discount and float(course.discount) > 0 and
-        course.discount_start and course.discount_until and
-        course.discount_start <= now < course.discount_until
-    )
-    ends_in = ((course.discount_until - now).total_seconds() if is_active else None)
-    return is_active, ends_in
-
 @router.get("/", response_model=List[CourseListSchema], summary="Список всех курсов")
-async def list_courses(request: Request, db: AsyncSession = Depends(get_db_session)):
+async def list_courses(
+    request: Request,
+    fields: Optional[str] = Query(None, description="поля через запятую, например id,title,final_price"),
+):
+    selected = parse_fields(fields, LIST_FIELDS)
     # user_id не обязателен для публичного списка
     try:
         user_id = get_current_user_id(request)
     except:
         user_id = None
 
-    # 🔽 вот это добавь перед циклом
-    user_course_ids: set[int] = set()
-    if user_id:
-        res_ids = await db.execute(
-            select(CourseAccess.course_id).where(CourseAccess.user_id == user_id)
-        )
-        user_course_ids = {cid for (cid,) in res_ids.all()}
-
-    result = await db.execute(select(Course).order_by(Course.order.asc()))
-    courses = result.scalars().all()
-    out: List[CourseListSchema] = []
-
-    for course in courses:
-        is_discount_active, _ = get_discount_info(course)
-        final_price = float(course.price or 0.0)
-        if is_discount_active:
-            final_price = final_price * (1 - float(course.discount or 0) / 100)
-
-        # 🔽 и вот так вычисляй доступ
-        has_access = True if course.is_free else (course.id in user_course_ids)
-
-        out.append(CourseListSchema(
-            id=course.id,
-            title=course.title,
-            group_title=course.group_title,
-            short_description=course.short_description,
-            image=course.image,
-            is_free=course.is_free,
-            price=float(course.price or 0.0),
-            discount=float(course.discount or 0.0),
-            final_price=round(final_price, 2),
-            has_access=has_access,
-            button_text="ОТКРЫТЬ",  # как и хотели, всегда "ОТКРЫТЬ" в каталоге
-            order=course.order,
-            is_discount_active=is_discount_active,
-        ))
-    return out
+    validator = await conditional(request, ["courses"], user_id=user_id, personal=True, timed=True)
+    if validator.matches(request):
+        return validator.not_modified()
 
+    # готовый документ из кэша + права пользователя; схема уже соблюдена при сборке
+    courses = await get_course_list(user_id)
+    return validator.apply(JSONResponse(project(courses, selected) if fields else courses))
 
-@router.get("/{course_id}", response_model=CourseDetailSchema, summary="Детали курса")
-async def course_detail(course_id: int, request: Request, db: AsyncSession = Depends(get_db_session)):
+
+@router.get("/search", response_model=CourseSearchSchema, summary="Поиск по курсам")
+async def course_search(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=50),
+):
+    """Полнотекст по названию и описаниям + опечатки в названии; страницы — по next_cursor."""
     try:
         user_id = get_current_user_id(request)
     except:
         user_id = None
 
-    res = await db.execute(select(Course).where(Course.id == course_id))
-    course = res.scalar_one_or_none()
-    if not course:
-        raise HTTPException(status_code=404, detail="Курс не найден")
+    validator = await conditional(request, ["courses"], user_id=user_id, personal=True, timed=True)
+    if validator.matches(request):
+        return validator.not_modified()
 
-    is_discount_active, discount_ends_in = get_discount_info(course)
-    final_price = float(course.price or 0.0)
-    if is_discount_active:
-        final_price = final_price * (1 - float(course.discount or 0) / 100)
+    try:
+        doc = await search_courses(q, cursor, limit, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return validator.apply(JSONResponse({
+        "query": doc["query"], "results": doc["results"], "next_cursor": doc["next_cursor"],
+    }))
 
-    if course.is_free:
-        has_access = True
-    elif user_id:
-        acc_res = await db.execute(
-            select(CourseAccess).where(
-                CourseAccess.user_id == user_id,
-                CourseAccess.course_id == course.id
-            )
-        )
-        has_access = acc_res.scalar_one_or_none() is not None
-    else:
-        has_access = False
-
-    return CourseDetailSchema(
-        id=course.id,
-        title=course.title,
-        full_description=course.full_description,
-        short_description=course.short_description,
-        image=course.image,
-        is_free=course.is_free,
-        price=float(course.price or 0.0),
-        discount=float(course.discount or 0.0),
-        final_price=round(final_price, 2),
-        has_access=has_access,
-        button_text=("ОТКРЫТЬ" if has_access else "ПЕРЕЙТИ К ОПЛАТЕ"),
-        video=course.video,
-        video_preview=course.video_preview,
-        banner_text=course.banner_text,
-        group_title=course.group_title,  
-        banner_color_left=course.banner_color_left,
-        banner_color_right=course.banner_color_right,
-        order=course.order,
-        is_discount_active=is_discount_active,
-        discount_ends_in=discount_ends_in,
-    )
+
+@router.get("/{course_id}/page", response_model=CoursePageSchema, summary="Страница курса целиком")
+async def course_page(course_id: int, request: Request):
+    """Детали курса, модальное окно и работы учеников одним ответом (вместо трёх запросов)."""
+    try:
+        user_id = get_current_user_id(request)
+    except:
+        user_id = None
+
+    validator = await conditional(request, [course_tag(course_id)], user_id=user_id, personal=True, timed=True)
+    if validator.matches(request):
+        return validator.not_modified()
+
+    return validator.apply(JSONResponse(await get_course_page(course_id, user_id)))
+
+
+@router.get("/{course_id}", response_model=CourseDetailSchema, summary="Детали курса")
+async def course_detail(course_id: int, request: Request):
+    try:
+        user_id = get_current_user_id(request)
+    except:
+        user_id = None
+
+    validator = await conditional(request, [course_tag(course_id)], user_id=user_id, personal=True, timed=True)
+    if validator.matches(request):
+        return validator.not_modified()
+
+    # та же статическая часть, что у /page (кэш под тегом курса) + права пользователя
+    page = await get_course_page(course_id, user_id)
+    detail = CourseDetailSchema(**page["course"])
+    return validator.apply(JSONResponse(detail.model_dump(mode="json")))
 
 
 @router.post("/{course_id}/buy/", response_model=BuyCourseResponse, summary="Приобрести курс")
@@ -136,7 +114,7 @@ async def course_detail(course_id: int, request: Request, db: AsyncSession = Dep
 async def buy_course(
     course_id: int,
     request: Request,
-    response: Response,           # ← обязателен для SlowAPI
+    response: Response,           # ← для заголовков X-RateLimit-*
     request_data: BuyCourseRequest,
     db: AsyncSession = Depends(get_db_session),
 ):
@@ -147,17 +125,22 @@ async def buy_course(
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
 
-    acc_res = await db.execute(
-        select(CourseAccess).where(
-            CourseAccess.user_id == user_id,
-            CourseAccess.course_id == course_id
-        )
-    )
-    if acc_res.scalar_one_or_none():
+    if await has_course(user_id, course_id):
         return BuyCourseResponse(success=True, message="Курс уже доступен")
 
-    db.add(CourseAccess(user_id=user_id, course_id=course_id))
-    await db.commit()
+    access = CourseAccess(user_id=user_id, course_id=course_id)
+    db.add(access)
+    try:
+        # autoflush: конфликт uq_user_course может всплыть уже на записи в журнал
+        await record_purchase(db, user_id, course, source="buy")
+        add_event(db, "grant", user_id, course_id, "buy")
+        await db.commit()
+    except IntegrityError:
+        # параллельная покупка успела раньше (uq_user_course)
+        await db.rollback()
+        return BuyCourseResponse(success=True, message="Курс уже доступен")
+    relay.notify()
+    await record_grant(user_id, course_id, access.purchased_at)
 
     return BuyCourseResponse(
         success=True,
@@ -179,11 +162,5 @@ async def check_course_access(course_id: int, request: Request, db: AsyncSession
     if course.is_free:
         return {"has_access": True, "requires_auth": False, "course_type": "free"}
 
-    acc_res = await db.execute(
-        select(CourseAccess).where(
-            CourseAccess.user_id == user_id,
-            CourseAccess.course_id == course_id
-        )
-    )
-    has_access = acc_res.scalar_one_or_none() is not None
+    has_access = await has_course(user_id, course_id)
     return {"has_access": has_access, "requires_auth": False, "course_type": "paid"}
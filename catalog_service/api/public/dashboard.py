@@ -0,0 +1,17 @@
+# catalog_service/api/public/dashboard.py
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from schemas.dashboard import UserDashboardSchema
+from services.dashboard import get_user_dashboard
+from utils.auth import get_current_user_id
+
+router = APIRouter()
+
+@router.get("/dashboard/", response_model=UserDashboardSchema, summary="Dashboard пользователя")
+async def get_dashboard(user_id: int = Depends(get_current_user_id)):
+    """Купленные курсы с прогрессом, сводка и баланс SP одним ответом."""
+    response = JSONResponse(await get_user_dashboard(user_id))
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,24 @@
+# catalog_service/api/public/homepage.py
+
+from fastapi import APIRouter, Request, Response
+
+from services.homepage import homepage
+
+router = APIRouter(prefix="/homepage")
+
+
+@router.get("/", summary="Главная: баннеры и сетка курсов")
+async def homepage_snapshot(request: Request):
+    """Готовый снимок из памяти воркера (services/homepage.py): без БД и Redis."""
+    snapshot = await homepage.get()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "public, no-cache", "Vary": "Accept-Encoding"}
+
+    if snapshot.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=snapshot.gzip, media_type="application/json",
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
@@ -1,6 +1,6 @@
 # catalog_service/api/public/promocodes.py
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
@@ -8,6 +8,8 @@ from datetime import datetime
 
 from db.dependencies import get_db_session
 from models.promocode import PromoCode
+from services.promocodes import redeem, remaining_uses
+from utils.auth import get_current_user_id
 
 router = APIRouter(prefix="/promocodes")
 
@@ -24,7 +26,7 @@ async def check_promocode(
     now = datetime.utcnow()
     if now < promo.valid_from or now > promo.valid_until:
         raise HTTPException(status_code=400, detail="Срок действия промокода истек")
-    if promo.uses_left <= 0:
+    if await remaining_uses(promo) <= 0:
         raise HTTPException(status_code=400, detail="Промокод больше не может быть использован")
     if course_id and promo.applicable_courses and course_id not in promo.applicable_courses:
         raise HTTPException(status_code=400, detail="Промокод не применим к данному курсу")
@@ -32,36 +34,11 @@ async def check_promocode(
 
 @router.post("/use/")
 async def use_promocode(
+    request: Request,
     code: str = Body(..., embed=True),
     course_id: Optional[int] = Body(None, embed=True),
     db: AsyncSession = Depends(get_db_session),
 ):
-
-    async with db.begin():  # открываем транзакцию
-        result = await db.execute(
-            select(PromoCode)
-            .where(PromoCode.code == code, PromoCode.is_active == True)
-            .with_for_update()  # 🔒 блокируем строку до конца транзакции
-        )
-        promo = result.scalar_one_or_none()
-        if not promo:
-            raise HTTPException(status_code=404, detail="Промокод не найден")
-
-        now = datetime.utcnow()
-        if now < promo.valid_from or now > promo.valid_until:
-            raise HTTPException(status_code=400, detail="Срок действия промокода истек")
-
-        if course_id and promo.applicable_courses and course_id not in promo.applicable_courses:
-            raise HTTPException(status_code=400, detail="Промокод не применим к данному курсу")
-
-        if promo.uses_left <= 0:
-            raise HTTPException(status_code=400, detail="Промокод больше не может быть использован")
-
-        promo.uses_left -= 1
-        # commit произойдёт автоматически при выходе из async with
-
-    return {
-        "success": True,
-        "discount_percent": promo.discount_percent,
-        "discount_amount": promo.discount_amount
-    }
\ No newline at end of file
+    # пользователь нужен для журнала погашений: повторный вызов не тратит ещё одно использование
+    user_id = get_current_user_id(request)
+    return await redeem(db, code, user_id, course_id)
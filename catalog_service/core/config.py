@@ -7,10 +7,15 @@ class Settings(BaseSettings):
     FASTAPI_ENV: str = "development"
     DATABASE_URL: str
     JWT_SECRET_KEY: str = "fallback-dev-key"
+    AUTH_CACHE_SIZE: int = 4096
 
     GLOBAL_RATE_LIMIT: str = "30/2minute"
     BUY_COURSE_RATE_LIMIT: str = "3/minute"
     COMPLETE_MODULE_RATE_LIMIT: str = "10/minute"
+    PROMO_SHARDED_CODES: str = ""  # горячие промокоды со счётчиком в Redis: "SALE50,BLACKFRIDAY"
+    PROMO_SHARDS: int = 8
+    CURRENCY: str = "RUB"  # валюта журнала покупок (purchases, revenue_*)
+    RATE_LIMITS: str = ""  # переопределения по маршрутам: "buy_course=3/minute,other=10/hour"
 
     POSTGRES_HOST: str = "db"
     POSTGRES_PORT: str = "5432"
@@ -20,9 +25,41 @@ class Settings(BaseSettings):
 
     INTERNAL_TOKEN: str
     LEARNING_SERVICE_URL: str
+    POINTS_SERVICE_URL: str = "http://pointsservice:8003"
 
     DEBUG: bool = True
 
+    REDIS_URL: str = "redis://redis:6379/0"
+    CACHE_ENABLED: bool = True
+    ENTITLEMENT_TTL: int = 86400  # права пользователя в Redis, секунды
+    CACHE_VERSION_TTL: int = 172800  # ver:{tag} без изменений; не меньше двух ENTITLEMENT_TTL
+    HOMEPAGE_SYNC_SECONDS: int = 60  # сверка снимка главной с Redis (страховка pub/sub)
+    ENROLLMENT_STREAM_MAXLEN: int = 1000000  # ~ длина Redis Stream событий доступа
+    OUTBOX_POLL_SECONDS: float = 1.0
+    LEAD_MAGNET_REFRESH_SECONDS: int = 300  # фоновый пересчёт агрегата конверсии; 0 — только POST .../refresh
+    OUTBOX_RETENTION_DAYS: int = 7  # опубликованные события в enrollment_outbox (для republish)
+    SEARCH_TRGM_THRESHOLD: float = 0.4  # word_similarity для опечаток в названии (pg_trgm)
+    SEARCH_CACHE_TTL: int = 300
+    DASHBOARD_TTL: int = 3600  # сбрасывается событиями, TTL — страховка
+    DASHBOARD_PARTIAL_TTL: int = 30  # если learning/points не ответили
+    DASHBOARD_UPSTREAM_TIMEOUT: float = 2.0
+
+    # статический экспорт каталога в S3 (services/static_export.py); пустой бакет — выключен
+    STATIC_EXPORT_BUCKET: str = ""
+    STATIC_EXPORT_PREFIX: str = "catalog"
+    STATIC_EXPORT_DEBOUNCE_SECONDS: float = 2.0
+    STATIC_EXPORT_POINTER_MAX_AGE: int = 30  # Cache-Control указателя manifest.json
+    S3_ENDPOINT_URL: str = "https://s3.storage.selcloud.ru"
+    S3_ACCESS_KEY: str = ""
+    S3_SECRET_KEY: str = ""
+    S3_REGION: str = "ru-1"
+
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 256
+    LOG_SAMPLE_RATES: str = ""  # "logger.name=0.1,other=0.5"
+
+    SQL_SLOW_STATEMENTS: int = 20  # warning, если запрос сделал больше statement'ов
+
     class Config:
         env_file = ".env"
 
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from core.base import Base
 from core.config import settings
+from utils.sql_stats import instrument_engine
 
 from urllib.parse import urlparse, urlunparse
 
@@ -18,6 +19,7 @@ def get_async_pg_url(url: str) -> str:
 DATABASE_URL = get_async_pg_url(settings.DATABASE_URL)
 engine = create_async_engine(DATABASE_URL, echo=settings.DEBUG)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+instrument_engine(engine)
 
 async def init_db():
     """Создание всех таблиц в БД при старте"""
@@ -6,22 +6,53 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from api.public import courses as public_courses, accounts as public_accounts, promocodes as public_promocodes, extras as public_extras
 from api.admin import courses as admin_courses, lead_magnets as admin_lead_magnets, banner as admin_banner, promo as admin_promo, promocodes as admin_promocodes, course_modal as admin_course_modal, student_works as admin_student_works
-from api.internal import access as internal_access, users as internal_users, statistics as internal_statistics
-from api.public import banners as public_banners
+from api.internal import access as internal_access, users as internal_users, statistics as internal_statistics, entitlements as internal_entitlements, dashboard as internal_dashboard
+from api.public import banners as public_banners, homepage as public_homepage, dashboard as public_dashboard
 from api import health as health_api
 from utils.admin_auth import AdminAuth
+from utils.auth_context import AuthContextMiddleware
+from utils.sql_stats import SqlStatsMiddleware
+from utils.cache import cache
+from services.homepage import homepage
+from services.entitlement_jobs import stop_jobs
+from services.enrollment_events import relay
+from services.static_export import exporter
+from services.promocodes import reconcile_shards
+from services.lead_magnet_stats import refresher as lead_magnet_refresher
+from core.config import settings
+from utils.logging_config import setup_logging
 
 # ⬇️ подключаем лимитер
-from slowapi.errors import RateLimitExceeded
-from utils.rate_limit import limiter, custom_rate_limit_handler
+from utils.rate_limit import custom_rate_limit_handler, RateLimitExceeded
 
 load_dotenv()
+setup_logging()
 app = FastAPI(title="Catalog Service")
 
-# ⬇️ wiring для slowapi
-app.state.limiter = limiter
+# ⬇️ лимитер (Redis, общий для всех воркеров)
 app.add_exception_handler(RateLimitExceeded, custom_rate_limit_handler)
 
+
+@app.on_event("startup")
+async def _startup():
+    await cache.init()
+    await reconcile_shards()
+    await homepage.start()
+    relay.start()
+    exporter.start()
+    lead_magnet_refresher.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await homepage.stop()
+    await stop_jobs()
+    await relay.stop()
+    await exporter.stop()
+    await lead_magnet_refresher.stop()
+    await cache.close()
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,6 +60,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(AuthContextMiddleware)
+app.add_middleware(SqlStatsMiddleware, expose_headers=settings.DEBUG)
 
 # ... остальное без изменений
 
@@ -39,6 +72,8 @@ app.include_router(public_accounts.router,  prefix="/v1/public", tags=["Public -
 app.include_router(public_promocodes.router,prefix="/v1/public", tags=["Public - Promocodes"])
 app.include_router(public_extras.router,    prefix="/v1/public", tags=["Public - Extras"])
 app.include_router(public_banners.router,    prefix="/v1/public", tags=["Public - Banners"])
+app.include_router(public_homepage.router,   prefix="/v1/public", tags=["Public - Homepage"])
+app.include_router(public_dashboard.router,  prefix="/v1/public", tags=["Public - Dashboard"])
 
 # admin (защита INTERNAL_TOKEN)
 deps = [Depends(AdminAuth())]
@@ -54,6 +89,8 @@ app.include_router(admin_student_works.router,prefix="/v1/admin", tags=["Admin -
 app.include_router(internal_access.router,     prefix="/v1/internal", tags=["Internal - Access"])
 app.include_router(internal_users.router,      prefix="/v1/internal", tags=["Internal - Users"])
 app.include_router(internal_statistics.router, prefix="/v1/internal", tags=["Internal - Statistics"])
+app.include_router(internal_entitlements.router, prefix="/v1/internal", tags=["Internal - Entitlements"])
+app.include_router(internal_dashboard.router,  prefix="/v1/internal", tags=["Internal - Dashboard"])
 
 # health
 app.include_router(health_api.router, tags=["Health"])
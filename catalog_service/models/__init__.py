@@ -1,7 +1,10 @@
 from .access import CourseAccess
 from .banner import Banner
 from .promo import PromoImage
-from .promocode import PromoCode
+from .promocode import PromoCode, PromoRedemption
 from .course_modal import CourseModal
 from .student_works import StudentWorksSection, StudentWork
-from .lead_magnet import LeadMagnet
+from .lead_magnet import LeadMagnet, LeadMagnetDaily
+from .purchase import Purchase, RevenueDaily, RevenueMonthly
+from .entitlement_job import EntitlementJob, EntitlementJobRow
+from .enrollment_outbox import EnrollmentOutbox
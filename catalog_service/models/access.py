@@ -1,6 +1,6 @@
 # catalog_service/models/access.py
 
-from sqlalchemy import UniqueConstraint, Column, Integer, ForeignKey, DateTime
+from sqlalchemy import UniqueConstraint, Index, Column, Integer, ForeignKey, DateTime
 from datetime import datetime
 
 from core.base import Base
@@ -13,4 +13,7 @@ class CourseAccess(Base):
     course_id = Column(Integer, ForeignKey("courses_course.id", ondelete="CASCADE"), nullable=False)
     purchased_at = Column(DateTime, default=datetime.utcnow)
 
-    __table_args__ = (UniqueConstraint("user_id", "course_id", name="uq_user_course"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_user_course"),
+        Index("ix_courseaccess_course_purchased", "course_id", "purchased_at"),
+    )
@@ -1,11 +1,21 @@
 # catalog_service/models/course.py
 
 from sqlalchemy import Column, Integer, String, Text, Boolean, DECIMAL
-from sqlalchemy import DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Computed, DateTime, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from core.base import Base
 
+# поиск (services/course_search.py): title — A, short_description — B, full_description — C.
+# Смена конфигурации — только новой миграцией: выражение generated-колонки живёт в схеме БД.
+SEARCH_CONFIG = "russian"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(short_description, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(full_description, '')), 'C')"
+)
+
 class Course(Base):
     __tablename__ = "courses_course"
 
@@ -32,6 +42,14 @@ class Course(Base):
     
     
     group_title = Column(String(100), nullable=True)
+
+    # считает сама БД; deferred — в обычные SELECT курса не попадает
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+    __table_args__ = (
+        Index("ix_courses_course_search_vector", "search_vector", postgresql_using="gin"),
+        # триграммный индекс по title (pg_trgm) — только в миграции 0a7c2e94d5b1
+    )
     
     modal = relationship(
         "CourseModal",
@@ -11,6 +11,7 @@ class CourseModal(Base):
     id = Column(Integer, primary_key=True)
     course_id = Column(Integer, ForeignKey("courses_course.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # +1 на каждое реальное изменение
 
     course = relationship("Course", back_populates="modal")   # ← было backref="modals"
 
@@ -18,7 +19,7 @@ class CourseModalBlock(Base):
     __tablename__ = "course_modal_blocks"
 
     id = Column(Integer, primary_key=True)
-    modal_id = Column(Integer, ForeignKey("course_modals.id", ondelete="CASCADE"), nullable=False)
+    modal_id = Column(Integer, ForeignKey("course_modals.id", ondelete="CASCADE"), nullable=False, index=True)
     type = Column(String(20), nullable=False)
     content = Column(Text, nullable=False)
     order = Column(Integer, default=0)
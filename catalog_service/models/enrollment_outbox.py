@@ -0,0 +1,22 @@
+# catalog_service/models/enrollment_outbox.py
+
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index, text
+from datetime import datetime
+
+from core.base import Base
+
+class EnrollmentOutbox(Base):
+    """События выдачи/отзыва доступа; пишутся в транзакции с CourseAccess, публикует services/enrollment_events.py."""
+    __tablename__ = "enrollment_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    event = Column(String(10), nullable=False)  # grant | revoke
+    user_id = Column(Integer, nullable=False)
+    course_id = Column(Integer, nullable=False)
+    source = Column(String(50), nullable=True)  # buy | grant | revoke | bulk:<job_id> | course_delete
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    published_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_enrollment_outbox_unpublished", "id", postgresql_where=text("published_at IS NULL")),
+    )
@@ -0,0 +1,36 @@
+# catalog_service/models/entitlement_job.py
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+
+from core.base import Base
+
+class EntitlementJob(Base):
+    """Пакетная выдача/отзыв доступов (services/entitlement_jobs.py)."""
+    __tablename__ = "entitlement_jobs"
+
+    id = Column(Integer, primary_key=True)
+    op = Column(String(10), nullable=False)  # grant | revoke
+    status = Column(String(20), nullable=False, default="pending")  # pending | running | done | failed
+    phase = Column(String(20), nullable=True)  # staging | merging | cache
+    total_rows = Column(Integer, nullable=False, default=0)
+    staged_rows = Column(Integer, nullable=False, default=0)
+    applied = Column(Integer, nullable=False, default=0)  # выдано / отозвано
+    skipped = Column(Integer, nullable=False, default=0)  # уже был / не было / повтор в файле
+    invalid = Column(Integer, nullable=False, default=0)  # не разобрана строка или нет курса
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class EntitlementJobRow(Base):
+    """Итог по каждой строке входного файла; line — номер строки (с 1)."""
+    __tablename__ = "entitlement_job_rows"
+
+    job_id = Column(Integer, ForeignKey("entitlement_jobs.id", ondelete="CASCADE"), primary_key=True)
+    line = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    course_id = Column(Integer, nullable=True)
+    source = Column(String(50), nullable=True)
+    # granted | already_granted | revoked | not_granted | duplicate | course_not_found | invalid
+    outcome = Column(String(20), nullable=False)
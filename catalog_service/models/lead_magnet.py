@@ -1,6 +1,7 @@
 # catalog_service/models/lead_magnet.py
 
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, Date, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 
 from core.base import Base
@@ -15,6 +16,19 @@ class LeadMagnet(Base):
     title = Column(String, nullable=False)
     lead_course_id = Column(Integer, ForeignKey("courses_course.id", ondelete="CASCADE"), nullable=False)
     upsell_course_id = Column(Integer, ForeignKey("courses_course.id", ondelete="CASCADE"), nullable=False)
+    stats_refreshed_at = Column(DateTime, nullable=True)  # водяной знак инкрементального пересчёта
 
     lead_course = relationship("Course", foreign_keys=[lead_course_id])
     upsell_course = relationship("Course", foreign_keys=[upsell_course_id])
+
+
+class LeadMagnetDaily(Base):
+    """Когорта связки за день получения лид-курса (UTC); пересчитывает services/lead_magnet_stats.py."""
+    __tablename__ = "marketing_lead_magnet_daily"
+
+    lead_magnet_id = Column(Integer, ForeignKey("marketing_lead_magnets.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    leads = Column(Integer, nullable=False, default=0)
+    converted = Column(Integer, nullable=False, default=0)
+    # converted_within[i] — купили апселл не позже TTC_BOUNDS_HOURS[i] часов после лид-курса
+    converted_within = Column(ARRAY(Integer), nullable=False)
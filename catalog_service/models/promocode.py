@@ -1,6 +1,6 @@
 # catalog_service/models/promocode.py
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, ForeignKey, UniqueConstraint
 from datetime import datetime
 
 from core.base import Base
@@ -17,4 +17,17 @@ class PromoCode(Base):
     valid_from = Column(DateTime, default=datetime.utcnow)
     valid_until = Column(DateTime, nullable=False)
     is_active = Column(Boolean, default=True)
-    applicable_courses = Column(JSON, default=list)
\ No newline at end of file
+    applicable_courses = Column(JSON, default=list)
+
+
+class PromoRedemption(Base):
+    """Журнал погашений: одна строка на (промокод, пользователь) — повторный /use идемпотентен."""
+    __tablename__ = "promo_redemptions"
+
+    id = Column(Integer, primary_key=True)
+    promocode_id = Column(Integer, ForeignKey("promocodes.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    course_id = Column(Integer, nullable=True)
+    redeemed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (UniqueConstraint("promocode_id", "user_id", name="uq_promo_redemption_user"),)
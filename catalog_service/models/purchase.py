@@ -0,0 +1,49 @@
+# catalog_service/models/purchase.py
+
+from sqlalchemy import Column, Integer, String, DateTime, Date, DECIMAL, Index
+from datetime import datetime, timezone
+
+from core.base import Base
+
+class Purchase(Base):
+    """Журнал покупок: сколько заплачено в момент покупки (цена курса потом может измениться)."""
+    __tablename__ = "purchases"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    course_id = Column(Integer, nullable=False)  # без FK: история переживает удаление курса
+    course_title = Column(String(255), nullable=False)
+    source = Column(String(20), nullable=False)  # buy | grant | bulk | backfill
+    list_price = Column(DECIMAL(10, 2), nullable=False, default=0)
+    discount_percent = Column(DECIMAL(5, 2), nullable=False, default=0)
+    amount = Column(DECIMAL(10, 2), nullable=False, default=0)
+    currency = Column(String(3), nullable=False)
+    promo_code = Column(String(50), nullable=True)
+    purchased_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_purchases_purchased_at", "purchased_at"),
+        Index("ix_purchases_course_id", "course_id"),
+    )
+
+
+class RevenueDaily(Base):
+    """Агрегат по дням (UTC); обновляется в той же транзакции, что и запись в purchases."""
+    __tablename__ = "revenue_daily"
+
+    day = Column(Date, primary_key=True)
+    course_id = Column(Integer, primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    purchases = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class RevenueMonthly(Base):
+    """Агрегат по месяцам; month — первое число месяца."""
+    __tablename__ = "revenue_monthly"
+
+    month = Column(Date, primary_key=True)
+    course_id = Column(Integer, primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    purchases = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
@@ -0,0 +1,19 @@
+# catalog_service/schemas/bulk.py
+
+from pydantic import BaseModel, Field
+from typing import List
+
+MAX_BULK_IDS = 1000
+
+class BulkIdsSchema(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+
+class BulkDiscountSchema(BulkIdsSchema):
+    discount: float = Field(..., ge=0, le=100)
+
+class ReorderItemSchema(BaseModel):
+    id: int
+    order: int
+
+class ReorderSchema(BaseModel):
+    items: List[ReorderItemSchema] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
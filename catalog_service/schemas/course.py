@@ -1,7 +1,7 @@
 # catalog_service/schemas/course.py
 
 from pydantic import BaseModel, ConfigDict, field_validator, ValidationInfo
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -31,6 +31,18 @@ class CourseListSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CourseSearchItemSchema(CourseListSchema):
+    score: float
+    title_highlight: str  # совпадения в <b>…</b>
+    snippet: str
+
+
+class CourseSearchSchema(BaseModel):
+    query: str
+    results: List[CourseSearchItemSchema]
+    next_cursor: Optional[str] = None  # передать в ?cursor= за следующей страницей
+
+
 class CourseDetailSchema(BaseModel):
     id: int
     title: str
@@ -61,6 +73,13 @@ class CourseDetailSchema(BaseModel):
 
 
 
+class CoursePageSchema(BaseModel):
+    """Страница курса: детали + модальное окно + работы учеников."""
+    version: str
+    course: CourseDetailSchema
+    modal: Optional[dict] = None
+    student_works: Optional[dict] = None
+
 
 class CourseAccessSchema(BaseModel):
     has_access: bool
@@ -154,4 +173,19 @@ class CourseUpdate(BaseModel):
         ds = info.data.get("discount_start")
         if ds and v and v <= ds:
             raise ValueError("Окончание скидки не может быть раньше начала")
-        return v
\ No newline at end of file
+        return v
+
+class AdminCourseListSchema(BaseModel):
+    """Строка таблицы курсов в админке; полная карточка — GET /v1/admin/courses/{id}."""
+    id: int
+    title: str
+    short_description: Optional[str] = None
+    image: Optional[str] = None
+    is_free: bool = False
+    price: Optional[float] = None
+    discount: Optional[float] = None
+    discount_start: Optional[datetime] = None
+    discount_until: Optional[datetime] = None
+    is_discount_active: bool = False
+    order: Optional[int] = 0
+    group_title: Optional[str] = None
@@ -6,6 +6,7 @@ from typing import List, Optional
 
 
 class CourseModalBlockCreate(BaseModel):
+    id: Optional[int] = None  # id сохранённого блока: PUT обновит его, а не пересоздаст
     type: str  # 'text' или 'image'
     content: str
     order: int = 0
@@ -32,6 +33,7 @@ class CourseModalSchema(BaseModel):
     id: int
     course_id: int
     title: str
+    version: int = 1
     blocks: List[CourseModalBlockSchema]
     
     model_config = ConfigDict(from_attributes=True)
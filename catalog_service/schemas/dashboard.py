@@ -9,9 +9,11 @@ class UserCourseSchema(BaseModel):
     course_id: int
     course_title: str
     image: Optional[str] = None
-    purchased_at: datetime
+    purchased_at: Optional[datetime] = None
     progress_percent: float
     is_completed: bool
+    total_modules: int = 0
+    completed_modules: int = 0
     
     class Config:
         # Добавить для всех datetime полей
@@ -31,6 +33,8 @@ class UserDashboardSchema(BaseModel):
     user_id: int
     stats: UserStatsSchema
     courses: List[UserCourseSchema]
+    points_balance: Optional[int] = None
+    partial: bool = False  # learning или points не ответили — прогресс/баланс неполные
 
     class Config:
         json_encoders = {
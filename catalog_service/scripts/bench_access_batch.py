@@ -0,0 +1,116 @@
+# catalog_service/scripts/bench_access_batch.py
+
+"""
+Пропускная способность проверки доступа, пар в секунду.
+
+per-pair:  как /internal/access/verify до кэша — два запроса на пару (курс, затем доступ).
+pairs:     verify_pairs — unnest(user_ids, course_ids) + LEFT JOIN, один запрос на пачку.
+one-user:  verify_user_courses — course_id = ANY(:ids), один запрос на пачку.
+--url:     то же через HTTP (POST /v1/internal/access/verify-batch), JSON и msgpack.
+
+Пары берутся из courses_courseaccess вперемешку со случайными (user, course),
+чтобы в выборке были и «есть доступ», и «нет доступа».
+
+Запуск: PYTHONPATH=. python scripts/bench_access_batch.py [--batch 500] [--rounds 20] [--url http://localhost:8000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from db.init_db import async_session_maker, engine
+from models.access import CourseAccess
+from models.course import Course
+from services.access import verify_pairs, verify_user_courses
+from utils.cache import pack, unpack
+
+
+async def _sample_pairs(db, n: int):
+    owned = (await db.execute(
+        select(CourseAccess.user_id, CourseAccess.course_id).order_by(func.random()).limit(n // 2)
+    )).all()
+    course_ids = (await db.execute(select(Course.id))).scalars().all() or [1]
+    user_ids = [u for u, _ in owned] or [1]
+    pairs = [(u, c) for u, c in owned]
+    while len(pairs) < n:
+        pairs.append((random.choice(user_ids), random.choice(course_ids)))
+    random.shuffle(pairs)
+    return list(dict.fromkeys(pairs))
+
+
+async def _per_pair(db, pairs):
+    for user_id, course_id in pairs:
+        course = (await db.execute(select(Course).where(Course.id == course_id))).scalar_one_or_none()
+        if course is None or course.is_free:
+            continue
+        await db.execute(
+            select(CourseAccess).where(CourseAccess.user_id == user_id, CourseAccess.course_id == course_id)
+        )
+
+
+async def _timed(label: str, fn, pairs_per_round: int, rounds: int):
+    await fn()  # прогрев
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await fn()
+    elapsed = time.perf_counter() - start
+    rate = pairs_per_round * rounds / elapsed
+    print(f"{label:<16} {rate:12.0f} pairs/s   {elapsed / rounds * 1000:8.2f} ms/batch")
+    return rate
+
+
+async def bench_db(args):
+    async with async_session_maker() as db:
+        pairs = await _sample_pairs(db, args.batch)
+        user_id = pairs[0][0]
+        course_ids = list(dict.fromkeys(c for _, c in pairs))
+        print(f"batch: {len(pairs)} pairs, one-user batch: {len(course_ids)} courses, rounds: {args.rounds}")
+
+        # per-pair медленный — гоняем меньше раундов, пары/с от этого не зависят
+        base = await _timed("per-pair", lambda: _per_pair(db, pairs), len(pairs), max(1, args.rounds // 10))
+        batch = await _timed("pairs", lambda: verify_pairs(db, pairs), len(pairs), args.rounds)
+        await _timed("one-user", lambda: verify_user_courses(db, user_id, course_ids), len(course_ids), args.rounds)
+        print(f"speedup (pairs vs per-pair): {batch / base:.1f}x")
+    return pairs
+
+
+async def bench_http(args, pairs):
+    url = args.url.rstrip("/") + "/v1/internal/access/verify-batch"
+    payload = {"pairs": [list(p) for p in pairs]}
+    async with httpx.AsyncClient(timeout=30) as client:
+        async def as_json():
+            r = await client.post(url, json=payload)
+            r.raise_for_status()
+            r.json()
+
+        async def as_msgpack():
+            r = await client.post(
+                url, content=pack(payload),
+                headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+            )
+            r.raise_for_status()
+            unpack(r.content)
+
+        await _timed("http json", as_json, len(pairs), args.rounds)
+        await _timed("http msgpack", as_msgpack, len(pairs), args.rounds)
+
+
+async def main(args):
+    try:
+        pairs = await bench_db(args)
+        if args.url:
+            await bench_http(args, pairs)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--batch", type=int, default=500)
+    p.add_argument("--rounds", type=int, default=20)
+    p.add_argument("--url", help="адрес запущенного catalog_service для HTTP-замера")
+    asyncio.run(main(p.parse_args()))
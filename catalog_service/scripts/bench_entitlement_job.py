@@ -0,0 +1,101 @@
+# catalog_service/scripts/bench_entitlement_job.py
+
+"""
+Пакетная выдача доступов: --rows строк CSV (по умолчанию 300k) через задание и отзыв тем же файлом.
+
+Пользователи — заведомо несуществующие id, курсы — существующие из courses_course;
+в файл подмешаны повторы (--dup) и мусорные строки (--bad), чтобы проверить итоги по строкам.
+Печатаются время до done, строк/с и счётчики; в конце то же задание с op=revoke
+убирает созданные доступы (журнал покупок source='bulk' остаётся — это бенчмарк).
+
+Без --url — задания запускаются прямо в процессе (services.entitlement_jobs),
+с --url — через POST /v1/internal/entitlements/jobs и опрос GET /jobs/{id}.
+
+Запуск: PYTHONPATH=. python scripts/bench_entitlement_job.py [--rows 300000] [--url http://localhost:8000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from sqlalchemy import select
+
+from db.init_db import async_session_maker, engine
+from models.course import Course
+from models.entitlement_job import EntitlementJob
+from services.entitlement_jobs import create_job, run_job, spool
+from utils.cache import cache
+
+USER_BASE = 700_000_000  # заведомо несуществующие user_id
+
+
+def _make_csv(rows: int, course_ids, dup: float, bad: float) -> bytes:
+    lines = ["user_id,course_id,source"]
+    for i in range(rows):
+        r = random.random()
+        if r < bad:
+            lines.append("oops,not-a-number")
+        elif r < bad + dup and i:
+            lines.append(lines[-1])
+        else:
+            lines.append(f"{USER_BASE + i},{random.choice(course_ids)},bench")
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def _chunks(body: bytes, size: int = 1 << 16):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+async def _job_local(op: str, body: bytes) -> dict:
+    path, total = await spool(_chunks(body), "csv")
+    job = await create_job(op, total)
+    await run_job(job.id, op, path, "csv")
+    async with async_session_maker() as db:
+        job = (await db.execute(select(EntitlementJob).where(EntitlementJob.id == job.id))).scalar_one()
+        return {k: getattr(job, k) for k in ("id", "status", "total_rows", "applied", "skipped", "invalid", "error")}
+
+
+async def _job_http(url: str, op: str, body: bytes) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=60.0) as client:
+        r = await client.post("/v1/internal/entitlements/jobs", params={"op": op}, content=body,
+                              headers={"Content-Type": "text/csv"})
+        r.raise_for_status()
+        job_id = r.json()["job_id"]
+        while True:
+            state = (await client.get(f"/v1/internal/entitlements/jobs/{job_id}")).json()
+            if state["status"] in ("done", "failed"):
+                return state
+            await asyncio.sleep(0.2)
+
+
+async def main(args) -> None:
+    await cache.init()
+    try:
+        async with async_session_maker() as db:
+            course_ids = (await db.execute(select(Course.id))).scalars().all()
+        if not course_ids:
+            print("нет курсов в courses_course")
+            return
+        body = _make_csv(args.rows, course_ids, args.dup, args.bad)
+        print(f"{args.rows} строк, {len(body) / 1e6:.1f} MB, курсов {len(course_ids)}")
+
+        for op in ("grant", "revoke"):
+            start = time.perf_counter()
+            state = await (_job_http(args.url, op, body) if args.url else _job_local(op, body))
+            elapsed = time.perf_counter() - start
+            print(f"{op:<7} {elapsed:7.2f} s  {args.rows / elapsed:9.0f} строк/с  {state}")
+    finally:
+        await cache.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Пакетная выдача доступов")
+    p.add_argument("--rows", type=int, default=300_000)
+    p.add_argument("--dup", type=float, default=0.01, help="доля повторов строки")
+    p.add_argument("--bad", type=float, default=0.001, help="доля неразборчивых строк")
+    p.add_argument("--url", default=None)
+    asyncio.run(main(p.parse_args()))
@@ -0,0 +1,133 @@
+# catalog_service/scripts/bench_lead_magnet_stats.py
+
+"""
+Конверсия связки на синтетических данных: по умолчанию 1M доступов.
+
+Создаются три временных курса (лид, апселл, «шум») и связка; доступы генерируются
+INSERT ... SELECT generate_series: --leads пользователей получают лид-курс, доля
+--conversion из них — апселл через случайное время, остальное до --accesses — шум.
+
+per-user:     старый путь — по запросу на лида («какие курсы у пользователя»); меряется
+              на --sample лидах и экстраполируется на всех.
+live:         compute_live — один запрос с percentile_cont.
+refresh-full: refresh_lead_magnet(full=True) — пересборка агрегата по дням.
+refresh-incr: инкрементальный пересчёт после --new новых доступов.
+rollup:       read_rollup за всё время и за последние 30 дней.
+
+Временные курсы удаляются в конце (доступы и агрегат — каскадом).
+
+Запуск: PYTHONPATH=. python scripts/bench_lead_magnet_stats.py [--accesses 1000000] [--leads 20000]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import delete, select, text
+
+from db.init_db import async_session_maker, engine
+from models.access import CourseAccess
+from models.course import Course
+from models.lead_magnet import LeadMagnet
+from services.lead_magnet_stats import compute_live, read_rollup, refresh_lead_magnet
+
+USER_BASE = 800_000_000  # заведомо несуществующие user_id
+
+_INSERT = "INSERT INTO courses_courseaccess (user_id, course_id, purchased_at) "
+_SEED_LEADS = _INSERT + """
+SELECT :user_base + g, :lead, now() AT TIME ZONE 'UTC' - random() * interval '365 days' - interval '1 day'
+FROM generate_series(1, :n) g
+"""
+# апселл через случайное время: чаще в первые дни, хвост до 60 дней
+_SEED_UPSELLS = _INSERT + """
+SELECT user_id, :upsell, purchased_at + random() * random() * interval '60 days'
+FROM courses_courseaccess
+WHERE course_id = :lead AND random() < :conversion
+"""
+_SEED_NEW = _INSERT + """
+SELECT :user_base + g, :lead, now() AT TIME ZONE 'UTC' FROM generate_series(1, :n) g
+"""
+_SEED_NOISE = _INSERT + """
+SELECT :user_base + g, :noise, now() AT TIME ZONE 'UTC' - random() * interval '365 days'
+FROM generate_series(1, :n) g
+"""
+
+
+async def _timed(label: str, fn, extra: str = "") -> float:
+    start = time.perf_counter()
+    result = await fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<14} {elapsed:10.1f} ms  {extra}{result if result is not None else ''}")
+    return elapsed
+
+
+async def main(args) -> None:
+    tag = uuid.uuid4().hex[:8]
+    async with async_session_maker() as db:
+        courses = [Course(title=f"bench-{tag}-{name}", short_description="bench") for name in ("lead", "upsell", "noise")]
+        db.add_all(courses)
+        await db.flush()
+        lead, upsell, noise = (c.id for c in courses)
+        lead_magnet = LeadMagnet(title=f"bench-{tag}", lead_course_id=lead, upsell_course_id=upsell)
+        db.add(lead_magnet)
+        await db.commit()
+
+    try:
+        async with async_session_maker() as db:
+            start = time.perf_counter()
+            await db.execute(text(_SEED_LEADS), {"user_base": USER_BASE, "lead": lead, "n": args.leads})
+            converted = await db.execute(
+                text(_SEED_UPSELLS), {"lead": lead, "upsell": upsell, "conversion": args.conversion}
+            )
+            noise_count = max(args.accesses - args.leads - converted.rowcount, 0)
+            await db.execute(
+                text(_SEED_NOISE), {"user_base": USER_BASE + args.leads, "noise": noise, "n": noise_count}
+            )
+            await db.commit()
+            await db.execute(text("ANALYZE courses_courseaccess"))
+            print(f"seed: {args.leads} лидов, {converted.rowcount} апселлов, {noise_count} шума "
+                  f"за {time.perf_counter() - start:.1f} s")
+
+        async with async_session_maker() as db:
+            lead_users = (await db.execute(
+                select(CourseAccess.user_id).where(CourseAccess.course_id == lead).limit(args.sample)
+            )).scalars().all()
+
+            async def per_user():
+                for user_id in lead_users:
+                    await db.execute(select(CourseAccess.course_id).where(CourseAccess.user_id == user_id))
+
+            ms = await _timed("per-user", per_user, f"({len(lead_users)} лидов) ")
+            print(f"{'':<14} ~{ms / max(len(lead_users), 1) * args.leads:9.0f} ms на всех лидов (без HTTP)")
+
+            lm = (await db.execute(select(LeadMagnet).where(LeadMagnet.id == lead_magnet.id))).scalar_one()
+            await _timed("live", lambda: compute_live(db, lm))
+            await _timed("refresh-full", lambda: refresh_lead_magnet(db, lm, full=True), "дней: ")
+
+            await db.execute(text(_SEED_NEW), {"user_base": USER_BASE + args.accesses, "lead": lead, "n": args.new})
+            await db.commit()
+            await db.refresh(lm)  # водяной знак после полного пересчёта
+            await _timed("refresh-incr", lambda: refresh_lead_magnet(db, lm), "дней: ")
+
+            await _timed("rollup", lambda: read_rollup(db, lm))
+            await _timed("rollup-30d", lambda: read_rollup(db, lm, since=date.today() - timedelta(days=30)))
+            live, rolled = await compute_live(db, lm), await read_rollup(db, lm)
+            print("live  ", live)
+            print("rollup", rolled)
+    finally:
+        async with async_session_maker() as db:
+            await db.execute(delete(Course).where(Course.id.in_([lead, upsell, noise])))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Конверсия связки на синтетических данных")
+    p.add_argument("--accesses", type=int, default=1_000_000)
+    p.add_argument("--leads", type=int, default=20_000)
+    p.add_argument("--conversion", type=float, default=0.08)
+    p.add_argument("--sample", type=int, default=1000, help="лидов для замера старого пути")
+    p.add_argument("--new", type=int, default=200, help="новых лидов перед инкрементальным пересчётом")
+    asyncio.run(main(p.parse_args()))
@@ -0,0 +1,95 @@
+# catalog_service/scripts/bench_list_payload.py
+
+"""
+Списки курсов: байты ответа и время (SQL + сериализация) до и после проекций.
+
+admin before:  GET /v1/admin/courses/ как было — select(Course) со всеми колонками в JSON.
+admin after:   admin_list_courses() — load_only по колонкам таблицы, AdminCourseListSchema.
+admin fields:  то же с ?fields=id,title,price,order.
+public before: build_course_list() на select(Course) без load_only (тот же документ).
+public after:  build_course_list() — load_only(LIST_COLUMNS).
+public fields: список с ?fields=id,title,final_price (срез готового документа).
+
+Печатается медиана по --rounds прогонам. Результат зависит от размера описаний:
+на пустых full_description разница в SQL почти не видна.
+
+Запуск: PYTHONPATH=. python scripts/bench_list_payload.py [--rounds 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import inspect, select
+
+from api.admin.courses import admin_list_courses
+from db.init_db import async_session_maker, engine
+from models.course import Course
+from services.course_list import LIST_FIELDS, build_course_list, course_item
+from utils.fields import project
+
+FULL_COLUMNS = [a.key for a in inspect(Course).column_attrs if not a.deferred]
+
+
+async def admin_before() -> bytes:
+    async with async_session_maker() as db:
+        courses = (await db.execute(select(Course).order_by(Course.order.asc()))).scalars().all()
+        rows = [{k: getattr(c, k) for k in FULL_COLUMNS} for c in courses]
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+async def admin_after(fields=None) -> bytes:
+    async with async_session_maker() as db:
+        return (await admin_list_courses(fields=fields, db=db)).body
+
+
+async def public_before() -> bytes:
+    async with async_session_maker() as db:
+        courses = (await db.execute(select(Course).order_by(Course.order.asc()))).scalars().all()
+    now = datetime.now(timezone.utc)
+    return JSONResponse([course_item(c, now) for c in courses]).body
+
+
+async def public_after(fields=None) -> bytes:
+    doc = await build_course_list()
+    courses = doc["courses"]
+    if fields:
+        courses = project(courses, [f for f in LIST_FIELDS if f in fields.split(",") or f == "id"])
+    return JSONResponse(courses).body
+
+
+async def _measure(name: str, make, rounds: int) -> None:
+    times, size = [], 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = await make()
+        times.append(time.perf_counter() - start)
+        size = len(body)
+    print(f"{name:<15} {size:>10} B  {statistics.median(times) * 1000:8.2f} ms")
+
+
+async def main(args) -> None:
+    try:
+        cases = [
+            ("admin before", admin_before),
+            ("admin after", admin_after),
+            ("admin fields", lambda: admin_after("id,title,price,order")),
+            ("public before", public_before),
+            ("public after", public_after),
+            ("public fields", lambda: public_after("id,title,final_price")),
+        ]
+        for name, make in cases:
+            await make()  # прогрев пула соединений
+            await _measure(name, make, args.rounds)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Проекции списков курсов: байты и время")
+    p.add_argument("--rounds", type=int, default=50)
+    asyncio.run(main(p.parse_args()))
@@ -0,0 +1,126 @@
+# catalog_service/scripts/bench_promo_redeem.py
+
+"""
+Конкурентное погашение одного промокода: N одновременных /use от разных пользователей.
+
+for-update:   старый путь — SELECT ... FOR UPDATE, проверки, uses_left -= 1, commit.
+conditional:  services.promocodes.redeem — INSERT в журнал + условный UPDATE ... RETURNING.
+sharded:      тот же redeem со счётчиком в шардах Redis (нужен REDIS_URL).
+
+Для каждого режима создаётся временный промокод с --uses использованиями (меньше N,
+чтобы проверить, что перерасхода нет), потом удаляется. Печатаются время, p50/p95/p99
+и число успешных погашений; код выхода 1, если успешных не ровно min(uses, N).
+
+Запуск: PYTHONPATH=. python scripts/bench_promo_redeem.py [--concurrency 500] [--uses 400] [--pool 50]
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from db.init_db import DATABASE_URL
+from models.promocode import PromoCode
+from services.promocodes import redeem, release_shards, validate_promo
+from utils.cache import cache
+
+USER_BASE = 900_000_000  # заведомо несуществующие user_id
+
+
+async def _for_update(db, code: str, user_id: int) -> None:
+    async with db.begin():
+        res = await db.execute(
+            select(PromoCode).where(PromoCode.code == code, PromoCode.is_active == True).with_for_update()
+        )
+        promo = validate_promo(res.scalar_one_or_none(), None)
+        if promo.uses_left <= 0:
+            raise HTTPException(status_code=400, detail="exhausted")
+        promo.uses_left -= 1
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)] * 1000
+
+
+async def _run_mode(mode: str, maker, args) -> bool:
+    code = f"BENCH-{uuid.uuid4().hex[:10]}"
+    async with maker() as db:
+        promo = PromoCode(
+            code=code, discount_percent=10, uses_left=args.uses, max_uses=args.uses,
+            valid_from=datetime.utcnow() - timedelta(minutes=1),
+            valid_until=datetime.utcnow() + timedelta(hours=1),
+            is_active=True, applicable_courses=[],
+        )
+        db.add(promo)
+        await db.commit()
+        promo_id = promo.id
+
+    latencies, ok, failed = [], 0, 0
+    gate = asyncio.Event()
+
+    async def one(i: int):
+        nonlocal ok, failed
+        await gate.wait()
+        start = time.perf_counter()
+        try:
+            async with maker() as db:
+                if mode == "for-update":
+                    await _for_update(db, code, USER_BASE + i)
+                else:
+                    await redeem(db, code, USER_BASE + i, sharded=(mode == "sharded"))
+            ok += 1
+        except HTTPException:
+            failed += 1
+        latencies.append(time.perf_counter() - start)
+
+    tasks = [asyncio.create_task(one(i)) for i in range(args.concurrency)]
+    await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    gate.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    async with maker() as db:
+        await release_shards(db, promo_id)
+        left = (await db.execute(select(PromoCode.uses_left).where(PromoCode.id == promo_id))).scalar_one()
+        await db.execute(delete(PromoCode).where(PromoCode.id == promo_id))  # журнал — каскадом
+        await db.commit()
+
+    expected = min(args.uses, args.concurrency)
+    correct = ok == expected and left == args.uses - ok
+    print(
+        f"{mode:<12} {elapsed * 1000:9.1f} ms  {args.concurrency / elapsed:8.0f} req/s  "
+        f"p50 {_pct(latencies, 50):7.1f}  p95 {_pct(latencies, 95):7.1f}  p99 {_pct(latencies, 99):7.1f} ms  "
+        f"ok {ok} (ожидалось {expected})  отказов {failed}  остаток {left}" + ("" if correct else "  <-- НЕВЕРНО")
+    )
+    return correct
+
+
+async def main(args) -> int:
+    engine = create_async_engine(DATABASE_URL, pool_size=args.pool, max_overflow=0)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    await cache.init()
+    modes = ["for-update", "conditional"] + (["sharded"] if cache.client is not None else [])
+    print(f"concurrency {args.concurrency}, uses {args.uses}, pool {args.pool}")
+    try:
+        results = [await _run_mode(mode, maker, args) for mode in modes]
+    finally:
+        await cache.close()
+        await engine.dispose()
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Конкурентное погашение промокода")
+    p.add_argument("--concurrency", type=int, default=500)
+    p.add_argument("--uses", type=int, default=400)
+    p.add_argument("--pool", type=int, default=50, help="соединений к Postgres")
+    sys.exit(asyncio.run(main(p.parse_args())))
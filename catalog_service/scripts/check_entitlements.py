@@ -0,0 +1,91 @@
+# catalog_service/scripts/check_entitlements.py
+
+"""
+Сверка кэша прав (services/access.py) с таблицей courses_courseaccess.
+
+Проходит по всем заполненным hash'ам catalog:v1:entitlements:* (или по --users),
+сравнивает набор course_id с БД и печатает расхождения. --fix удаляет
+расходящиеся ключи — следующий запрос перезаполнит их из БД.
+Код выхода 1, если расхождения есть.
+
+Запуск: PYTHONPATH=. python scripts/check_entitlements.py [--fix] [--users 1 2 3]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import select
+
+from db.init_db import async_session_maker, engine
+from models.access import CourseAccess
+from services.access import parse_entitlements
+from utils.cache import cache, CacheKeys
+
+
+async def _db_course_ids(user_ids):
+    async with async_session_maker() as db:
+        res = await db.execute(
+            select(CourseAccess.user_id, CourseAccess.course_id).where(CourseAccess.user_id.in_(user_ids))
+        )
+        out = {uid: set() for uid in user_ids}
+        for uid, cid in res.all():
+            out[uid].add(cid)
+        return out
+
+
+async def _cached_user_ids():
+    prefix = CacheKeys.entitlements(0)[:-1]
+    ids = []
+    async for key in cache.client.scan_iter(match=f"{prefix}*", count=1000):
+        tail = key.decode()[len(prefix):]
+        if tail.isdigit():
+            ids.append(int(tail))
+    return ids
+
+
+async def check(args) -> int:
+    await cache.init()
+    if cache.client is None:
+        print("Redis недоступен — сверять нечего")
+        return 0
+
+    user_ids = args.users or await _cached_user_ids()
+    checked = mismatched = 0
+    for start in range(0, len(user_ids), args.batch):
+        batch = user_ids[start:start + args.batch]
+        expected = await _db_course_ids(batch)
+        async with cache.client.pipeline(transaction=False) as pipe:
+            for uid in batch:
+                pipe.hgetall(CacheKeys.entitlements(uid))
+            cached = await pipe.execute()
+
+        for uid, raw in zip(batch, cached):
+            owned = parse_entitlements(raw)
+            if owned is None:
+                continue  # не заполнен — нечего сверять
+            checked += 1
+            missing = expected[uid] - set(owned)
+            extra = set(owned) - expected[uid]
+            if missing or extra:
+                mismatched += 1
+                print(f"user {uid}: нет в кэше {sorted(missing)}, лишние в кэше {sorted(extra)}")
+                if args.fix:
+                    await cache.client.delete(CacheKeys.entitlements(uid))
+
+    print(f"проверено {checked}, расхождений {mismatched}" + (" (ключи удалены)" if args.fix and mismatched else ""))
+    await cache.close()
+    await engine.dispose()
+    return 1 if mismatched else 0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Сверка кэша прав с courses_courseaccess")
+    p.add_argument("--users", type=int, nargs="*", help="проверить только этих пользователей")
+    p.add_argument("--fix", action="store_true", help="удалить расходящиеся ключи")
+    p.add_argument("--batch", type=int, default=500)
+    return asyncio.run(check(p.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# catalog_service/scripts/check_rate_limit.py
+
+"""
+Проверка, что лимит глобальный: N процессов (как N воркеров uvicorn) одновременно
+бьют в один ключ, и суммарно пропущено должно быть ровно limit запросов за окно.
+
+Каждый процесс — свой RateLimiter и своё подключение к Redis (REDIS_URL).
+Ключ уникален на запуск, так что скрипт можно гонять против рабочего Redis.
+Код выхода 1, если пропущено больше или меньше limit.
+
+Запуск: PYTHONPATH=. python scripts/check_rate_limit.py [--procs 8] [--requests 100] [--limit 20] [--window 30]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+import uuid
+
+from utils.cache import cache
+from utils.rate_limit import RateLimiter
+
+
+async def _worker(identity: str, requests: int, limit: int, window: int, start_at: float) -> dict:
+    await cache.init()
+    if cache.client is None:
+        raise SystemExit("Redis недоступен")
+    limiter = RateLimiter()
+    await asyncio.sleep(max(0.0, start_at - time.time()))  # стартуем все процессы одновременно
+    results = await asyncio.gather(*[
+        limiter.hit("check", identity, limit, window) for _ in range(requests)
+    ])
+    await cache.close()
+    return {"allowed": sum(1 for allowed, _, _ in results if allowed), **limiter.stats}
+
+
+def _run(args) -> dict:
+    return asyncio.run(_worker(*args))
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Глобальный лимит при нескольких процессах")
+    p.add_argument("--procs", type=int, default=8)
+    p.add_argument("--requests", type=int, default=100, help="запросов на процесс")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--window", type=int, default=30, help="секунд; должно перекрывать весь прогон")
+    args = p.parse_args(argv)
+
+    identity = f"check-{uuid.uuid4().hex[:12]}"
+    start_at = time.time() + 1.0
+    job = (identity, args.requests, args.limit, args.window, start_at)
+    with multiprocessing.Pool(args.procs) as pool:
+        per_process = pool.map(_run, [job] * args.procs)
+
+    allowed = sum(r["allowed"] for r in per_process)
+    for i, r in enumerate(per_process):
+        print(f"proc {i}: allowed {r['allowed']:4d}  rejected {r['rejected']:4d}  rejected_local {r['rejected_local']:4d}")
+    total = args.procs * args.requests
+    print(f"total {total}, allowed {allowed}, limit {args.limit}")
+    if allowed != min(args.limit, total):
+        print("FAIL: лимит не глобальный")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# catalog_service/scripts/check_static_export.py
+
+"""
+Проверка статического экспорта (services/static_export.py) на локальной замене S3.
+
+Поднимите S3-совместимый сервер (moto_server -p 5000 или MinIO) и запустите скрипт:
+он создаёт бакет, делает экспорт из текущей БД и проверяет по HTTP, как это увидит CDN:
+- manifest.json читается, Cache-Control короткий;
+- у каждого документа .json / .json.gz / .json.br распаковываются в одно и то же
+  (sha из указателя совпадает), Content-Encoding и immutable Cache-Control на месте;
+- homepage и courses содержат те же курсы, что /v1/public/courses для анонима;
+- повторный экспорт без изменений ничего не загружает и не двигает версию.
+Код выхода 1, если что-то не сошлось.
+
+Запуск: PYTHONPATH=. python scripts/check_static_export.py --endpoint http://localhost:5000 [--bucket catalog-static-check]
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import sys
+
+import httpx
+
+from core.config import settings
+from db.init_db import engine
+from services.course_list import get_course_list_document
+from services.static_export import brotli, exporter
+from utils.cache import cache
+from utils.object_storage import ObjectStorage
+
+failures = []
+
+
+def check(ok: bool, message: str) -> None:
+    print(("ok    " if ok else "FAIL  ") + message)
+    if not ok:
+        failures.append(message)
+
+
+async def _ensure_bucket(storage: ObjectStorage) -> None:
+    async with storage.client() as client:
+        try:
+            await client.head_bucket(Bucket=storage.bucket)
+        except Exception:
+            await client.create_bucket(Bucket=storage.bucket)
+        # как у боевого публичного бакета: анонимное чтение объектов
+        await client.put_bucket_policy(Bucket=storage.bucket, Policy=json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Principal": "*",
+                "Action": "s3:GetObject",
+                "Resource": f"arn:aws:s3:::{storage.bucket}/*",
+            }],
+        }))
+
+
+async def _check_objects(http: httpx.AsyncClient, base: str) -> None:
+    r = await http.get(f"{base}/{settings.STATIC_EXPORT_PREFIX}/manifest.json")
+    check(r.status_code == 200, f"manifest.json: HTTP {r.status_code}")
+    if r.status_code != 200:
+        return
+    check("max-age=" in r.headers.get("cache-control", ""), f"manifest Cache-Control: {r.headers.get('cache-control')}")
+    manifest = r.json()
+    print(f"      версия {manifest['version']}, документов {len(manifest['documents'])}, valid_until {manifest['valid_until']}")
+
+    for name, doc in manifest["documents"].items():
+        plain = await http.get(f"{base}/{doc['path']}")
+        body = plain.content
+        check(hashlib.sha256(body).hexdigest()[:16] == doc["sha"], f"{name}: sha {doc['sha']}")
+        check("immutable" in plain.headers.get("cache-control", ""), f"{name}: immutable Cache-Control")
+        json.loads(body)
+
+        headers, raw = await _raw(http, f"{base}/{doc['gzip']}")
+        check(headers.get("content-encoding") == "gzip", f"{name}: .gz Content-Encoding")
+        check(gzip.decompress(raw) == body, f"{name}: .gz == .json")
+        if brotli is not None:
+            check(doc["br"] is not None, f"{name}: .br в указателе")
+            headers, raw = await _raw(http, f"{base}/{doc['br']}")
+            check(headers.get("content-encoding") == "br", f"{name}: .br Content-Encoding")
+            check(brotli.decompress(raw) == body, f"{name}: .br == .json")
+
+    expected = [c["id"] for c in (await get_course_list_document())["courses"]]
+    for name in ("homepage", "courses"):
+        doc = (await http.get(f"{base}/{manifest['documents'][name]['path']}")).json()
+        ids = [c["id"] for c in (doc["courses"] if name == "homepage" else doc)]
+        check(ids == expected, f"{name}: курсы совпадают со списком ({len(ids)})")
+    check(all(f"course/{cid}" in manifest["documents"] for cid in expected), "страница есть у каждого курса")
+
+
+async def _raw(http: httpx.AsyncClient, url: str):
+    """Заголовки и байты объекта как есть — без распаковки по Content-Encoding на стороне httpx."""
+    async with http.stream("GET", url) as r:
+        return r.headers, b"".join([chunk async for chunk in r.aiter_raw()])
+
+
+async def main(args) -> None:
+    settings.STATIC_EXPORT_BUCKET = args.bucket
+    settings.S3_ENDPOINT_URL = args.endpoint
+    settings.S3_ACCESS_KEY = settings.S3_ACCESS_KEY or "test"
+    settings.S3_SECRET_KEY = settings.S3_SECRET_KEY or "test"
+    exporter.storage = ObjectStorage(args.bucket)
+    await cache.init()
+    try:
+        await _ensure_bucket(exporter.storage)
+        first = await exporter.export_once()
+        check(first is not None, f"экспорт: {first}")
+        async with httpx.AsyncClient(timeout=10.0) as http:
+            await _check_objects(http, f"{args.endpoint.rstrip('/')}/{args.bucket}")
+        second = await exporter.export_once()
+        check(second["uploaded"] == 0, f"повторный экспорт без изменений: загружено {second['uploaded']}")
+        check(second["version"] == first["version"], "версия указателя не сдвинулась")
+    finally:
+        await cache.close()
+        await engine.dispose()
+    print("\nOK" if not failures else f"\n{len(failures)} проверок не прошли")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Проверка статического экспорта на локальном S3")
+    p.add_argument("--endpoint", default="http://localhost:5000")
+    p.add_argument("--bucket", default="catalog-static-check")
+    asyncio.run(main(p.parse_args()))
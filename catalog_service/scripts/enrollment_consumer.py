@@ -0,0 +1,88 @@
+# catalog_service/scripts/enrollment_consumer.py
+
+"""
+Пример потребителя потока событий доступа (catalog:v1:enrollment) через consumer group.
+
+- при старте группа создаётся (--start: "$" — только новые, "0" — весь поток);
+  --from <stream id> переставляет группу (XGROUP SETID) — повтор с этого места;
+- сначала дочитываются свои неподтверждённые сообщения (XREADGROUP ... 0), затем новые (">");
+- XACK только после обработки — падение между ними даёт повтор (at-least-once),
+  дедупликация — по outbox_id;
+- сообщения упавших потребителей группы, висящие дольше --claim-idle мс, забираются XAUTOCLAIM.
+
+Запуск: PYTHONPATH=. python scripts/enrollment_consumer.py --group learning [--consumer w1] [--from 0]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+
+from services.enrollment_events import STREAM, ensure_group, set_group_offset
+from utils.cache import cache
+
+
+def _handle(entry_id: str, fields: dict, seen: set) -> None:
+    outbox_id = fields.get("outbox_id")
+    if outbox_id in seen:
+        print(f"{entry_id} повтор outbox_id={outbox_id}, пропуск")
+        return
+    seen.add(outbox_id)
+    print(f"{entry_id} {fields.get('event'):<6} user={fields.get('user_id')} course={fields.get('course_id')} "
+          f"source={fields.get('source')} at={fields.get('occurred_at')}")
+
+
+def _decode(entries):
+    return [
+        (entry_id.decode(), {k.decode(): v.decode() for k, v in fields.items()})
+        for entry_id, fields in entries or []
+    ]
+
+
+async def main(args) -> None:
+    await cache.init()
+    client = cache.client
+    if client is None:
+        raise SystemExit("нет Redis (REDIS_URL / CACHE_ENABLED)")
+    await ensure_group(args.group, args.start)
+    if args.offset is not None:
+        await set_group_offset(args.group, args.offset)
+
+    seen: set = set()  # в настоящем потребителе — в его собственном хранилище
+    pending_id = "0"
+    try:
+        while True:
+            claimed = await client.xautoclaim(
+                STREAM, args.group, args.consumer, min_idle_time=args.claim_idle, start_id="0-0", count=100
+            )
+            batches = [_decode(claimed[1])]  # [next_id, entries(, deleted_ids в Redis 7)]
+            if pending_id is not None:
+                # свои неподтверждённые (после рестарта), затем только новые
+                response = await client.xreadgroup(args.group, args.consumer, {STREAM: pending_id}, count=100)
+                entries = _decode(response[0][1]) if response else []
+                pending_id = entries[-1][0] if entries else None
+                batches.append(entries)
+            else:
+                response = await client.xreadgroup(args.group, args.consumer, {STREAM: ">"}, count=100, block=5000)
+                batches.append(_decode(response[0][1]) if response else [])
+
+            for entries in batches:
+                for entry_id, fields in entries:
+                    _handle(entry_id, fields, seen)
+                if entries:
+                    await client.xack(STREAM, args.group, *[entry_id for entry_id, _ in entries])
+    finally:
+        await cache.close()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Потребитель событий доступа")
+    p.add_argument("--group", required=True)
+    p.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}")
+    p.add_argument("--start", default="$", help='id для новой группы: "$" или "0"')
+    p.add_argument("--from", dest="offset", default=None, help="переставить группу на этот stream id")
+    p.add_argument("--claim-idle", type=int, default=60000, help="мс, после которых чужие pending забираются")
+    try:
+        asyncio.run(main(p.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,270 @@
+# catalog_service/services/access.py
+
+"""
+Кэш прав пользователя в Redis.
+
+catalog:v1:entitlements:{user_id} — hash {course_id: purchased_at ISO, "v": версия}.
+Hash, а не set: /internal/users/{id}/courses отдаёт purchased_at, и его тоже
+хочется отвечать из памяти. Наличие поля "v" = «ключ заполнен» (в т.ч. пустой).
+
+catalog:v1:entitlements_version:{user_id} — счётчик изменений прав пользователя.
+- Заполнение (промах): читаем версию, потом БД, и пишем hash скриптом только если
+  версия не изменилась — «медленное» заполнение не затрёт более новую запись.
+- Запись (buy / grant / remove, после commit): INCR версии и, если hash есть,
+  HSET/HDEL поля — write-through, без сброса кэша.
+- Удаление курса: до DELETE курса revoke_course_holders() сама удаляет его права (с revoke
+  в outbox), после commit — record_bulk(..., "revoke"); ON DELETE CASCADE остаётся страховкой.
+Сверка с таблицей — scripts/check_entitlements.py.
+
+verify_user_courses / verify_pairs — пакетная проверка одним SQL, мимо кэша.
+summarize_users — сводка по странице пользователей (админская таблица) одним GROUP BY.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from datetime import datetime
+
+from sqlalchemy import Integer, and_, any_, bindparam, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.init_db import async_session_maker
+from models.access import CourseAccess
+from models.course import Course
+from services.enrollment_events import COURSE_DELETE_SQL
+from utils.cache import cache, CacheKeys, now_ms
+
+logger = logging.getLogger(__name__)
+
+VERSION_FIELD = b"v"
+
+# KEYS: hash, version; ARGV: ожидаемая версия, ttl, course_id, purchased_at, ...
+_FILL_LUA = """
+local cur = redis.call('GET', KEYS[2]) or '0'
+if cur ~= ARGV[1] then return 0 end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'v', cur)
+for i = 3, #ARGV, 2 do redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1]) end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# KEYS: hash, version; ARGV: 'add'|'del', course_id, purchased_at, ttl версии, now_ms
+# Версия не меньше now_ms: после истечения ключа номера не повторяются (она входит в ETag).
+_WRITE_LUA = """
+local v = redis.call('INCR', KEYS[2])
+if v < tonumber(ARGV[5]) then
+  v = tonumber(ARGV[5])
+  redis.call('SET', KEYS[2], v)
+end
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  if ARGV[1] == 'add' then
+    redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+  else
+    redis.call('HDEL', KEYS[1], ARGV[2])
+  end
+  redis.call('HSET', KEYS[1], 'v', v)
+end
+return v
+"""
+
+
+def _keys(user_id: int):
+    return [CacheKeys.entitlements(user_id), CacheKeys.entitlements_version(user_id)]
+
+
+def _version_ttl() -> int:
+    # версия должна пережить hash, иначе сравнение в _FILL_LUA теряет смысл
+    return settings.ENTITLEMENT_TTL * 2
+
+
+def parse_entitlements(raw: Optional[Dict[bytes, bytes]]) -> Optional[Dict[int, str]]:
+    """HGETALL -> {course_id: purchased_at}; None, если ключ ещё не заполнен."""
+    if not raw or VERSION_FIELD not in raw:
+        return None
+    return {int(k): v.decode() for k, v in raw.items() if k != VERSION_FIELD}
+
+
+async def load_entitlements(user_id: int) -> Dict[int, str]:
+    async with async_session_maker() as db:
+        res = await db.execute(
+            select(CourseAccess.course_id, CourseAccess.purchased_at).where(CourseAccess.user_id == user_id)
+        )
+        return {cid: (ts.isoformat() if ts else "") for cid, ts in res.all()}
+
+
+async def fill_entitlements(user_id: int) -> Dict[int, str]:
+    """Промах: версия -> БД -> запись, только если версия не сдвинулась."""
+    if cache.client is None:
+        return await load_entitlements(user_id)
+    hash_key, version_key = _keys(user_id)
+    try:
+        version = await cache.client.get(version_key) or b"0"
+    except Exception as e:
+        logger.warning("Entitlements version read failed for user %s: %s", user_id, e)
+        return await load_entitlements(user_id)
+
+    owned = await load_entitlements(user_id)
+    args = [version, settings.ENTITLEMENT_TTL]
+    for course_id, purchased_at in owned.items():
+        args += [course_id, purchased_at]
+    try:
+        stored = await cache.client.eval(_FILL_LUA, 2, hash_key, version_key, *args)
+        if not stored:
+            # пока читали БД, права уже изменились — заполнит следующий запрос
+            logger.debug("Entitlements fill for user %s lost to a newer write", user_id)
+    except Exception as e:
+        logger.warning("Entitlements fill failed for user %s: %s", user_id, e)
+    return owned
+
+
+async def get_entitlements(user_id: int) -> Dict[int, str]:
+    if cache.client is None:
+        return await load_entitlements(user_id)
+    key = CacheKeys.entitlements(user_id)
+    try:
+        owned = parse_entitlements(await cache.client.hgetall(key))
+    except Exception as e:
+        logger.warning("Entitlements read failed for user %s: %s", user_id, e)
+        return await load_entitlements(user_id)
+    if owned is None:
+        cache.metrics.inc(key, "miss")
+        return await fill_entitlements(user_id)
+    cache.metrics.inc(key, "hit")
+    return owned
+
+
+async def has_course(user_id: int, course_id: int) -> bool:
+    """Одна команда HMGET: маркер заполненности + нужное поле."""
+    if cache.client is None:
+        return course_id in await load_entitlements(user_id)
+    key = CacheKeys.entitlements(user_id)
+    try:
+        version, purchased = await cache.client.hmget(key, VERSION_FIELD, str(course_id))
+    except Exception as e:
+        logger.warning("Entitlements read failed for user %s: %s", user_id, e)
+        return course_id in await load_entitlements(user_id)
+    if version is None:
+        cache.metrics.inc(key, "miss")
+        return course_id in await fill_entitlements(user_id)
+    cache.metrics.inc(key, "hit")
+    return purchased is not None
+
+
+async def _write(user_id: int, op: str, course_id: int, purchased_at: str = "") -> None:
+    if cache.client is None:
+        return
+    hash_key, version_key = _keys(user_id)
+    try:
+        await cache.client.eval(
+            _WRITE_LUA, 2, hash_key, version_key, op, course_id, purchased_at, _version_ttl(), now_ms()
+        )
+    except Exception as e:
+        logger.error("Entitlements write-through failed for user %s: %s", user_id, e)
+        try:
+            await cache.client.delete(hash_key)
+        except Exception:
+            pass  # ключ доживёт до ENTITLEMENT_TTL; scripts/check_entitlements.py покажет расхождение
+
+
+async def record_grant(user_id: int, course_id: int, purchased_at) -> None:
+    """После commit новой CourseAccess."""
+    await _write(user_id, "add", course_id, purchased_at.isoformat() if purchased_at else "")
+
+
+async def record_revoke(user_id: int, course_id: int) -> None:
+    """После commit удаления CourseAccess."""
+    await _write(user_id, "del", course_id)
+
+
+async def record_bulk(pairs: List[Tuple[int, int]], op: str, purchased_at: str = "") -> None:
+    """Пакетный write-through (services/entitlement_jobs.py): op 'grant' | 'revoke', один pipeline."""
+    if cache.client is None or not pairs:
+        return
+    action = "add" if op == "grant" else "del"
+    version_ttl, now = _version_ttl(), now_ms()
+    try:
+        async with cache.client.pipeline(transaction=False) as pipe:
+            for user_id, course_id in pairs:
+                pipe.eval(_WRITE_LUA, 2, *_keys(user_id), action, course_id, purchased_at, version_ttl, now)
+            await pipe.execute()
+    except Exception as e:
+        logger.error("Entitlements bulk write-through failed (%d pairs): %s", len(pairs), e)
+        try:
+            await cache.client.delete(*{CacheKeys.entitlements(user_id) for user_id, _ in pairs})
+        except Exception:
+            pass
+
+
+async def revoke_course_holders(db: AsyncSession, course_ids: List[int]) -> List[Tuple[int, int]]:
+    """
+    Звать до удаления курсов, в той же транзакции, без commit. Курсы блокируются FOR UPDATE
+    (новая выдача ждёт на FK), права удаляются с revoke-событием на каждое.
+    Возвращает удалённые (user_id, course_id) — для record_bulk после commit.
+    """
+    if not course_ids:
+        return []
+    ids = bindparam("course_ids", list(course_ids), type_=ARRAY(Integer))
+    await db.execute(select(Course.id).where(Course.id == any_(ids)).with_for_update())
+    res = await db.execute(text(COURSE_DELETE_SQL), {"course_ids": list(course_ids), "now": datetime.utcnow()})
+    return [(user_id, course_id) for user_id, course_id in res.all()]
+
+
+# ---------- пакетная проверка (для /internal/access/verify-batch) ----------
+
+async def verify_user_courses(db: AsyncSession, user_id: int, course_ids: List[int]) -> Dict[int, Optional[bool]]:
+    """Один пользователь, много курсов: course_id = ANY(:ids) + LEFT JOIN прав. None — курса нет."""
+    ids = bindparam("course_ids", course_ids, type_=ARRAY(Integer))
+    res = await db.execute(
+        select(Course.id, Course.is_free, CourseAccess.id.isnot(None))
+        .outerjoin(CourseAccess, and_(CourseAccess.course_id == Course.id, CourseAccess.user_id == user_id))
+        .where(Course.id == any_(ids))
+    )
+    found = {cid: bool(is_free or owned) for cid, is_free, owned in res.all()}
+    return {cid: found.get(cid) for cid in course_ids}
+
+
+async def verify_pairs(db: AsyncSession, pairs: List[Tuple[int, int]]) -> Dict[int, Dict[int, Optional[bool]]]:
+    """Произвольные пары (user_id, course_id): unnest двух массивов + два LEFT JOIN, один запрос."""
+    p = (
+        func.unnest(
+            bindparam("user_ids", [u for u, _ in pairs], type_=ARRAY(Integer)),
+            bindparam("course_ids", [c for _, c in pairs], type_=ARRAY(Integer)),
+        )
+        .table_valued("user_id", "course_id")
+        .render_derived(name="p", with_types=False)
+    )
+    res = await db.execute(
+        select(p.c.user_id, p.c.course_id, Course.id.isnot(None), Course.is_free, CourseAccess.id.isnot(None))
+        .select_from(p)
+        .outerjoin(Course, Course.id == p.c.course_id)
+        .outerjoin(CourseAccess, and_(CourseAccess.user_id == p.c.user_id, CourseAccess.course_id == p.c.course_id))
+    )
+    out: Dict[int, Dict[int, Optional[bool]]] = {}
+    for user_id, course_id, exists, is_free, owned in res.all():
+        out.setdefault(user_id, {})[course_id] = bool(is_free or owned) if exists else None
+    return out
+
+
+async def summarize_users(db: AsyncSession, user_ids: List[int]) -> Dict[int, dict]:
+    """user_id = ANY(:ids) GROUP BY user_id: число курсов, последняя покупка, id курсов по времени."""
+    ids = bindparam("user_ids", user_ids, type_=ARRAY(Integer))
+    res = await db.execute(
+        select(
+            CourseAccess.user_id,
+            func.count(),
+            func.max(CourseAccess.purchased_at),
+            func.array_agg(aggregate_order_by(CourseAccess.course_id, CourseAccess.purchased_at)),
+        )
+        .where(CourseAccess.user_id == any_(ids))
+        .group_by(CourseAccess.user_id)
+    )
+    found = {
+        user_id: {"count": count, "last_purchased_at": last.isoformat() if last else None, "course_ids": course_ids}
+        for user_id, count, last, course_ids in res.all()
+    }
+    empty = {"count": 0, "last_purchased_at": None, "course_ids": []}
+    return {user_id: found.get(user_id, empty) for user_id in user_ids}
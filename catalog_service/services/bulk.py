@@ -0,0 +1,47 @@
+# catalog_service/services/bulk.py
+
+"""
+Массовые изменения одним statement'ом: id = ANY(:ids) или UPDATE ... FROM unnest(:ids, :orders).
+Вызывающий коммитит и сбрасывает кэш один раз на всю пачку.
+"""
+
+from typing import Dict, Iterable, List
+
+from sqlalchemy import Integer, any_, bindparam, delete, func, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def ids_param(ids: Iterable[int], name: str = "ids"):
+    return bindparam(name, list(ids), type_=ARRAY(Integer))
+
+
+def results(ids: List[int], done: Dict[int, dict]) -> List[dict]:
+    """Ответ в порядке запроса: {"id", "success", ...поля из RETURNING}."""
+    return [{"id": i, "success": i in done, **done.get(i, {})} for i in ids]
+
+
+async def update_many(db: AsyncSession, model, ids: List[int], values: dict, returning=()) -> Dict[int, dict]:
+    res = await db.execute(
+        update(model).where(model.id == any_(ids_param(ids))).values(**values).returning(model.id, *returning)
+    )
+    return {row[0]: {col.key: value for col, value in zip(returning, row[1:])} for row in res.all()}
+
+
+async def delete_many(db: AsyncSession, model, ids: List[int]) -> Dict[int, dict]:
+    res = await db.execute(delete(model).where(model.id == any_(ids_param(ids))).returning(model.id))
+    return {row[0]: {} for row in res.all()}
+
+
+async def reorder(db: AsyncSession, model, items) -> Dict[int, dict]:
+    """items: [(id, order)] -> UPDATE model SET order = u.ord FROM unnest(:ids, :orders) u WHERE id = u.id."""
+    items = list(dict(items).items())  # повтор id — побеждает последний
+    u = (
+        func.unnest(ids_param([i for i, _ in items]), ids_param([o for _, o in items], "orders"))
+        .table_valued("id", "ord")
+        .render_derived(name="u", with_types=False)
+    )
+    res = await db.execute(
+        update(model).where(model.id == u.c.id).values(order=u.c.ord).returning(model.id, model.order)
+    )
+    return {row_id: {"order": order} for row_id, order in res.all()}
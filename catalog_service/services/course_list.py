@@ -0,0 +1,173 @@
+# catalog_service/services/course_list.py
+
+"""
+Публичный список курсов как один готовый документ.
+
+Документ одинаков для всех (has_access=False), лежит в кэше под тегом "courses"
+(его сбрасывают админские ручки курсов) и знает свою границу годности valid_until —
+ближайшее начало/конец скидки; после неё документ пересобирается, а не отдаётся stale.
+На запросе остаётся один pipeline в Redis (документ + права пользователя) и
+наложение has_access; SQL — только при промахе.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+from db.init_db import async_session_maker
+from models.course import Course
+from services.access import fill_entitlements, load_entitlements, parse_entitlements
+from utils.cache import cache, CacheKeys, pack
+
+logger = logging.getLogger(__name__)
+
+COURSE_LIST_TTL = 600
+COURSE_LIST_STALE_TTL = 60
+
+# колонки, из которых собирается карточка (course_item): без full_description, видео и баннера
+LIST_COLUMNS = (
+    Course.id, Course.title, Course.group_title, Course.short_description, Course.image,
+    Course.is_free, Course.price, Course.discount, Course.order, Course.discount_start, Course.discount_until,
+)
+# поля карточки — допустимые значения ?fields= у списка
+LIST_FIELDS = (
+    "id", "title", "group_title", "short_description", "image", "is_free", "price", "discount",
+    "final_price", "has_access", "button_text", "order", "is_discount_active",
+)
+
+
+def get_discount_info(course: Course, now: Optional[datetime] = None):
+    now = now or datetime.now(timezone.utc)
+    is_active = bool(
+        course.discount and float(course.discount) > 0 and
+        course.discount_start and course.discount_until and
+        course.discount_start <= now < course.discount_until
+    )
+    ends_in = ((course.discount_until - now).total_seconds() if is_active else None)
+    return is_active, ends_in
+
+
+def next_discount_boundary(courses: List[Course], now: datetime) -> Optional[float]:
+    """Ближайший момент в будущем, когда у какого-то курса включится или выключится скидка."""
+    points = [
+        dt.timestamp()
+        for c in courses if c.discount and float(c.discount) > 0
+        for dt in (c.discount_start, c.discount_until)
+        if dt is not None and dt > now
+    ]
+    return min(points) if points else None
+
+
+def course_item(course: Course, now: datetime) -> dict:
+    is_discount_active, _ = get_discount_info(course, now)
+    price = float(course.price or 0.0)
+    final_price = price * (1 - float(course.discount or 0) / 100) if is_discount_active else price
+    return {
+        "id": course.id,
+        "title": course.title,
+        "group_title": course.group_title,
+        "short_description": course.short_description,
+        "image": course.image,
+        "is_free": course.is_free,
+        "price": price,
+        "discount": float(course.discount or 0.0),
+        "final_price": round(final_price, 2),
+        "has_access": bool(course.is_free),
+        "button_text": "ОТКРЫТЬ",  # в каталоге всегда "ОТКРЫТЬ"
+        "order": course.order,
+        "is_discount_active": is_discount_active,
+        # CourseListSchema всегда отдавал эти ключи пустыми — контракт списка сохраняем
+        "discount_start": None,
+        "discount_until": None,
+        "discount_ends_in": None,
+    }
+
+
+async def _prices_version() -> Optional[str]:
+    if cache.client is None:
+        return None
+    try:
+        return await cache.version("courses")
+    except Exception as e:
+        logger.warning("Courses version read failed: %s", e)
+        return None
+
+
+async def build_course_list() -> dict:
+    # версию читаем до БД: граница годности записывается под той версией, с которой собирали
+    prices_version = await _prices_version()
+    async with async_session_maker() as db:
+        res = await db.execute(select(Course).options(load_only(*LIST_COLUMNS)).order_by(Course.order.asc()))
+        courses = res.scalars().all()
+    now = datetime.now(timezone.utc)
+    items = [course_item(c, now) for c in courses]
+    doc = {
+        "version": hashlib.sha1(pack(items)).hexdigest()[:16],
+        "built_at": now.timestamp(),
+        "valid_until": next_discount_boundary(courses, now),
+        "courses": items,
+    }
+    if prices_version is not None:
+        # для ETag'ов с ценами (utils/http_cache.py)
+        try:
+            await cache.set_boundary(
+                "courses", prices_version, doc["valid_until"], COURSE_LIST_TTL + COURSE_LIST_STALE_TTL
+            )
+        except Exception as e:
+            logger.warning("Courses boundary write failed: %s", e)
+    return doc
+
+
+def is_current(doc: dict) -> bool:
+    return doc.get("valid_until") is None or doc["valid_until"] > time.time()
+
+
+async def get_course_list_document() -> dict:
+    """Документ без наложения прав (для анонимов и внешних потребителей)."""
+    if cache.client is None:
+        return await build_course_list()
+    try:
+        item, _ = await cache.fetch(CacheKeys.course_list())
+    except Exception as e:
+        logger.warning("Course list cache read failed: %s", e)
+        return await build_course_list()
+    return await _resolve(item)
+
+
+async def _resolve(item) -> dict:
+    return await cache.resolve(
+        CacheKeys.course_list(), item, build_course_list,
+        ttl=COURSE_LIST_TTL, stale_ttl=COURSE_LIST_STALE_TTL, tags=["courses"], is_valid=is_current,
+    )
+
+
+async def get_course_list(user_id: Optional[int]) -> List[dict]:
+    doc = owned = None
+    if cache.client is not None:
+        extra = [lambda pipe: pipe.hgetall(CacheKeys.entitlements(user_id))] if user_id else []
+        try:
+            item, rest = await cache.fetch(CacheKeys.course_list(), *extra)
+        except Exception as e:
+            logger.warning("Course list cache read failed: %s", e)
+        else:
+            doc = await _resolve(item)
+            if user_id:
+                owned = parse_entitlements(rest[0])
+                if owned is None:
+                    owned = await fill_entitlements(user_id)
+    if doc is None:
+        # Redis выключен или недоступен — собираем напрямую
+        doc = await build_course_list()
+        owned = await load_entitlements(user_id) if user_id else None
+
+    if not owned:
+        return doc["courses"]
+    return [
+        {**c, "has_access": True} if c["id"] in owned and not c["has_access"] else c
+        for c in doc["courses"]
+    ]
@@ -0,0 +1,158 @@
+# catalog_service/services/course_page.py
+
+"""
+Страница курса одним ответом: детали + модальное окно + работы учеников.
+
+Статическая часть (одинаковая для всех) собирается одним проходом —
+Course + selectinload(modal.blocks, student_works_sections.works), — и кэшируется
+под тегом course:{id}, который уже сбрасывают админские ручки курса, модалки и работ.
+version — хэш статической части; valid_until — граница скидки, как у списка курсов.
+На запросе поверх кладутся только has_access/button_text и discount_ends_in.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from db.init_db import async_session_maker
+from models.course import Course
+from models.course_modal import CourseModal
+from models.student_works import StudentWorksSection
+from services.access import has_course
+from services.course_list import get_discount_info, is_current, next_discount_boundary
+from utils.cache import cache, CacheKeys, course_tag, pack
+
+logger = logging.getLogger(__name__)
+
+COURSE_PAGE_TTL = 600
+COURSE_PAGE_STALE_TTL = 60
+
+
+def _course_part(course: Course, now: datetime) -> dict:
+    is_discount_active, _ = get_discount_info(course, now)
+    price = float(course.price or 0.0)
+    final_price = price * (1 - float(course.discount or 0) / 100) if is_discount_active else price
+    return {
+        "id": course.id,
+        "title": course.title,
+        "full_description": course.full_description,
+        "short_description": course.short_description,
+        "image": course.image,
+        "is_free": course.is_free,
+        "price": price,
+        "discount": float(course.discount or 0.0),
+        "final_price": round(final_price, 2),
+        "video": course.video,
+        "video_preview": course.video_preview,
+        "banner_text": course.banner_text,
+        "group_title": course.group_title,
+        "banner_color_left": course.banner_color_left,
+        "banner_color_right": course.banner_color_right,
+        "order": course.order,
+        "discount_start": course.discount_start.isoformat() if course.discount_start else None,
+        "discount_until": course.discount_until.isoformat() if course.discount_until else None,
+        "is_discount_active": is_discount_active,
+    }
+
+
+def _modal_part(modal: Optional[CourseModal]) -> Optional[dict]:
+    if modal is None:
+        return None
+    return {
+        "title": modal.title,
+        "blocks": [
+            {"type": b.type, "content": b.content, "order": b.order}
+            for b in sorted(modal.blocks, key=lambda b: b.order or 0)
+        ],
+    }
+
+
+def _works_part(section: Optional[StudentWorksSection]) -> Optional[dict]:
+    if section is None:
+        return None
+    return {
+        "title": section.title,
+        "description": section.description,
+        "works": [
+            {"image": w.image, "description": w.description, "bot_tag": w.bot_tag, "order": w.order}
+            for w in sorted(section.works, key=lambda w: w.order or 0)
+        ],
+    }
+
+
+async def build_course_page(course_id: int) -> dict:
+    async with async_session_maker() as db:
+        res = await db.execute(
+            select(Course)
+            .where(Course.id == course_id)
+            .options(
+                selectinload(Course.modal).selectinload(CourseModal.blocks),
+                selectinload(Course.student_works_sections).selectinload(StudentWorksSection.works),
+            )
+        )
+        course = res.scalar_one_or_none()
+        if not course:
+            raise HTTPException(status_code=404, detail="Курс не найден")
+
+        now = datetime.now(timezone.utc)
+        sections = sorted(course.student_works_sections, key=lambda s: s.id)
+        static = {
+            "course": _course_part(course, now),
+            "modal": _modal_part(course.modal),
+            "student_works": _works_part(sections[0] if sections else None),
+        }
+    return {
+        **static,
+        "version": hashlib.sha1(pack(static)).hexdigest()[:16],
+        "valid_until": next_discount_boundary([course], now),
+    }
+
+
+async def get_course_page_document(course_id: int) -> dict:
+    key = CacheKeys.course_page(course_id)
+    if cache.client is None:
+        return await build_course_page(course_id)
+    try:
+        item, _ = await cache.fetch(key)
+    except Exception as e:
+        logger.warning("Course page cache read failed: %s", e)
+        return await build_course_page(course_id)
+    return await cache.resolve(
+        key, item, lambda: build_course_page(course_id),
+        ttl=COURSE_PAGE_TTL, stale_ttl=COURSE_PAGE_STALE_TTL,
+        tags=[course_tag(course_id)], is_valid=is_current,
+    )
+
+
+async def get_course_page(course_id: int, user_id: Optional[int]) -> dict:
+    doc = await get_course_page_document(course_id)
+    course = doc["course"]
+
+    if course["is_free"]:
+        has_access = True
+    elif user_id:
+        has_access = await has_course(user_id, course_id)
+    else:
+        has_access = False
+
+    discount_ends_in = None
+    if course["is_discount_active"] and course["discount_until"]:
+        discount_ends_in = datetime.fromisoformat(course["discount_until"]).timestamp() - time.time()
+
+    return {
+        "version": doc["version"],
+        "course": {
+            **course,
+            "has_access": has_access,
+            "button_text": "ОТКРЫТЬ" if has_access else "ПЕРЕЙТИ К ОПЛАТЕ",
+            "discount_ends_in": discount_ends_in,
+        },
+        "modal": doc["modal"],
+        "student_works": doc["student_works"],
+    }
@@ -0,0 +1,166 @@
+# catalog_service/services/course_search.py
+
+"""
+Поиск по курсам: GET /v1/public/courses/search.
+
+- Полнотекст: generated-колонка courses_course.search_vector (models.course.SEARCH_VECTOR_SQL,
+  GIN), запрос — websearch_to_tsquery (кавычки, OR, -слово), ранг — ts_rank_cd.
+- Опечатки: :q <% title по триграммному GIN-индексу (pg_trgm), порог — SEARCH_TRGM_THRESHOLD;
+  word_similarity добавляется к рангу, так что точные совпадения остаются выше.
+- Страницы — keyset по (score DESC, id): курсор кодирует последнюю пару, без OFFSET.
+- ts_headline (дорогой) считается только для строк страницы.
+- Результат страницы кэшируется как документ без прав под тегом "courses" (сбрасывают
+  админские ручки курсов) с границей годности по скидкам, как services/course_list.py;
+  has_access накладывается на запросе.
+"""
+
+import base64
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import load_only
+
+from core.config import settings
+from db.init_db import async_session_maker
+from models.course import Course, SEARCH_CONFIG
+from services.access import fill_entitlements, load_entitlements, parse_entitlements
+from services.course_list import LIST_COLUMNS, course_item, is_current, next_discount_boundary
+from utils.cache import cache, CacheKeys
+
+logger = logging.getLogger(__name__)
+
+SEARCH_STALE_TTL = 30
+TRGM_WEIGHT = 0.5  # вклад word_similarity(title) в ранг
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=\" … \""
+
+_PAGE_SQL = """
+WITH q AS (SELECT websearch_to_tsquery(CAST(:cfg AS regconfig), :q) AS tsq),
+hits AS (
+    SELECT c.id,
+           CAST(ts_rank_cd(c.search_vector, q.tsq) AS float8)
+             + CAST(word_similarity(:q, c.title) AS float8) * :trgm_weight AS score
+    FROM courses_course c, q
+    WHERE c.search_vector @@ q.tsq OR :q <% c.title
+)
+SELECT id, score FROM hits
+{after}
+ORDER BY score DESC, id
+LIMIT :limit
+"""
+_AFTER_SQL = "WHERE score < CAST(:after_score AS float8) OR (score = CAST(:after_score AS float8) AND id > :after_id)"
+
+_HEADLINE_SQL = """
+WITH q AS (SELECT websearch_to_tsquery(CAST(:cfg AS regconfig), :q) AS tsq)
+SELECT c.id,
+       ts_headline(CAST(:cfg AS regconfig), c.title, q.tsq, :opts),
+       ts_headline(CAST(:cfg AS regconfig), coalesce(c.short_description, '') || ' ' || coalesce(c.full_description, ''), q.tsq, :opts)
+FROM courses_course c, q
+WHERE c.id = ANY(:ids)
+"""
+
+
+def normalize(q: str) -> str:
+    return " ".join(q.split()).lower()
+
+
+def encode_cursor(score: float, course_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{score!r}:{course_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """ValueError — курсор битый."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, course_id = raw.split(":")
+        return float(score), int(course_id)
+    except Exception:
+        raise ValueError("Некорректный курсор")
+
+
+async def build_search_page(q: str, after: Optional[Tuple[float, int]], limit: int) -> dict:
+    params = {"cfg": SEARCH_CONFIG, "q": q, "trgm_weight": TRGM_WEIGHT, "limit": limit + 1}
+    if after is not None:
+        params["after_score"], params["after_id"] = after
+    async with async_session_maker() as db:
+        # порог только для этой транзакции (оператор <% читает GUC)
+        await db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :t, true)"),
+            {"t": str(settings.SEARCH_TRGM_THRESHOLD)},
+        )
+        rows = (await db.execute(
+            text(_PAGE_SQL.format(after=_AFTER_SQL if after is not None else "")), params
+        )).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        ids = [r.id for r in rows]
+        courses, headlines = {}, {}
+        if ids:
+            res = await db.execute(select(Course).options(load_only(*LIST_COLUMNS)).where(Course.id.in_(ids)))
+            courses = {c.id: c for c in res.scalars().all()}
+            res = await db.execute(
+                text(_HEADLINE_SQL), {"cfg": SEARCH_CONFIG, "q": q, "opts": HEADLINE_OPTIONS, "ids": ids}
+            )
+            headlines = {r[0]: (r[1], r[2]) for r in res.all()}
+
+    now = datetime.now(timezone.utc)
+    items = []
+    for r in rows:
+        course = courses.get(r.id)
+        if course is None:
+            continue  # удалён между запросами
+        title_hl, snippet = headlines.get(r.id, (course.title, ""))
+        items.append({
+            **course_item(course, now),
+            "score": round(r.score, 6),
+            "title_highlight": title_hl,
+            "snippet": snippet,
+        })
+    last = rows[-1] if rows else None
+    return {
+        "query": q,
+        "valid_until": next_discount_boundary(list(courses.values()), now),
+        "results": items,
+        "next_cursor": encode_cursor(last.score, last.id) if has_more and last else None,
+    }
+
+
+async def search_courses(q: str, cursor: Optional[str], limit: int, user_id: Optional[int]) -> dict:
+    q = normalize(q)
+    after = decode_cursor(cursor) if cursor else None
+    key = CacheKeys.course_search(hashlib.sha1(f"{q}\x00{cursor or ''}\x00{limit}".encode()).hexdigest()[:24])
+
+    async def loader():
+        return await build_search_page(q, after, limit)
+
+    doc = owned = None
+    if cache.client is not None:
+        extra = [lambda pipe: pipe.hgetall(CacheKeys.entitlements(user_id))] if user_id else []
+        try:
+            item, rest = await cache.fetch(key, *extra)
+        except Exception as e:
+            logger.warning("Course search cache read failed: %s", e)
+        else:
+            doc = await cache.resolve(
+                key, item, loader,
+                ttl=settings.SEARCH_CACHE_TTL, stale_ttl=SEARCH_STALE_TTL, tags=["courses"], is_valid=is_current,
+            )
+            if user_id:
+                owned = parse_entitlements(rest[0])
+                if owned is None:
+                    owned = await fill_entitlements(user_id)
+    if doc is None:
+        doc = await loader()
+        owned = await load_entitlements(user_id) if user_id else None
+
+    if owned:
+        doc = {
+            **doc,
+            "results": [
+                {**c, "has_access": True} if c["id"] in owned and not c["has_access"] else c
+                for c in doc["results"]
+            ],
+        }
+    return doc
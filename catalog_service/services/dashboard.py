@@ -0,0 +1,152 @@
+# catalog_service/services/dashboard.py
+
+"""
+Dashboard пользователя (GET /v1/public/dashboard/) одним ответом вместо списка курсов,
+прогресса по каждому курсу и баланса отдельными запросами клиента.
+
+- Курсы пользователя — права из services.access (Redis, при промахе — courses_courseaccess).
+- Прогресс всех курсов — один POST learning /v1/internal/progress/batch, параллельно
+  с балансом из points (/v1/internal/points/balance/{id}).
+- Личная часть кэшируется на пользователя под тегом dashboard:{id}. Сброс по событиям:
+  права — двигают entitlements_version; прогресс и баланс — learning / points зовут
+  POST /v1/internal/dashboard/invalidate (версия тега dashboard:{id}). Обе версии читаются
+  тем же pipeline, что и документ, и записываются в него до сборки — сборка, которую
+  обогнало событие, при следующем чтении не пройдёт сверку.
+- Название и картинка курса накладываются на запросе из документа списка курсов —
+  правка курса не сбрасывает dashboard'ы всех пользователей.
+- Если learning или points не ответили — partial, такой документ живёт DASHBOARD_PARTIAL_TTL.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from core.config import settings
+from services.access import get_entitlements
+from services.course_list import get_course_list_document
+from utils.cache import cache, CacheKeys, dashboard_tag
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_STALE_TTL = 60
+
+
+def _hdr() -> dict:
+    return {"Authorization": f"Bearer {settings.INTERNAL_TOKEN}"}
+
+
+async def fetch_progress(user_id: int, course_ids: List[int]) -> Optional[Dict[int, dict]]:
+    """{course_id: {total_modules, completed_modules, progress_percent}}; None — learning недоступен."""
+    if not course_ids:
+        return {}
+    try:
+        async with httpx.AsyncClient(timeout=settings.DASHBOARD_UPSTREAM_TIMEOUT) as client:
+            r = await client.post(
+                f"{settings.LEARNING_SERVICE_URL}/v1/internal/progress/batch",
+                json={"user_id": user_id, "course_ids": course_ids},
+                headers=_hdr(),
+            )
+            r.raise_for_status()
+            return {int(k): v for k, v in r.json()["courses"].items()}
+    except Exception as e:
+        logger.warning("Progress batch failed for user %s: %s", user_id, e)
+        return None
+
+
+async def fetch_balance(user_id: int) -> Optional[int]:
+    try:
+        async with httpx.AsyncClient(timeout=settings.DASHBOARD_UPSTREAM_TIMEOUT) as client:
+            r = await client.get(
+                f"{settings.POINTS_SERVICE_URL}/v1/internal/points/balance/{user_id}", headers=_hdr()
+            )
+            r.raise_for_status()
+            return int(r.json()["balance"])
+    except Exception as e:
+        logger.warning("Points balance failed for user %s: %s", user_id, e)
+        return None
+
+
+async def build_dashboard(user_id: int, versions: List[int]) -> dict:
+    owned = await get_entitlements(user_id)
+    course_ids = sorted(owned, key=lambda cid: owned[cid], reverse=True)  # новые покупки сверху
+    progress, balance = await asyncio.gather(fetch_progress(user_id, course_ids), fetch_balance(user_id))
+
+    courses = []
+    for course_id in course_ids:
+        p = (progress or {}).get(course_id) or {}
+        total, completed = p.get("total_modules", 0), p.get("completed_modules", 0)
+        courses.append({
+            "course_id": course_id,
+            "purchased_at": owned[course_id] or None,
+            "progress_percent": float(p.get("progress_percent", 0.0)),
+            "is_completed": bool(total) and completed >= total,
+            "total_modules": total,
+            "completed_modules": completed,
+        })
+    return {
+        "user_id": user_id,
+        "versions": versions,
+        "built_at": time.time(),
+        "partial": progress is None or balance is None,
+        "points_balance": balance,
+        "courses": courses,
+    }
+
+
+def _compose(doc: dict, catalog: dict) -> dict:
+    """Личная часть + название/картинка из списка курсов; статистика по курсам, что ещё есть в каталоге."""
+    info = {c["id"]: c for c in catalog["courses"]}
+    courses = [
+        {**c, "course_title": info[c["course_id"]]["title"], "image": info[c["course_id"]]["image"]}
+        for c in doc["courses"] if c["course_id"] in info
+    ]
+    total = len(courses)
+    return {
+        "user_id": doc["user_id"],
+        "stats": {
+            "total_courses": total,
+            "completed_courses": sum(1 for c in courses if c["is_completed"]),
+            "total_progress_percent": round(sum(c["progress_percent"] for c in courses) / total, 2) if total else 0.0,
+            "total_study_time": None,
+        },
+        "courses": courses,
+        "points_balance": doc["points_balance"],
+        "partial": doc["partial"],
+    }
+
+
+async def get_user_dashboard(user_id: int) -> dict:
+    doc = None
+    if cache.client is not None:
+        key = CacheKeys.dashboard(user_id)
+        try:
+            item, raw_versions = await cache.fetch(
+                key,
+                lambda pipe: pipe.get(CacheKeys.entitlements_version(user_id)),
+                lambda pipe: pipe.get(CacheKeys.version(dashboard_tag(user_id))),
+            )
+        except Exception as e:
+            logger.warning("Dashboard cache read failed for user %s: %s", user_id, e)
+        else:
+            versions = [int(v or 0) for v in raw_versions]
+
+            def is_valid(d: dict) -> bool:
+                if d["versions"] != versions:
+                    return False  # права, прогресс или баланс изменились после сборки
+                return not d["partial"] or d["built_at"] > time.time() - settings.DASHBOARD_PARTIAL_TTL
+
+            doc = await cache.resolve(
+                key, item, lambda: build_dashboard(user_id, versions),
+                ttl=settings.DASHBOARD_TTL, stale_ttl=DASHBOARD_STALE_TTL,
+                tags=[dashboard_tag(user_id)], is_valid=is_valid,
+            )
+    if doc is None:
+        doc = await build_dashboard(user_id, [])
+    return _compose(doc, await get_course_list_document())
+
+
+async def invalidate_dashboard(*user_ids: int) -> None:
+    await cache.invalidate(*[dashboard_tag(user_id) for user_id in user_ids])
@@ -0,0 +1,240 @@
+# catalog_service/services/enrollment_events.py
+
+"""
+Поток событий доступа (grant / revoke) для других сервисов: transactional outbox -> Redis Stream.
+
+- Запись: add_event() / BULK_OUTBOX_SQL / COURSE_DELETE_SQL в той же транзакции, что INSERT/DELETE
+  courses_courseaccess — событие есть тогда и только тогда, когда закоммичен доступ.
+- Релей: фоновая задача в каждом воркере; публикует один из них — под
+  pg_try_advisory_xact_lock, пачкой по RELAY_BATCH в порядке id: XADD в
+  catalog:v1:enrollment (MAXLEN ~ ENROLLMENT_STREAM_MAXLEN), затем published_at.
+  Будится notify() после commit в этом воркере, иначе — раз в OUTBOX_POLL_SECONDS.
+- Доставка at-least-once: падение между XADD и UPDATE даёт повтор; в каждом
+  сообщении outbox_id — потребитель дедуплицирует по нему.
+- Потребители — consumer groups (XREADGROUP / XACK, зависшие — XAUTOCLAIM); пример —
+  scripts/enrollment_consumer.py. Повтор: set_group_offset() — с id сообщения в потоке,
+  republish_from() — заново из outbox (то, что уже срезал MAXLEN).
+- Отставание: lag() — хвост outbox и по каждой группе pending / lag из XINFO GROUPS.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.init_db import async_session_maker
+from models.enrollment_outbox import EnrollmentOutbox
+from utils.cache import cache, PREFIX
+
+logger = logging.getLogger(__name__)
+
+STREAM = f"{PREFIX}:enrollment"
+RELAY_BATCH = 500
+RELAY_LOCK_KEY = 0x656E726F6C6C  # pg_advisory lock, общий для всех воркеров
+CLEANUP_SECONDS = 3600
+
+# события пакетного задания (services/entitlement_jobs.py) — одним INSERT ... SELECT
+BULK_OUTBOX_SQL = """
+INSERT INTO enrollment_outbox (event, user_id, course_id, source, occurred_at)
+SELECT CAST(:event AS varchar), user_id, course_id, CAST(:source AS varchar), CAST(:now AS timestamp)
+FROM entitlement_job_rows
+WHERE job_id = :job_id AND outcome = :outcome
+ORDER BY line
+"""
+
+# удаление курса: права удаляем сами, а не ON DELETE CASCADE, — чтобы на каждое было revoke
+COURSE_DELETE_SQL = """
+WITH gone AS (
+    DELETE FROM courses_courseaccess WHERE course_id = ANY(:course_ids)
+    RETURNING user_id, course_id
+), events AS (
+    INSERT INTO enrollment_outbox (event, user_id, course_id, source, occurred_at)
+    SELECT 'revoke', user_id, course_id, 'course_delete', CAST(:now AS timestamp) FROM gone
+)
+SELECT user_id, course_id FROM gone
+"""
+
+
+def add_event(db: AsyncSession, event: str, user_id: int, course_id: int, source: str) -> None:
+    """Без commit — событие коммитится вместе с изменением CourseAccess."""
+    db.add(EnrollmentOutbox(event=event, user_id=user_id, course_id=course_id, source=source))
+
+
+def _fields(row: EnrollmentOutbox) -> Dict[str, str]:
+    return {
+        "outbox_id": str(row.id),
+        "event": row.event,
+        "user_id": str(row.user_id),
+        "course_id": str(row.course_id),
+        "source": row.source or "",
+        "occurred_at": row.occurred_at.isoformat(),
+    }
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class EnrollmentRelay:
+    def __init__(self):
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_cleanup = 0.0
+        self.stats = {"published": 0, "batches": 0, "errors": 0, "last_outbox_id": None}
+
+    def notify(self) -> None:
+        """После commit с событиями — опубликовать сразу, не дожидаясь опроса."""
+        self._wake.set()
+
+    async def publish_batch(self) -> int:
+        if cache.client is None:
+            return 0
+        async with async_session_maker() as db:
+            if not (await db.execute(select(func.pg_try_advisory_xact_lock(RELAY_LOCK_KEY)))).scalar():
+                await db.rollback()
+                return 0  # публикует другой воркер
+            res = await db.execute(
+                select(EnrollmentOutbox)
+                .where(EnrollmentOutbox.published_at.is_(None))
+                .order_by(EnrollmentOutbox.id)
+                .limit(RELAY_BATCH)
+            )
+            rows = res.scalars().all()
+            if not rows:
+                await db.rollback()
+                return 0
+            async with cache.client.pipeline(transaction=False) as pipe:
+                for row in rows:
+                    pipe.xadd(STREAM, _fields(row), maxlen=settings.ENROLLMENT_STREAM_MAXLEN, approximate=True)
+                await pipe.execute()
+            await db.execute(
+                update(EnrollmentOutbox)
+                .where(EnrollmentOutbox.id.in_([row.id for row in rows]))
+                .values(published_at=datetime.utcnow())
+            )
+            await db.commit()
+        self.stats["published"] += len(rows)
+        self.stats["batches"] += 1
+        self.stats["last_outbox_id"] = rows[-1].id
+        return len(rows)
+
+    async def cleanup(self) -> None:
+        cutoff = datetime.utcnow() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+        async with async_session_maker() as db:
+            await db.execute(
+                delete(EnrollmentOutbox).where(
+                    EnrollmentOutbox.published_at.isnot(None), EnrollmentOutbox.published_at < cutoff
+                )
+            )
+            await db.commit()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                published = await self.publish_batch()
+                if time.monotonic() - self._last_cleanup > CLEANUP_SECONDS:
+                    self._last_cleanup = time.monotonic()
+                    await self.cleanup()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning("Enrollment relay failed: %s", e)
+                published = 0
+            if published == RELAY_BATCH:
+                continue  # хвост ещё есть
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+relay = EnrollmentRelay()
+
+
+# ---------- consumer groups ----------
+
+async def ensure_group(group: str, start: str = "$") -> bool:
+    """XGROUP CREATE ... MKSTREAM; start: "$" — только новые, "0" — весь поток. False — группа уже есть."""
+    try:
+        await cache.client.xgroup_create(STREAM, group, id=start, mkstream=True)
+        return True
+    except Exception as e:
+        if "BUSYGROUP" in str(e):
+            return False
+        raise
+
+
+async def set_group_offset(group: str, stream_id: str) -> None:
+    """Повтор: группа получит всё после stream_id заново (XGROUP SETID)."""
+    await cache.client.xgroup_setid(STREAM, group, id=stream_id)
+
+
+async def read_events(after: str = "-", count: int = 100) -> List[dict]:
+    """XRANGE после after (не включая) — чтение без группы, для отладки и дозагрузки."""
+    start = after if after in ("-", "0") else f"({after}"
+    entries = await cache.client.xrange(STREAM, min=start, max="+", count=count)
+    return [
+        {"id": _decode(entry_id), **{_decode(k): _decode(v) for k, v in fields.items()}}
+        for entry_id, fields in entries
+    ]
+
+
+async def republish_from(db: AsyncSession, outbox_id: int) -> int:
+    """Заново поставить в очередь релея события начиная с outbox_id (в пределах хранения)."""
+    res = await db.execute(
+        update(EnrollmentOutbox)
+        .where(EnrollmentOutbox.id >= outbox_id, EnrollmentOutbox.published_at.isnot(None))
+        .values(published_at=None)
+    )
+    await db.commit()
+    relay.notify()
+    return res.rowcount
+
+
+async def lag(db: AsyncSession) -> dict:
+    backlog, oldest = (await db.execute(
+        select(func.count(), func.min(EnrollmentOutbox.occurred_at)).where(EnrollmentOutbox.published_at.is_(None))
+    )).one()
+    out = {
+        "outbox_pending": backlog,
+        "outbox_oldest_age_seconds": (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0,
+        "stream": None,
+        "groups": [],
+    }
+    if cache.client is None:
+        return out
+    try:
+        info = await cache.client.xinfo_stream(STREAM)
+        groups = await cache.client.xinfo_groups(STREAM)
+    except Exception as e:
+        if "no such key" in str(e).lower():
+            return out
+        raise
+    out["stream"] = {"length": info["length"], "last_id": _decode(info["last-generated-id"])}
+    out["groups"] = [
+        {
+            "name": _decode(g["name"]),
+            "consumers": g["consumers"],
+            "pending": g["pending"],
+            "last_delivered_id": _decode(g["last-delivered-id"]),
+            "lag": g.get("lag"),  # Redis >= 7; None — неизвестно (после XDEL/обрезки)
+        }
+        for g in groups
+    ]
+    return out
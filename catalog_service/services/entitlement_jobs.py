@@ -0,0 +1,334 @@
+# catalog_service/services/entitlement_jobs.py
+
+"""
+Пакетная выдача и отзыв доступов: сотни тысяч строк (user_id, course_id[, source]) за один проход.
+
+1. Приём (api/internal/entitlements.py): тело запроса — CSV или NDJSON — потоком пишется
+   во временный файл, строки считаются, создаётся entitlement_jobs, ответ 202 сразу.
+2. Фоновая задача в том же воркере, одна транзакция на одном соединении:
+   - COPY разобранных строк пачками по COPY_CHUNK во временную таблицу entitlement_stage
+     (ON COMMIT DROP); неразобранные строки тоже попадают туда — с user_id NULL;
+   - один statement: CTE INSERT INTO courses_courseaccess ... ON CONFLICT DO NOTHING
+     RETURNING (или DELETE ... USING для revoke) + INSERT итога каждой строки
+     в entitlement_job_rows;
+   - для grant — строки журнала покупок (source='bulk', сумма 0) и агрегаты выручки;
+   - события enrollment_outbox (services/enrollment_events.py);
+   - commit, затем write-through кэша прав пачками (access.record_bulk).
+3. Прогресс (phase, staged_rows, счётчики) пишется отдельной сессией — его видно
+   GET /jobs/{id}, пока основная транзакция не закоммичена.
+
+Задача живёт в памяти воркера: если воркер упал, задание останется running — его
+можно перезапустить тем же файлом, повтор идемпотентен (already_granted / not_granted).
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.init_db import async_session_maker
+from models.entitlement_job import EntitlementJob, EntitlementJobRow
+from services.access import record_bulk
+from services.enrollment_events import BULK_OUTBOX_SQL, relay
+
+logger = logging.getLogger(__name__)
+
+MAX_ROWS = 2_000_000
+COPY_CHUNK = 50_000
+CACHE_CHUNK = 5_000
+MAX_CONCURRENT_JOBS = 2
+APPLIED = {"grant": "granted", "revoke": "revoked"}
+SKIPPED = ("already_granted", "not_granted", "duplicate")
+INVALID = ("invalid", "course_not_found")
+
+Row = Tuple[int, Optional[int], Optional[int], Optional[str]]
+
+_STAGE_SQL = """
+CREATE TEMP TABLE entitlement_stage (
+    line integer PRIMARY KEY,
+    user_id integer,
+    course_id integer,
+    source varchar(50)
+) ON COMMIT DROP
+"""
+
+# первая строка каждой пары (user_id, course_id) — остальные помечаются duplicate
+_FIRST_CTE = """
+first AS (
+    SELECT DISTINCT ON (user_id, course_id) line
+    FROM entitlement_stage WHERE user_id IS NOT NULL
+    ORDER BY user_id, course_id, line
+)
+"""
+
+_OUTCOMES_INSERT = """
+INSERT INTO entitlement_job_rows (job_id, line, user_id, course_id, source, outcome)
+SELECT CAST(:job_id AS integer), s.line, s.user_id, s.course_id, s.source,
+       CASE WHEN s.user_id IS NULL THEN 'invalid'
+            WHEN c.id IS NULL THEN 'course_not_found'
+            WHEN f.line IS NULL THEN 'duplicate'
+            WHEN m.user_id IS NOT NULL THEN CAST(:applied AS varchar)
+            ELSE CAST(:skipped AS varchar) END
+FROM entitlement_stage s
+LEFT JOIN courses_course c ON c.id = s.course_id
+LEFT JOIN first f ON f.line = s.line
+LEFT JOIN merged m ON m.user_id = s.user_id AND m.course_id = s.course_id
+"""
+
+_GRANT_SQL = "WITH " + _FIRST_CTE + """,
+merged AS (
+    INSERT INTO courses_courseaccess (user_id, course_id, purchased_at)
+    SELECT s.user_id, s.course_id, CAST(:now AS timestamp)
+    FROM entitlement_stage s
+    JOIN first f ON f.line = s.line
+    JOIN courses_course c ON c.id = s.course_id
+    ON CONFLICT ON CONSTRAINT uq_user_course DO NOTHING
+    RETURNING user_id, course_id
+)
+""" + _OUTCOMES_INSERT
+
+_REVOKE_SQL = "WITH " + _FIRST_CTE + """,
+merged AS (
+    DELETE FROM courses_courseaccess a
+    USING entitlement_stage s JOIN first f ON f.line = s.line
+    WHERE a.user_id = s.user_id AND a.course_id = s.course_id
+    RETURNING a.user_id, a.course_id
+)
+""" + _OUTCOMES_INSERT
+
+# журнал покупок и агрегаты (services/purchases.py) для выданных доступов, сумма 0
+_LEDGER_SQL = """
+INSERT INTO purchases (user_id, course_id, course_title, source, list_price, discount_percent,
+                       amount, currency, purchased_at)
+SELECT r.user_id, r.course_id, c.title, 'bulk', 0, 0, 0, CAST(:currency AS varchar), CAST(:now_tz AS timestamptz)
+FROM entitlement_job_rows r JOIN courses_course c ON c.id = r.course_id
+WHERE r.job_id = :job_id AND r.outcome = 'granted'
+"""
+
+_ROLLUP_SQL = """
+INSERT INTO {table} ({period}, course_id, currency, purchases, revenue)
+SELECT CAST(:period AS date), course_id, CAST(:currency AS varchar), count(*), 0
+FROM entitlement_job_rows WHERE job_id = :job_id AND outcome = 'granted'
+GROUP BY course_id
+ON CONFLICT ({period}, course_id, currency)
+DO UPDATE SET purchases = {table}.purchases + excluded.purchases
+"""
+
+_semaphore = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+_tasks: set = set()
+
+
+# ---------- разбор входа ----------
+
+def _int(value) -> Optional[int]:
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def _source(value) -> Optional[str]:
+    value = (str(value).strip() if value is not None else "")[:50]
+    return value or None
+
+
+def _parse_csv(lines: Iterator[Tuple[int, str]]) -> Iterator[Row]:
+    columns = None
+    for line_no, raw in lines:
+        fields = next(csv.reader(io.StringIO(raw)), [])
+        if columns is None:
+            columns = ["user_id", "course_id", "source"]
+            if fields and _int(fields[0]) is None and "user_id" in [f.strip().lower() for f in fields]:
+                columns = [f.strip().lower() for f in fields]  # заголовок
+                continue
+        item = dict(zip(columns, fields))
+        user_id, course_id = _int(item.get("user_id")), _int(item.get("course_id"))
+        if user_id is None or course_id is None:
+            yield line_no, None, None, None
+        else:
+            yield line_no, user_id, course_id, _source(item.get("source"))
+
+
+def _parse_ndjson(lines: Iterator[Tuple[int, str]]) -> Iterator[Row]:
+    for line_no, raw in lines:
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            item = None
+        if not isinstance(item, dict):
+            yield line_no, None, None, None
+            continue
+        user_id, course_id = _int(item.get("user_id")), _int(item.get("course_id"))
+        if user_id is None or course_id is None:
+            yield line_no, None, None, None
+        else:
+            yield line_no, user_id, course_id, _source(item.get("source"))
+
+
+def parse_rows(path: str, fmt: str) -> Iterator[Row]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        lines = ((n, raw.rstrip("\r\n")) for n, raw in enumerate(f, start=1) if raw.strip())
+        yield from (_parse_ndjson(lines) if fmt == "ndjson" else _parse_csv(lines))
+
+
+def _chunks(rows: Iterator[Row], size: int) -> Iterator[List[Row]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def spool(stream, fmt: str) -> Tuple[str, int]:
+    """Тело запроса -> временный файл; возвращает (путь, число непустых строк)."""
+    fd, path = tempfile.mkstemp(prefix="entitlements-", suffix=f".{fmt}")
+    rows, tail = 0, b""
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in stream:
+                f.write(chunk)
+                lines = (tail + chunk).split(b"\n")
+                tail = lines.pop()
+                rows += sum(1 for line in lines if line.strip())
+                if rows > MAX_ROWS:
+                    raise ValueError(f"Не больше {MAX_ROWS} строк в задании")
+        rows += 1 if tail.strip() else 0
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, rows
+
+
+# ---------- задание ----------
+
+async def create_job(op: str, total_rows: int) -> EntitlementJob:
+    async with async_session_maker() as db:
+        job = EntitlementJob(op=op, status="pending", total_rows=total_rows)
+        db.add(job)
+        await db.commit()
+        return job
+
+
+async def _progress(job_id: int, **values) -> None:
+    async with async_session_maker() as db:
+        await db.execute(update(EntitlementJob).where(EntitlementJob.id == job_id).values(**values))
+        await db.commit()
+
+
+async def _counts(db: AsyncSession, job_id: int) -> dict:
+    res = await db.execute(
+        select(EntitlementJobRow.outcome, func.count())
+        .where(EntitlementJobRow.job_id == job_id)
+        .group_by(EntitlementJobRow.outcome)
+    )
+    by_outcome = dict(res.all())
+    return {
+        "applied": sum(by_outcome.get(o, 0) for o in APPLIED.values()),
+        "skipped": sum(by_outcome.get(o, 0) for o in SKIPPED),
+        "invalid": sum(by_outcome.get(o, 0) for o in INVALID),
+    }
+
+
+async def _stage(db: AsyncSession, job_id: int, path: str, fmt: str) -> int:
+    await db.execute(text(_STAGE_SQL))
+    raw = await (await db.connection()).get_raw_connection()
+    staged = 0
+    for chunk in _chunks(parse_rows(path, fmt), COPY_CHUNK):
+        await raw.driver_connection.copy_records_to_table(
+            "entitlement_stage", records=chunk, columns=["line", "user_id", "course_id", "source"]
+        )
+        staged += len(chunk)
+        await _progress(job_id, staged_rows=staged)
+    await db.execute(text("ANALYZE entitlement_stage"))  # временные таблицы autovacuum не видит
+    return staged
+
+
+async def _merge(db: AsyncSession, job_id: int, op: str) -> datetime:
+    """Время операции берём здесь, после очереди и COPY: purchased_at / occurred_at / день выручки
+    должны быть близки к commit, иначе строки окажутся за водяным знаком агрегатов лид-магнитов."""
+    now = datetime.now(timezone.utc)
+    params = {"job_id": job_id, "applied": APPLIED[op]}
+    if op == "grant":
+        await db.execute(text(_GRANT_SQL), {**params, "skipped": "already_granted", "now": now.replace(tzinfo=None)})
+        ledger = {"job_id": job_id, "currency": settings.CURRENCY}
+        await db.execute(text(_LEDGER_SQL), {**ledger, "now_tz": now})
+        day = now.date()
+        await db.execute(text(_ROLLUP_SQL.format(table="revenue_daily", period="day")), {**ledger, "period": day})
+        await db.execute(
+            text(_ROLLUP_SQL.format(table="revenue_monthly", period="month")), {**ledger, "period": day.replace(day=1)}
+        )
+    else:
+        await db.execute(text(_REVOKE_SQL), {**params, "skipped": "not_granted"})
+    await db.execute(text(BULK_OUTBOX_SQL), {
+        "job_id": job_id, "event": op, "outcome": APPLIED[op], "source": f"bulk:{job_id}", "now": now.replace(tzinfo=None),
+    })
+    return now
+
+
+async def _write_cache(db: AsyncSession, job_id: int, op: str, now: datetime) -> None:
+    """Write-through прав после commit, пачками по CACHE_CHUNK строк."""
+    after = 0
+    purchased_at = now.replace(tzinfo=None).isoformat()
+    while True:
+        res = await db.execute(
+            select(EntitlementJobRow.line, EntitlementJobRow.user_id, EntitlementJobRow.course_id)
+            .where(
+                EntitlementJobRow.job_id == job_id,
+                EntitlementJobRow.outcome == APPLIED[op],
+                EntitlementJobRow.line > after,
+            )
+            .order_by(EntitlementJobRow.line)
+            .limit(CACHE_CHUNK)
+        )
+        rows = res.all()
+        if not rows:
+            return
+        await record_bulk([(user_id, course_id) for _, user_id, course_id in rows], op, purchased_at)
+        after = rows[-1][0]
+
+
+async def run_job(job_id: int, op: str, path: str, fmt: str) -> None:
+    try:
+        async with _semaphore:
+            await _progress(job_id, status="running", phase="staging")
+            async with async_session_maker() as db:
+                staged = await _stage(db, job_id, path, fmt)
+                await _progress(job_id, phase="merging", total_rows=staged)
+                now = await _merge(db, job_id, op)
+                await db.commit()
+                relay.notify()
+
+                await _progress(job_id, phase="cache", **await _counts(db, job_id))
+                await _write_cache(db, job_id, op, now)
+            await _progress(job_id, status="done", phase=None, finished_at=datetime.utcnow())
+            logger.info("Entitlement job %s (%s) done: %d rows", job_id, op, staged)
+    except Exception as e:
+        logger.error("Entitlement job %s failed: %s", job_id, e)
+        await _progress(job_id, status="failed", error=str(e)[:2000], finished_at=datetime.utcnow())
+    finally:
+        os.unlink(path)
+
+
+def start_job(job_id: int, op: str, path: str, fmt: str) -> None:
+    task = asyncio.create_task(run_job(job_id, op, path, fmt))
+    _tasks.add(task)  # ссылка, чтобы задачу не собрал GC
+    task.add_done_callback(_tasks.discard)
+
+
+async def stop_jobs() -> None:
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
@@ -0,0 +1,221 @@
+# catalog_service/services/homepage.py
+
+"""
+Снимок главной страницы: баннеры + публичная сетка курсов одним готовым ответом.
+
+Снимок собирается редко (админские изменения баннеров/курсов и границы скидок),
+сразу сериализуется в JSON и сжимается gzip, и живёт в памяти каждого воркера.
+Горячий путь (api/public/homepage.py) не ходит ни в БД, ни в Redis.
+
+Распространение:
+- пересборка: cache.invalidate("banners" | "courses") в любом воркере → фоновая
+  пересборка там же → SET catalog:v1:homepage + PUBLISH в одноимённый канал;
+- остальные воркеры подписаны на канал и подменяют снимок из сообщения;
+- фоновый цикл раз в HOMEPAGE_SYNC_SECONDS сверяет ETag с ключом в Redis (на случай
+  пропущенного сообщения pub/sub) и к valid_until пересобирает снимок под SET NX lock,
+  чтобы цены со скидками переключались без участия админки.
+Сетка — анонимная (has_access только у бесплатных); права пользователя фронт
+накладывает из /v1/public/courses.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+
+from core.config import settings
+from db.init_db import async_session_maker
+from models.banner import Banner
+from schemas.banner import BannerSchema
+from services.course_list import build_course_list
+from utils.cache import cache, PREFIX, pack, unpack
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = f"{PREFIX}:homepage"
+CHANNEL = f"{PREFIX}:homepage"
+LOCK_KEY = f"{PREFIX}:homepage:lock"
+LOCK_TTL_MS = 30000
+TAGS = frozenset({"banners", "courses"})
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    etag: str
+    built_at: float
+    valid_until: Optional[float]
+    body: bytes
+    gzip: bytes
+
+    def dump(self) -> bytes:
+        return pack([self.etag, self.built_at, self.valid_until, self.body, self.gzip])
+
+    @classmethod
+    def load(cls, blob: bytes) -> "Snapshot":
+        return cls(*unpack(blob))
+
+
+async def build_snapshot() -> Snapshot:
+    async with async_session_maker() as db:
+        res = await db.execute(select(Banner).order_by(Banner.order.asc()))
+        banners = [BannerSchema.model_validate(b).model_dump() for b in res.scalars().all()]
+    courses = await build_course_list()
+
+    body = json.dumps(
+        {"banners": banners, "courses": courses["courses"], "built_at": courses["built_at"]},
+        ensure_ascii=False, separators=(",", ":"), default=str,
+    ).encode()
+    return Snapshot(
+        etag='"' + hashlib.sha1(body).hexdigest()[:20] + '"',
+        built_at=courses["built_at"],
+        valid_until=courses["valid_until"],
+        body=body,
+        gzip=gzip.compress(body, compresslevel=9, mtime=0),
+    )
+
+
+class HomepageSnapshot:
+    def __init__(self):
+        self.current: Optional[Snapshot] = None
+        self._tasks: list = []
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._warmup = asyncio.Lock()
+
+    # ---------- публикация ----------
+
+    def _apply(self, snapshot: Snapshot, source: str) -> None:
+        if self.current is not None and self.current.etag == snapshot.etag:
+            return
+        # новее только по времени сборки: запоздалое сообщение не откатывает снимок
+        if self.current is not None and snapshot.built_at < self.current.built_at:
+            return
+        self.current = snapshot
+        logger.info("Homepage snapshot %s applied (%s, %d bytes gzip)", snapshot.etag, source, len(snapshot.gzip))
+
+    async def rebuild(self) -> Snapshot:
+        snapshot = await build_snapshot()
+        self._apply(snapshot, "local")
+        if cache.client is not None:
+            try:
+                blob = snapshot.dump()
+                async with cache.client.pipeline(transaction=False) as pipe:
+                    pipe.set(SNAPSHOT_KEY, blob)
+                    pipe.publish(CHANNEL, blob)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning("Homepage snapshot publish failed: %s", e)
+        return snapshot
+
+    def _on_invalidate(self, tags: tuple) -> None:
+        if TAGS.intersection(tags):
+            self.schedule_rebuild()
+
+    def schedule_rebuild(self) -> None:
+        """Пачка админских изменений подряд схлопывается в одну-две пересборки."""
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            self._dirty = True
+            return
+
+        async def run():
+            while True:
+                self._dirty = False
+                try:
+                    await self.rebuild()
+                except Exception as e:
+                    logger.error("Homepage snapshot rebuild failed: %s", e)
+                if not self._dirty:
+                    return
+
+        self._rebuild_task = asyncio.create_task(run())
+
+    # ---------- синхронизация воркеров ----------
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = cache.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._apply(Snapshot.load(message["data"]), "pubsub")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Homepage subscription lost, reconnecting: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def _sync(self) -> None:
+        """Пересборка к границе скидки (один воркер под lock) или сверка с Redis."""
+        snapshot = self.current
+        if snapshot is not None and snapshot.valid_until is not None and snapshot.valid_until <= time.time():
+            if cache.client is None:
+                await self.rebuild()
+                return
+            if await cache.client.set(LOCK_KEY, b"1", nx=True, px=LOCK_TTL_MS):
+                try:
+                    await self.rebuild()
+                finally:
+                    await cache.client.delete(LOCK_KEY)
+                return
+        if cache.client is not None:
+            blob = await cache.client.get(SNAPSHOT_KEY)
+            if blob is not None:
+                self._apply(Snapshot.load(blob), "redis")
+
+    async def _sync_loop(self) -> None:
+        while True:
+            delay = settings.HOMEPAGE_SYNC_SECONDS
+            snapshot = self.current
+            if snapshot is not None and snapshot.valid_until is not None:
+                delay = min(delay, max(snapshot.valid_until - time.time(), 0) + 0.5)
+            await asyncio.sleep(delay)
+            try:
+                await self._sync()
+            except Exception as e:
+                logger.warning("Homepage snapshot sync failed: %s", e)
+
+    # ---------- жизненный цикл ----------
+
+    async def start(self) -> None:
+        cache.on_invalidate(self._on_invalidate)
+        try:
+            blob = await cache.client.get(SNAPSHOT_KEY) if cache.client is not None else None
+            if blob is not None:
+                self._apply(Snapshot.load(blob), "redis")
+            else:
+                await self.rebuild()
+        except Exception as e:
+            logger.error("Homepage snapshot warm-up failed: %s", e)
+        if cache.client is not None:
+            self._tasks.append(asyncio.create_task(self._listen()))
+        self._tasks.append(asyncio.create_task(self._sync_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def get(self) -> Snapshot:
+        """Горячий путь — только память; сборка лишь если снимка ещё нет."""
+        if self.current is None:
+            async with self._warmup:
+                if self.current is None:
+                    return await self.rebuild()
+        return self.current
+
+
+homepage = HomepageSnapshot()
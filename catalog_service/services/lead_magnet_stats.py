@@ -1,54 +1,294 @@
 # catalog_service/services/lead_magnet_stats.py
 
-from httpx import AsyncClient
+"""
+Конверсия связки «лид-курс → апселл» прямо по courses_courseaccess.
+
+Лид — доступ к lead_course_id; конверсия — доступ того же пользователя к upsell_course_id,
+полученный не раньше лид-курса. Одна выборка на связку: лиды по
+ix_courseaccess_course_purchased + LEFT JOIN апселла по uq_user_course (user_id, course_id).
+
+- live (exact=True): счётчики и точные перцентили time-to-convert (percentile_cont)
+  за окно когорт [since, until) — один запрос;
+- rollup (по умолчанию): marketing_lead_magnet_daily — когорта за день: leads, converted и
+  накопительная гистограмма converted_within по TTC_BOUNDS_HOURS. Окна и перцентили
+  (интерполяцией внутри корзины) считаются из строк за дни окна.
+  refresh_lead_magnet() пересчитывает только дни, затронутые доступами новее водяного
+  знака stats_refreshed_at (новые лиды и лиды, купившие апселл); отзыв доступа водяной
+  знак не видит — full=True пересобирает связку целиком.
+  Пересчёт не делается на чтении: его зовут POST .../stats/refresh и фоновый refresher
+  (раз в LEAD_MAGNET_REFRESH_SECONDS, по связке под pg_try_advisory_xact_lock). Пока агрегата
+  нет вовсе, GET отвечает live-расчётом.
+
+Нагрузочная проверка на 1M доступов — scripts/bench_lead_magnet_stats.py.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Date, Integer, and_, cast, delete, func, literal, select, union, update
+from sqlalchemy.dialects.postgresql import array, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.orm import aliased
 
-from catalog_service.models.lead_magnet import LeadMagnet
+from core.config import settings
+from db.init_db import async_session_maker
+from models.access import CourseAccess
+from models.lead_magnet import LeadMagnet, LeadMagnetDaily
 
+logger = logging.getLogger(__name__)
 
-async def fetch_user_course_ids(user_id: int, client: AsyncClient) -> list[int]:
-    resp = await client.get(f"http://adminservice/internal/users/{user_id}/courses")
-    resp.raise_for_status()
-    payload = resp.json()
-    return [c["course_id"] for c in payload.get("courses", [])]
+TTC_BOUNDS_HOURS = (1, 6, 24, 72, 168, 336, 720, 2160)
+PERCENTILES = (0.5, 0.9)
+# доступ пишется с purchased_at до commit — перекрытие, чтобы поздний commit не проскочил водяной знак
+REFRESH_OVERLAP = timedelta(minutes=10)
+REFRESH_LOCK_KEY = 0x6C65616D  # pg_advisory lock (ключ, lead_magnet_id), общий для воркеров
 
 
-async def calculate_lead_magnet_stats(
-    lead_magnet_id: int,
-    session: AsyncSession,
-    client: AsyncClient,
-) -> dict:
-    # Получаем связку
+async def get_lead_magnet(session: AsyncSession, lead_magnet_id: int) -> LeadMagnet:
     result = await session.execute(select(LeadMagnet).where(LeadMagnet.id == lead_magnet_id))
     lead_magnet = result.scalar_one_or_none()
     if not lead_magnet:
-        raise ValueError("Связка не найдена")
+        raise HTTPException(status_code=404, detail="Связка не найдена")
+    return lead_magnet
 
-    lead_course_id = lead_magnet.lead_course_id
-    upsell_course_id = lead_magnet.upsell_course_id
 
-    # Получаем пользователей, купивших лид-курс
-    resp = await client.get(f"http://adminservice/internal/analytics/users-with-course/{lead_course_id}")
-    resp.raise_for_status()
-    user_ids = resp.json()  # список user_id
+def _cohort(lead_magnet: LeadMagnet):
+    """(lead, upsell, ttc_seconds, onclause) — апселл, купленный не раньше лид-курса."""
+    lead = aliased(CourseAccess, name="lead")
+    upsell = aliased(CourseAccess, name="upsell")
+    onclause = and_(
+        upsell.user_id == lead.user_id,
+        upsell.course_id == lead_magnet.upsell_course_id,
+        upsell.purchased_at >= lead.purchased_at,
+    )
+    ttc = func.extract("epoch", upsell.purchased_at - lead.purchased_at)
+    return lead, upsell, ttc, onclause
 
-    total_leads = len(user_ids)
-    bought_upsell = 0
 
-    for user_id in user_ids:
-        try:
-            course_ids = await fetch_user_course_ids(user_id, client)
-            if upsell_course_id in course_ids:
-                bought_upsell += 1
-        except Exception:
-            continue  # пропускаем ошибки по пользователю
+def _window(lead, since: Optional[date], until: Optional[date]) -> list:
+    clauses = []
+    if since is not None:
+        clauses.append(lead.purchased_at >= datetime.combine(since, datetime.min.time()))
+    if until is not None:
+        clauses.append(lead.purchased_at < datetime.combine(until, datetime.min.time()))
+    return clauses
 
-    conversion = round(bought_upsell / total_leads, 2) if total_leads > 0 else 0.0
 
+def _result(leads: int, converted: int, percentiles: Dict[str, Optional[float]], within: Dict[str, int]) -> dict:
     return {
-        "total_leads": total_leads,
+        "total_leads": leads,
         "viewed_upsell_page": None,  # пока не реализовано
-        "bought_upsell": bought_upsell,
-        "conversion": conversion,
+        "bought_upsell": converted,
+        "conversion": round(converted / leads, 4) if leads else 0.0,
+        "time_to_convert_hours": percentiles,
+        "converted_within_hours": within,
+    }
+
+
+# ---------- точный расчёт ----------
+
+async def compute_live(
+    session: AsyncSession,
+    lead_magnet: LeadMagnet,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> dict:
+    lead, upsell, ttc, onclause = _cohort(lead_magnet)
+    row = (await session.execute(
+        select(
+            func.count(),
+            func.count(upsell.id),
+            func.percentile_cont(array(PERCENTILES)).within_group(ttc),
+            *[func.count().filter(ttc <= h * 3600) for h in TTC_BOUNDS_HOURS],
+        )
+        .select_from(lead)
+        .outerjoin(upsell, onclause)
+        .where(
+            lead.course_id == lead_magnet.lead_course_id,
+            lead.purchased_at.isnot(None),  # как в агрегате: без даты когорты лида нет
+            *_window(lead, since, until),
+        )
+    )).one()
+    leads, converted, values, *within = row
+    percentiles = {
+        f"p{int(p * 100)}": (round(v / 3600, 2) if v is not None else None)
+        for p, v in zip(PERCENTILES, values or [None] * len(PERCENTILES))
+    }
+    return _result(leads, converted, percentiles, {str(h): n for h, n in zip(TTC_BOUNDS_HOURS, within)})
+
+
+# ---------- rollup ----------
+
+def _percentile(p: float, converted: int, cumulative: Sequence[int]) -> Optional[float]:
+    """Линейная интерполяция внутри корзины; None — перцентиль за последней границей."""
+    if not converted:
+        return None
+    target = p * converted
+    prev_bound, prev_count = 0, 0
+    for bound, count in zip(TTC_BOUNDS_HOURS, cumulative):
+        if count >= target:
+            if count == prev_count:
+                return float(bound)
+            return round(prev_bound + (bound - prev_bound) * (target - prev_count) / (count - prev_count), 2)
+        prev_bound, prev_count = bound, count
+    return None
+
+
+async def refresh_lead_magnet(session: AsyncSession, lead_magnet: LeadMagnet, full: bool = False) -> int:
+    """Пересчитывает затронутые дни когорт и двигает водяной знак. Возвращает число дней."""
+    started = datetime.utcnow()
+    lead, upsell, ttc, onclause = _cohort(lead_magnet)
+    day = cast(lead.purchased_at, Date)
+    since = None if full or lead_magnet.stats_refreshed_at is None else lead_magnet.stats_refreshed_at - REFRESH_OVERLAP
+
+    where = [lead.course_id == lead_magnet.lead_course_id, lead.purchased_at.isnot(None)]
+    if since is not None:
+        # новые лиды + лиды, у которых с тех пор появился апселл (отдельные алиасы — без корреляции)
+        new_lead = aliased(CourseAccess, name="new_lead")
+        old_lead = aliased(CourseAccess, name="old_lead")
+        new_upsell = aliased(CourseAccess, name="new_upsell")
+        days = union(
+            select(cast(new_lead.purchased_at, Date).label("d")).where(
+                new_lead.course_id == lead_magnet.lead_course_id, new_lead.purchased_at >= since
+            ),
+            select(cast(old_lead.purchased_at, Date).label("d"))
+            .select_from(new_upsell)
+            .join(old_lead, and_(
+                old_lead.user_id == new_upsell.user_id, old_lead.course_id == lead_magnet.lead_course_id
+            ))
+            .where(new_upsell.course_id == lead_magnet.upsell_course_id, new_upsell.purchased_at >= since),
+        ).subquery("days")
+        where.append(day.in_(select(days.c.d)))
+    else:
+        await session.execute(delete(LeadMagnetDaily).where(LeadMagnetDaily.lead_magnet_id == lead_magnet.id))
+
+    rows = (
+        select(
+            literal(lead_magnet.id, Integer).label("lead_magnet_id"),
+            day.label("day"),
+            func.count().label("leads"),
+            func.count(upsell.id).label("converted"),
+            array([func.count().filter(ttc <= h * 3600) for h in TTC_BOUNDS_HOURS]).label("converted_within"),
+        )
+        .select_from(lead)
+        .outerjoin(upsell, onclause)
+        .where(*where)
+        .group_by(day)
+    )
+    stmt = pg_insert(LeadMagnetDaily).from_select(
+        ["lead_magnet_id", "day", "leads", "converted", "converted_within"], rows
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["lead_magnet_id", "day"],
+        set_={
+            "leads": stmt.excluded.leads,
+            "converted": stmt.excluded.converted,
+            "converted_within": stmt.excluded.converted_within,
+        },
+    )
+    result = await session.execute(stmt)
+    await session.execute(
+        update(LeadMagnet).where(LeadMagnet.id == lead_magnet.id).values(stats_refreshed_at=started)
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def read_rollup(
+    session: AsyncSession,
+    lead_magnet: LeadMagnet,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> dict:
+    query = select(LeadMagnetDaily.leads, LeadMagnetDaily.converted, LeadMagnetDaily.converted_within).where(
+        LeadMagnetDaily.lead_magnet_id == lead_magnet.id
+    )
+    if since is not None:
+        query = query.where(LeadMagnetDaily.day >= since)
+    if until is not None:
+        query = query.where(LeadMagnetDaily.day < until)
+
+    leads, converted = 0, 0
+    within: List[int] = [0] * len(TTC_BOUNDS_HOURS)
+    for row_leads, row_converted, row_within in (await session.execute(query)).all():
+        leads += row_leads
+        converted += row_converted
+        within = [a + b for a, b in zip(within, row_within)]
+
+    percentiles = {f"p{int(p * 100)}": _percentile(p, converted, within) for p in PERCENTILES}
+    return _result(leads, converted, percentiles, {str(h): n for h, n in zip(TTC_BOUNDS_HOURS, within)})
+
+
+async def calculate_lead_magnet_stats(
+    lead_magnet_id: int,
+    session: AsyncSession,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    exact: bool = False,
+) -> dict:
+    """Только чтение: агрегат (на момент refreshed_at) или live при exact / до первого пересчёта."""
+    lead_magnet = await get_lead_magnet(session, lead_magnet_id)
+    refreshed_at = lead_magnet.stats_refreshed_at
+    exact = exact or refreshed_at is None
+    if exact:
+        stats = await compute_live(session, lead_magnet, since, until)
+    else:
+        stats = await read_rollup(session, lead_magnet, since, until)
+    return {
+        "lead_magnet_id": lead_magnet.id, "since": since, "until": until, "exact": exact,
+        "refreshed_at": refreshed_at, **stats,
     }
+
+
+# ---------- фоновый пересчёт ----------
+
+async def refresh_all() -> int:
+    """Инкрементальный пересчёт всех связок; занятую другим воркером пропускаем. Возвращает число дней."""
+    async with async_session_maker() as session:
+        ids = (await session.execute(select(LeadMagnet.id))).scalars().all()
+    days = 0
+    for lead_magnet_id in ids:
+        async with async_session_maker() as session:
+            locked = (await session.execute(
+                select(func.pg_try_advisory_xact_lock(REFRESH_LOCK_KEY, lead_magnet_id))
+            )).scalar()
+            if not locked:
+                continue
+            lead_magnet = (await session.execute(
+                select(LeadMagnet).where(LeadMagnet.id == lead_magnet_id)
+            )).scalar_one_or_none()
+            if lead_magnet is None:
+                continue
+            days += await refresh_lead_magnet(session, lead_magnet)  # commit отпускает lock
+    return days
+
+
+class LeadMagnetRefresher:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await refresh_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Lead magnet stats refresh failed: %s", e)
+            await asyncio.sleep(settings.LEAD_MAGNET_REFRESH_SECONDS)
+
+    def start(self) -> None:
+        if settings.LEAD_MAGNET_REFRESH_SECONDS > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+refresher = LeadMagnetRefresher()
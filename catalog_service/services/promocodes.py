@@ -0,0 +1,289 @@
+# catalog_service/services/promocodes.py
+
+"""
+Погашение промокодов без блокировки строки на всё время проверки.
+
+Обычный путь — один statement (плюс commit):
+    WITH ins AS (INSERT INTO promo_redemptions ... ON CONFLICT DO NOTHING RETURNING id),
+         upd AS (UPDATE promocodes SET uses_left = uses_left - 1
+                 WHERE id = :id AND uses_left > 0 AND is_active AND EXISTS (SELECT 1 FROM ins)
+                 RETURNING uses_left)
+    SELECT (SELECT id FROM ins), (SELECT uses_left FROM upd)
+Строка промокода заблокирована только между этим UPDATE и commit. Журнал
+(uq_promo_redemption_user) делает повторный /use того же пользователя идемпотентным:
+остаток второй раз не уменьшается.
+
+Горячие коды (PROMO_SHARDED_CODES) — остаток один раз переносится из Postgres в
+PROMO_SHARDS счётчиков Redis (uses_left в БД = 0, пока коды «вооружены»), погашение
+уменьшает случайный шард; журнал по-прежнему пишется в Postgres в той же транзакции.
+Истинный остаток = uses_left + сумма шардов (remaining_uses()); release_shards() возвращает
+шарды в БД — при удалении и правке кода в админке, а на старте reconcile_shards() так
+«разоружает» коды, убранные из PROMO_SHARDED_CODES.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import exists, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.init_db import async_session_maker
+from models.promocode import PromoCode, PromoRedemption
+from utils.cache import cache, PREFIX
+
+logger = logging.getLogger(__name__)
+
+ARM_LOCK_TTL_MS = 10000
+
+# KEYS: шард -> 1, если единица взята
+_TAKE_LUA = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') > 0 then
+  redis.call('DECR', KEYS[1])
+  return 1
+end
+return 0
+"""
+
+# KEYS: шард -> остаток, ключ удалён
+_DRAIN_LUA = """
+local v = tonumber(redis.call('GET', KEYS[1]) or '0')
+redis.call('DEL', KEYS[1])
+return v
+"""
+
+
+def _sharded_codes() -> set:
+    return {c.strip() for c in (settings.PROMO_SHARDED_CODES or "").split(",") if c.strip()}
+
+
+def _shard_keys(promo_id: int):
+    return [f"{PREFIX}:promo:{int(promo_id)}:shard:{i}" for i in range(settings.PROMO_SHARDS)]
+
+
+def _armed_key(promo_id: int) -> str:
+    return f"{PREFIX}:promo:{int(promo_id)}:armed"
+
+
+def validate_promo(promo: Optional[PromoCode], course_id: Optional[int]) -> PromoCode:
+    if not promo:
+        raise HTTPException(status_code=404, detail="Промокод не найден")
+    now = datetime.utcnow()
+    if now < promo.valid_from or now > promo.valid_until:
+        raise HTTPException(status_code=400, detail="Срок действия промокода истек")
+    if course_id and promo.applicable_courses and course_id not in promo.applicable_courses:
+        raise HTTPException(status_code=400, detail="Промокод не применим к данному курсу")
+    return promo
+
+
+def _result(promo: PromoCode, already_used: bool) -> dict:
+    return {
+        "success": True,
+        "already_used": already_used,
+        "discount_percent": promo.discount_percent,
+        "discount_amount": promo.discount_amount,
+    }
+
+
+def _exhausted() -> HTTPException:
+    return HTTPException(status_code=400, detail="Промокод больше не может быть использован")
+
+
+def _log_insert(promo_id: int, user_id: int, course_id: Optional[int]):
+    return (
+        pg_insert(PromoRedemption)
+        .values(promocode_id=promo_id, user_id=user_id, course_id=course_id, redeemed_at=datetime.utcnow())
+        .on_conflict_do_nothing(constraint="uq_promo_redemption_user")
+        .returning(PromoRedemption.id)
+    )
+
+
+async def redeem(
+    db: AsyncSession,
+    code: str,
+    user_id: int,
+    course_id: Optional[int] = None,
+    sharded: Optional[bool] = None,
+) -> dict:
+    result = await db.execute(select(PromoCode).where(PromoCode.code == code, PromoCode.is_active == True))
+    promo = validate_promo(result.scalar_one_or_none(), course_id)
+
+    if sharded is None:
+        sharded = cache.client is not None and promo.code in _sharded_codes()
+    if sharded:
+        return await _redeem_sharded(db, promo, user_id, course_id)
+
+    ins = _log_insert(promo.id, user_id, course_id).cte("ins")
+    upd = (
+        update(PromoCode)
+        .where(
+            PromoCode.id == promo.id,
+            PromoCode.uses_left > 0,
+            PromoCode.is_active == True,
+            exists(select(ins.c.id)),
+        )
+        .values(uses_left=PromoCode.uses_left - 1)
+        .returning(PromoCode.uses_left)
+        .cte("upd")
+    )
+    redemption_id, uses_left = (
+        await db.execute(select(select(ins.c.id).scalar_subquery(), select(upd.c.uses_left).scalar_subquery()))
+    ).one()
+
+    if redemption_id is None:
+        await db.rollback()
+        return _result(promo, already_used=True)
+    if uses_left is None:
+        await db.rollback()  # откатываем и запись журнала
+        raise _exhausted()
+    await db.commit()
+    return _result(promo, already_used=False)
+
+
+# ---------- шардированный счётчик в Redis ----------
+
+async def _arm(db: AsyncSession, promo_id: int) -> None:
+    """Переносит uses_left в шарды Redis один раз; параллельные воркеры ждут под lock."""
+    client = cache.client
+    if await client.exists(_armed_key(promo_id)):
+        return
+    lock_key = f"{_armed_key(promo_id)}:lock"
+    if not await client.set(lock_key, b"1", nx=True, px=ARM_LOCK_TTL_MS):
+        # вооружает другой воркер — ждём маркер, иначе пустые шарды дали бы ложное «закончился»
+        deadline = time.monotonic() + ARM_LOCK_TTL_MS / 1000
+        while time.monotonic() < deadline and not await client.exists(_armed_key(promo_id)):
+            await asyncio.sleep(0.05)
+        return
+    try:
+        if await client.exists(_armed_key(promo_id)):
+            return
+        res = await db.execute(select(PromoCode.uses_left).where(PromoCode.id == promo_id).with_for_update())
+        remaining = max(res.scalar_one() or 0, 0)
+        keys = _shard_keys(promo_id)
+        base, extra = divmod(remaining, len(keys))
+        async with client.pipeline(transaction=True) as pipe:
+            for i, key in enumerate(keys):
+                pipe.incrby(key, base + (1 if i < extra else 0))
+            pipe.set(_armed_key(promo_id), b"1")
+            await pipe.execute()
+        try:
+            await db.execute(update(PromoCode).where(PromoCode.id == promo_id).values(uses_left=0))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            await _drain(promo_id)
+            raise
+        logger.info("Promo %s armed: %d uses moved to %d shards", promo_id, remaining, len(keys))
+    finally:
+        await client.delete(lock_key)
+
+
+async def _take(promo_id: int) -> Optional[str]:
+    keys = _shard_keys(promo_id)
+    start = random.randrange(len(keys))
+    for key in keys[start:] + keys[:start]:
+        if await cache.client.eval(_TAKE_LUA, 1, key):
+            return key
+    return None
+
+
+async def _redeem_sharded(db: AsyncSession, promo: PromoCode, user_id: int, course_id: Optional[int]) -> dict:
+    await _arm(db, promo.id)
+
+    redemption_id = (await db.execute(_log_insert(promo.id, user_id, course_id))).scalar_one_or_none()
+    if redemption_id is None:
+        await db.rollback()
+        return _result(promo, already_used=True)
+
+    shard = await _take(promo.id)
+    if shard is None:
+        await db.rollback()
+        raise _exhausted()
+    try:
+        await db.commit()
+    except Exception:
+        await cache.client.incr(shard)  # журнал не записан — единицу возвращаем
+        raise
+    return _result(promo, already_used=False)
+
+
+async def _drain(promo_id: int) -> int:
+    client = cache.client
+    await client.delete(_armed_key(promo_id))
+    total = 0
+    for key in _shard_keys(promo_id):
+        total += int(await client.eval(_DRAIN_LUA, 1, key))
+    return total
+
+
+async def release_shards(db: AsyncSession, promo_id: int) -> int:
+    """Сверка: остаток из шардов возвращается в promocodes.uses_left. Возвращает перенесённое."""
+    if cache.client is None:
+        return 0
+    try:
+        moved = await _drain(promo_id)
+    except Exception as e:
+        logger.error("Promo %s shard release failed: %s", promo_id, e)
+        return 0
+    if moved:
+        await db.execute(
+            update(PromoCode).where(PromoCode.id == promo_id).values(uses_left=PromoCode.uses_left + moved)
+        )
+        await db.commit()
+    return moved
+
+
+async def shard_remaining(promo_ids: Iterable[int]) -> Dict[int, int]:
+    """Остаток в шардах по промокодам (для админского списка): {promo_id: n}, только ненулевые."""
+    promo_ids = list(promo_ids)
+    if cache.client is None or not promo_ids:
+        return {}
+    try:
+        keys = [k for pid in promo_ids for k in _shard_keys(pid)]
+        values = await cache.client.mget(keys)
+    except Exception as e:
+        logger.warning("Promo shard read failed: %s", e)
+        return {}
+    out = {}
+    n = settings.PROMO_SHARDS
+    for i, pid in enumerate(promo_ids):
+        total = sum(int(v) for v in values[i * n:(i + 1) * n] if v is not None)
+        if total:
+            out[pid] = total
+    return out
+
+
+async def remaining_uses(promo: PromoCode) -> int:
+    """Сколько погашений осталось: uses_left в БД плюс шарды (у вооружённого кода uses_left = 0)."""
+    return (promo.uses_left or 0) + (await shard_remaining([promo.id])).get(promo.id, 0)
+
+
+async def reconcile_shards() -> Dict[int, int]:
+    """Старт: вооружённые коды не из PROMO_SHARDED_CODES возвращают шарды в БД. {promo_id: перенесено}."""
+    if cache.client is None:
+        return {}
+    moved: Dict[int, int] = {}
+    try:
+        armed = [
+            int(key.decode().split(":")[-2])
+            async for key in cache.client.scan_iter(match=f"{PREFIX}:promo:*:armed", count=1000)
+        ]
+        if not armed:
+            return moved
+        hot = _sharded_codes()
+        async with async_session_maker() as db:
+            codes = dict((await db.execute(select(PromoCode.id, PromoCode.code).where(PromoCode.id.in_(armed)))).all())
+            for promo_id in armed:
+                if codes.get(promo_id) not in hot:
+                    moved[promo_id] = await release_shards(db, promo_id)
+    except Exception as e:
+        logger.error("Promo shard reconcile failed: %s", e)
+    if moved:
+        logger.info("Promo shards released for disarmed codes: %s", moved)
+    return moved
@@ -0,0 +1,83 @@
+# catalog_service/services/purchases.py
+
+"""
+Журнал покупок и инкрементальные агрегаты выручки.
+
+record_purchase() вызывается в транзакции, которая создаёт CourseAccess (buy_course,
+grant-access), до commit: пишет строку в purchases со снимком цены и одним
+INSERT ... ON CONFLICT DO UPDATE на каждый агрегат (revenue_daily, revenue_monthly).
+Откат покупки откатывает и агрегаты — расхождений между ними не бывает.
+Статистика (api/internal/statistics.py) читает агрегаты: O(дней/месяцев), а не O(покупок).
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from models.course import Course
+from models.purchase import Purchase, RevenueDaily, RevenueMonthly
+from services.course_list import get_discount_info
+
+CENT = Decimal("0.01")
+
+
+def price_now(course: Course, now: Optional[datetime] = None) -> tuple:
+    """(list_price, discount_percent, amount) по текущей цене и активной скидке."""
+    if course.is_free:
+        return Decimal(0), Decimal(0), Decimal(0)
+    list_price = Decimal(course.price or 0)
+    is_discount_active, _ = get_discount_info(course, now)
+    discount = Decimal(course.discount or 0) if is_discount_active else Decimal(0)
+    amount = (list_price * (100 - discount) / 100).quantize(CENT)
+    return list_price, discount, amount
+
+
+def _bump(model, period_column: str, period: date, course_id: int, currency: str, amount: Decimal):
+    stmt = pg_insert(model).values(
+        **{period_column: period}, course_id=course_id, currency=currency, purchases=1, revenue=amount,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[period_column, "course_id", "currency"],
+        set_={
+            "purchases": model.purchases + 1,
+            "revenue": model.revenue + stmt.excluded.revenue,
+        },
+    )
+
+
+async def record_purchase(
+    db: AsyncSession,
+    user_id: int,
+    course: Course,
+    source: str,
+    amount: Optional[Decimal] = None,
+    promo_code: Optional[str] = None,
+) -> Purchase:
+    """Без commit — вызывающий коммитит вместе с CourseAccess. amount=None — текущая цена курса."""
+    now = datetime.now(timezone.utc)
+    list_price, discount, current_amount = price_now(course, now)
+    amount = current_amount if amount is None else Decimal(amount).quantize(CENT)
+    currency = settings.CURRENCY
+
+    purchase = Purchase(
+        user_id=user_id,
+        course_id=course.id,
+        course_title=course.title,
+        source=source,
+        list_price=list_price,
+        discount_percent=discount,
+        amount=amount,
+        currency=currency,
+        promo_code=promo_code,
+        purchased_at=now,
+    )
+    db.add(purchase)
+
+    day = now.date()
+    await db.execute(_bump(RevenueDaily, "day", day, course.id, currency, amount))
+    await db.execute(_bump(RevenueMonthly, "month", day.replace(day=1), course.id, currency, amount))
+    return purchase
@@ -0,0 +1,271 @@
+# catalog_service/services/static_export.py
+
+"""
+Статический экспорт анонимного каталога в публичный S3-бакет — раздача с CDN без API.
+
+Документы — то же, что публичные ручки отдают анониму:
+  homepage     баннеры + сетка курсов (формат /v1/public/homepage)
+  courses      сетка курсов (/v1/public/courses без прав пользователя)
+  banners      баннеры
+  promos       промо-картинки главной
+  course/{id}  страница курса без прав (/v1/public/courses/{id}/page)
+
+Объекты адресуются содержимым: {prefix}/{name}.{sha}.json и рядом .json.gz / .json.br
+(Content-Encoding gzip / br, Cache-Control immutable); загружаются только изменившиеся.
+Указатель {prefix}/manifest.json (короткий max-age) пишется последним: версия, valid_until
+и ключи всех документов — читатель видит либо старый набор, либо новый целиком.
+Старые версии не удаляются (их ещё читают клиенты со старым указателем) — их дочищает
+lifecycle-правило бакета.
+
+Запуск: cache.on_invalidate с тегами курсов/баннеров/промо (админские ручки) → debounce →
+экспорт под SET NX lock (один воркер на кластер; не взял lock — повтор позже). Lock — со
+случайным токеном: пока идёт экспорт, его продлевают, отпускают только свой, а перед записью
+указателя проверяют, что он всё ещё наш (иначе экспорт прерывается). К valid_until
+указателя (граница скидки) — повторный экспорт, чтобы цены переключились без админки.
+Выключен, пока не задан STATIC_EXPORT_BUCKET. brotli — необязательная зависимость: без неё
+пишутся только .json и .json.gz (в указателе "br": null). Проверка — scripts/check_static_export.py.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import secrets
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+
+from core.config import settings
+from db.init_db import async_session_maker
+from models.banner import Banner
+from models.promo import PromoImage
+from schemas.banner import BannerSchema
+from schemas.promo import PromoSchema
+from services.course_list import get_course_list_document
+from services.course_page import get_course_page
+from utils.cache import cache, PREFIX
+from utils.object_storage import ObjectStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = f"{PREFIX}:static_export:lock"
+LOCK_TTL_MS = 120000
+
+# KEYS: lock; ARGV: token -> 1, если lock наш и удалён
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+# KEYS: lock; ARGV: token, ttl_ms -> 1, если lock наш и продлён
+_EXTEND_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('PEXPIRE', KEYS[1], ARGV[2]) end
+return 0
+"""
+IMMUTABLE = "public, max-age=31536000, immutable"
+JSON_TYPE = "application/json; charset=utf-8"
+TAGS = frozenset({"courses", "banners", "promos"})
+
+
+def _encode(doc) -> bytes:
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+
+
+async def render_documents() -> Tuple[Dict[str, bytes], Optional[float]]:
+    """{имя: JSON} и граница годности (ближайшая смена скидки)."""
+    async with async_session_maker() as db:
+        res = await db.execute(select(Banner).order_by(Banner.order.asc()))
+        banners = [BannerSchema.model_validate(b).model_dump() for b in res.scalars().all()]
+        res = await db.execute(select(PromoImage).order_by(PromoImage.order.asc()))
+        promos = [PromoSchema.model_validate(p).model_dump() for p in res.scalars().all()]
+    course_list = await get_course_list_document()
+    courses = course_list["courses"]
+
+    docs = {
+        "homepage": _encode({"banners": banners, "courses": courses, "built_at": course_list["built_at"]}),
+        "courses": _encode(courses),
+        "banners": _encode(banners),
+        "promos": _encode(promos),
+    }
+    for course in courses:
+        # страницы из того же кэша, что и /page; без пользователя — has_access только у бесплатных
+        page = await get_course_page(course["id"], None)
+        docs[f"course/{course['id']}"] = _encode(page)
+    return docs, course_list["valid_until"]
+
+
+class StaticExporter:
+    def __init__(self):
+        self.storage: Optional[ObjectStorage] = None
+        self.valid_until: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._boundary_task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self.stats = {
+            "exports": 0, "uploaded": 0, "unchanged": 0, "lock_busy": 0, "errors": 0,
+            "version": None, "last_export_at": None,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.STATIC_EXPORT_BUCKET)
+
+    def _key(self, name: str) -> str:
+        return f"{settings.STATIC_EXPORT_PREFIX}/{name}"
+
+    # ---------- экспорт ----------
+
+    async def export_once(self) -> Optional[dict]:
+        """Один экспорт под lock; None — экспортирует другой воркер."""
+        token, keeper = None, None
+        if cache.client is not None:
+            token = secrets.token_hex(16)
+            if not await cache.client.set(LOCK_KEY, token, nx=True, px=LOCK_TTL_MS):
+                self.stats["lock_busy"] += 1
+                return None
+            keeper = asyncio.create_task(self._keep_lock(token))
+        try:
+            return await self._export(token)
+        finally:
+            if keeper is not None:
+                keeper.cancel()
+                await asyncio.gather(keeper, return_exceptions=True)
+                try:
+                    await cache.client.eval(_RELEASE_LUA, 1, LOCK_KEY, token)
+                except Exception as e:
+                    logger.warning("Static export lock release failed: %s", e)  # истечёт сам
+
+    async def _extend_lock(self, token: str) -> bool:
+        return bool(await cache.client.eval(_EXTEND_LUA, 1, LOCK_KEY, token, LOCK_TTL_MS))
+
+    async def _keep_lock(self, token: str) -> None:
+        while True:
+            await asyncio.sleep(LOCK_TTL_MS / 3000)
+            try:
+                if not await self._extend_lock(token):
+                    return  # lock уже чужой — _export это заметит перед указателем
+            except Exception as e:
+                logger.warning("Static export lock extend failed: %s", e)
+
+    async def _export(self, token: Optional[str] = None) -> dict:
+        docs, valid_until = await render_documents()
+        pointer_key = self._key("manifest.json")
+        uploaded = 0
+        async with self.storage.client() as client:
+            # текущий указатель из бакета, а не из памяти: его мог обновить другой воркер
+            raw = await self.storage.get(client, pointer_key)
+            previous = json.loads(raw) if raw else {"version": None, "documents": {}}
+
+            documents = {}
+            for name, body in docs.items():
+                sha = hashlib.sha256(body).hexdigest()[:16]
+                old = previous["documents"].get(name)
+                if old is not None and old["sha"] == sha and (old["br"] is not None or brotli is None):
+                    documents[name] = old
+                    continue
+                base = self._key(f"{name}.{sha}.json")
+                await self.storage.put(client, base, body, JSON_TYPE, IMMUTABLE)
+                await self.storage.put(
+                    client, f"{base}.gz", gzip.compress(body, compresslevel=9, mtime=0), JSON_TYPE, IMMUTABLE, "gzip"
+                )
+                if brotli is not None:
+                    await self.storage.put(client, f"{base}.br", brotli.compress(body), JSON_TYPE, IMMUTABLE, "br")
+                documents[name] = {
+                    "path": base,
+                    "gzip": f"{base}.gz",
+                    "br": f"{base}.br" if brotli is not None else None,
+                    "sha": sha,
+                    "bytes": len(body),
+                }
+                uploaded += 1
+
+            version = hashlib.sha1(
+                _encode(sorted((name, d["sha"]) for name, d in documents.items()))
+            ).hexdigest()[:16]
+            manifest = previous
+            if version != previous["version"] or valid_until != previous.get("valid_until"):
+                manifest = {
+                    "version": version,
+                    "built_at": time.time(),
+                    "valid_until": valid_until,
+                    "documents": documents,
+                }
+                if token is not None and not await self._extend_lock(token):
+                    raise RuntimeError("static export lock lost before manifest write")
+                max_age = settings.STATIC_EXPORT_POINTER_MAX_AGE
+                await self.storage.put(
+                    client, pointer_key, _encode(manifest), JSON_TYPE, f"public, max-age={max_age}"
+                )
+
+        self.valid_until = manifest.get("valid_until")
+        self.stats["exports"] += 1
+        self.stats["uploaded"] += uploaded
+        self.stats["unchanged"] += len(docs) - uploaded
+        self.stats["version"] = manifest["version"]
+        self.stats["last_export_at"] = time.time()
+        logger.info("Static export %s: %d of %d documents uploaded", manifest["version"], uploaded, len(docs))
+        return {"version": manifest["version"], "documents": len(docs), "uploaded": uploaded}
+
+    # ---------- запуск по изменениям ----------
+
+    def _on_invalidate(self, tags: tuple) -> None:
+        if TAGS.intersection(tags) or any(t.startswith("course:") for t in tags):
+            self.schedule()
+
+    def schedule(self) -> None:
+        """Пачка админских правок схлопывается в один экспорт после паузы."""
+        if self._task is not None and not self._task.done():
+            self._dirty = True
+            return
+
+        async def run():
+            while True:
+                self._dirty = False
+                await asyncio.sleep(settings.STATIC_EXPORT_DEBOUNCE_SECONDS)
+                try:
+                    if await self.export_once() is None:
+                        self._dirty = True  # чужой экспорт мог начаться до нашей правки
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error("Static export failed: %s", e)
+                if not self._dirty:
+                    return
+
+        self._task = asyncio.create_task(run())
+
+    async def _boundary_loop(self) -> None:
+        while True:
+            delay = settings.HOMEPAGE_SYNC_SECONDS
+            if self.valid_until is not None:
+                delay = min(delay, max(self.valid_until - time.time(), 0) + 0.5)
+            await asyncio.sleep(delay)
+            if self.valid_until is not None and self.valid_until <= time.time():
+                self.valid_until = None
+                self.schedule()
+
+    # ---------- жизненный цикл ----------
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        self.storage = ObjectStorage(settings.STATIC_EXPORT_BUCKET)
+        cache.on_invalidate(self._on_invalidate)
+        self._boundary_task = asyncio.create_task(self._boundary_loop())
+        self.schedule()  # после деплоя формат документов мог поменяться
+
+    async def stop(self) -> None:
+        for task in (self._task, self._boundary_task):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*[t for t in (self._task, self._boundary_task) if t is not None], return_exceptions=True)
+        self._task = self._boundary_task = None
+
+
+exporter = StaticExporter()
@@ -1,44 +1,418 @@
 # catalog_service/utils/cache.py
 
-import json
-import hashlib
-from functools import wraps
-import redis
-
-try:
-    redis_client = redis.Redis(
-        host="redis", port=6379, db=0,
-        decode_responses=True, socket_connect_timeout=5, socket_timeout=5,
-        retry_on_timeout=True
-    )
-    redis_client.ping()
-    REDIS_AVAILABLE = True
-except Exception:
-    redis_client = None
-    REDIS_AVAILABLE = False
-
-def _gen_key(prefix: str, fname: str, args, kwargs) -> str:
-    raw = str(args) + str(sorted(kwargs.items()))
-    return f"{prefix}:{fname}:{hashlib.md5(raw.encode()).hexdigest()}"
-
-def cache_result(ttl: int = 300, key_prefix: str = ""):
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            if not REDIS_AVAILABLE:
-                return await func(*args, **kwargs)
-            key = _gen_key(key_prefix, func.__name__, args, kwargs)
+"""
+Кэш каталога в Redis (redis.asyncio).
+
+- Ключи строятся только явными билдерами из CacheKeys — никаких хэшей от str(args),
+  в ключ попадает ровно то, от чего зависит значение.
+- get_or_set: при промахе значение считает один загрузчик (single-flight): внутри
+  процесса — общий Future, между процессами — SET NX lock, остальные ждут результат.
+- stale-while-revalidate: после ttl значение ещё stale_ttl секунд отдаётся как есть,
+  а пересчёт уходит в фон. Поэтому загрузчик не должен держать сессию запроса —
+  он открывает свою (async_session_maker).
+- Теги: каждый ключ записывается в set tag:{tag}; invalidate("course:5", "banners")
+  из админских ручек удаляет все ключи тега. Загрузчик, начатый до invalidate(),
+  своё значение не запишет: версии тегов читаются до загрузки и сверяются при записи.
+- Значения — msgpack [fresh_until, payload]; метрики hit/stale/miss по группам ключей.
+- Версии: invalidate() ещё и двигает счётчик ver:{tag}. Значение версии не меньше
+  времени изменения в мс, так что после потери ключа старые номера не повторяются —
+  поэтому ключи версий живут CACHE_VERSION_TTL и сами пропадают (тег из URL не копится).
+  Из версий строятся ETag'и (utils/http_cache.py).
+- Redis недоступен → fail-open: просто вызываем загрузчик.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import msgpack
+import redis.asyncio as redis
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "catalog:v1"
+LOCK_TTL_MS = 5000
+LOCK_POLL_SECONDS = 0.05
+
+
+class CacheKeys:
+    """Все ключи кэша каталога. Группа (второй сегмент) — это и метка для метрик."""
+
+    @staticmethod
+    def banners() -> str:
+        return f"{PREFIX}:banners"
+
+    @staticmethod
+    def course_modal(course_id: int) -> str:
+        return f"{PREFIX}:course_modal:{int(course_id)}"
+
+    @staticmethod
+    def student_works(course_id: int) -> str:
+        return f"{PREFIX}:student_works:{int(course_id)}"
+
+    @staticmethod
+    def course_list() -> str:
+        return f"{PREFIX}:course_list"
+
+    @staticmethod
+    def course_search(digest: str) -> str:
+        return f"{PREFIX}:course_search:{digest}"
+
+    @staticmethod
+    def course_page(course_id: int) -> str:
+        return f"{PREFIX}:course_page:{int(course_id)}"
+
+    @staticmethod
+    def entitlements(user_id: int) -> str:
+        return f"{PREFIX}:entitlements:{int(user_id)}"
+
+    @staticmethod
+    def entitlements_version(user_id: int) -> str:
+        return f"{PREFIX}:entitlements_version:{int(user_id)}"
+
+    @staticmethod
+    def dashboard(user_id: int) -> str:
+        return f"{PREFIX}:dashboard:{int(user_id)}"
+
+    @staticmethod
+    def version(tag: str) -> str:
+        return f"{PREFIX}:ver:{tag}"
+
+    @staticmethod
+    def boundary(tag: str, version: str) -> str:
+        return f"{PREFIX}:valid_until:{tag}:{version}"
+
+
+def course_tag(course_id: int) -> str:
+    return f"course:{int(course_id)}"
+
+
+def dashboard_tag(user_id: int) -> str:
+    return f"dashboard:{int(user_id)}"
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"cannot cache {type(obj).__name__}")
+
+
+def pack(value: Any) -> bytes:
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def unpack(blob: bytes) -> Any:
+    return msgpack.unpackb(blob, raw=False)
+
+
+# KEYS: ключи версий; ARGV: now_ms, ключ-префикс границы ('' — не нужна), ttl ключа версии в мс
+_VERSIONS_LUA = """
+local out = {}
+for i, k in ipairs(KEYS) do
+  local v = redis.call('GET', k)
+  if not v then
+    redis.call('SET', k, ARGV[1], 'NX', 'PX', ARGV[3])
+    v = redis.call('GET', k)
+  end
+  out[i] = v
+end
+if ARGV[2] ~= '' then
+  out[#KEYS + 1] = redis.call('GET', ARGV[2] .. out[1]) or ''
+end
+return out
+"""
+
+# KEYS: ключ значения, n ключей версий, n set'ов тегов; ARGV: blob, expire, n, версии до загрузки
+_WRITE_LUA = """
+local n = tonumber(ARGV[3])
+for i = 1, n do
+  if redis.call('GET', KEYS[1 + i]) ~= ARGV[3 + i] then return 0 end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 1, n do
+  local tag_key = KEYS[1 + n + i]
+  redis.call('SADD', tag_key, KEYS[1])
+  if redis.call('TTL', tag_key) < tonumber(ARGV[2]) then redis.call('EXPIRE', tag_key, ARGV[2]) end
+end
+return 1
+"""
+
+# KEYS: ключи версий; ARGV: now_ms, ttl ключа версии в мс
+_BUMP_LUA = """
+for _, k in ipairs(KEYS) do
+  local v = redis.call('INCR', k)
+  if v < tonumber(ARGV[1]) then redis.call('SET', k, ARGV[1]) end
+  redis.call('PEXPIRE', k, ARGV[2])
+end
+return #KEYS
+"""
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _version_ttl_ms() -> int:
+    return settings.CACHE_VERSION_TTL * 1000
+
+
+class CacheMetrics:
+    OUTCOMES = ("hit", "stale", "miss", "wait", "error")
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.OUTCOMES, 0))
+
+    def inc(self, key: str, outcome: str) -> None:
+        group = key[len(PREFIX) + 1:].split(":", 1)[0]
+        self.counts[group][outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for group, c in sorted(self.counts.items()):
+            served = c["hit"] + c["stale"] + c["miss"]  # wait — подмножество miss
+            out[group] = {**c, "hit_ratio": round((c["hit"] + c["stale"]) / served, 4) if served else 0.0}
+        return out
+
+
+class RedisCache:
+    def __init__(self):
+        self.client: Optional[redis.Redis] = None
+        self.metrics = CacheMetrics()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._inflight_tags: Dict[str, tuple] = {}
+        self._background: set = set()
+        self._listeners: list = []
+
+    async def init(self) -> None:
+        if not settings.CACHE_ENABLED:
+            return
+        try:
+            client = redis.from_url(settings.REDIS_URL, socket_connect_timeout=2, socket_timeout=2)
+            await client.ping()
+            self.client = client
+            logger.info("Cache connected to %s", settings.REDIS_URL)
+        except Exception as e:
+            logger.error("Cache disabled, Redis unavailable: %s", e)
+            self.client = None
+
+    async def close(self) -> None:
+        if self.client:
+            await self.client.close()
+            self.client = None
+
+    # ---------- чтение / запись ----------
+
+    async def _read(self, key: str):
+        blob = await self.client.get(key)
+        if blob is None:
+            return None
+        fresh_until, payload = unpack(blob)
+        return fresh_until, payload
+
+    async def _write(self, key: str, value: Any, ttl: int, stale_ttl: int, tags: tuple, seen: list) -> bool:
+        """
+        Запись, только если версии тегов всё ещё равны seen (прочитанным до загрузки);
+        EXPIRE set'а тега — максимум по его ключам. False — тег успели инвалидировать.
+        """
+        blob = pack([time.time() + ttl, value])
+        keys = [key, *(CacheKeys.version(t) for t in tags), *(f"{PREFIX}:tag:{t}" for t in tags)]
+        return bool(await self.client.eval(_WRITE_LUA, len(keys), *keys, blob, ttl + stale_ttl, len(tags), *seen))
+
+    async def _load(self, key: str, loader, ttl: int, stale_ttl: int, tags, is_valid=None) -> Any:
+        """Single-flight: один Future на ключ в процессе + SET NX lock между процессами."""
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.metrics.inc(key, "wait")
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        self._inflight_tags[key] = tags
+        lock_key = f"{key}:lock"
+        got_lock = False
+        try:
+            seen = await self.versions([CacheKeys.version(t) for t in tags]) if tags else []
+            got_lock = await self.client.set(lock_key, b"1", nx=True, px=LOCK_TTL_MS)
+            if not got_lock:
+                # другой процесс уже считает — ждём его запись, но не дольше срока лока
+                deadline = time.monotonic() + LOCK_TTL_MS / 1000
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(LOCK_POLL_SECONDS)
+                    item, (locked,) = await self.fetch(key, lambda pipe: pipe.exists(lock_key))
+                    # та же проверка, что в resolve(): иначе подхватим запись, которую он только что отверг
+                    if item is not None and item[0] > time.time() and (is_valid is None or is_valid(item[1])):
+                        self.metrics.inc(key, "wait")
+                        fut.set_result(item[1])
+                        return item[1]
+                    if not locked:
+                        # лок снят без записи (загрузка упала или её отменил invalidate) — пробуем сами
+                        got_lock = await self.client.set(lock_key, b"1", nx=True, px=LOCK_TTL_MS)
+                        if got_lock:
+                            break
+            value = await loader()
             try:
-                cached = redis_client.get(key)
-                if cached is not None:
-                    return json.loads(cached)
-            except Exception:
-                pass
-            result = await func(*args, **kwargs)
+                if not await self._write(key, value, ttl, stale_ttl, tags, seen):
+                    logger.debug("Cache write skipped for %s: invalidated during load", key)
+            except redis.RedisError as e:
+                # значение уже посчитано — отдаём его, повторный loader() в resolve не нужен
+                logger.warning("Cache write failed for %s: %s", key, e)
+                self.metrics.inc(key, "error")
+            fut.set_result(value)
+            return value
+        except BaseException as e:
+            if not fut.done():
+                fut.set_exception(e)
+                fut.exception()  # ожидающих может не быть — не пишем "never retrieved"
+            raise
+        finally:
+            if self._inflight.get(key) is fut:  # invalidate() мог отцепить Future — тогда там уже новая загрузка
+                self._inflight.pop(key, None)
+                self._inflight_tags.pop(key, None)
+            if got_lock:
+                try:
+                    await self.client.delete(lock_key)
+                except redis.RedisError:
+                    pass  # истечёт сам через LOCK_TTL_MS
+
+    def _revalidate(self, key: str, loader, ttl: int, stale_ttl: int, tags, is_valid=None) -> None:
+        if key in self._inflight:
+            return
+
+        async def run():
             try:
-                redis_client.setex(key, ttl, json.dumps(result, default=str))
-            except Exception:
-                pass
-            return result
-        return wrapper
-    return decorator
+                await self._load(key, loader, ttl, stale_ttl, tags, is_valid)
+            except Exception as e:
+                logger.warning("Cache revalidate failed for %s: %s", key, e)
+
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def fetch(self, key: str, *extra: Callable[[Any], Any]):
+        """
+        Один round-trip: GET key плюс дополнительные команды в том же pipeline
+        (extra — функции вида lambda pipe: pipe.smembers(...)).
+        Возвращает (item | None, [результаты extra]); item потом отдаётся в resolve().
+        """
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            for add in extra:
+                add(pipe)
+            blob, *rest = await pipe.execute()
+        return (unpack(blob) if blob is not None else None), rest
+
+    async def resolve(
+        self,
+        key: str,
+        item,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        stale_ttl: int = 60,
+        tags: Iterable[str] = (),
+        is_valid: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """hit / stale (+фоновый пересчёт) / miss (single-flight) по уже прочитанному item."""
+        tags = tuple(tags)
+        if item is not None and (is_valid is None or is_valid(item[1])):
+            fresh_until, payload = item
+            if fresh_until > time.time():
+                self.metrics.inc(key, "hit")
+            else:
+                self.metrics.inc(key, "stale")
+                self._revalidate(key, loader, ttl, stale_ttl, tags, is_valid)
+            return payload
+
+        self.metrics.inc(key, "miss")
+        try:
+            return await self._load(key, loader, ttl, stale_ttl, tags, is_valid)
+        except redis.RedisError as e:
+            # сюда попадаем, только если loader ещё не запускался (ошибка до него — версии/лок/ожидание)
+            logger.warning("Cache load failed for %s: %s", key, e)
+            self.metrics.inc(key, "error")
+            return await loader()
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        stale_ttl: int = 60,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        if self.client is None:
+            return await loader()
+        try:
+            item = await self._read(key)
+        except Exception as e:
+            logger.warning("Cache read failed for %s: %s", key, e)
+            self.metrics.inc(key, "error")
+            return await loader()
+        return await self.resolve(key, item, loader, ttl, stale_ttl, tags)
+
+    def on_invalidate(self, listener: Callable[[tuple], None]) -> None:
+        """listener(tags) зовётся на каждый invalidate (и без Redis) — для производных снимков."""
+        self._listeners.append(listener)
+
+    async def invalidate(self, *tags: str) -> None:
+        """Удаляет все ключи, записанные под тегами, и двигает их версии. Вызывать после commit."""
+        if not tags:
+            return
+        for listener in self._listeners:
+            listener(tags)
+        # загрузки, начатые до изменения, новым запросам не отдаём — пусть грузят заново
+        for key, key_tags in list(self._inflight_tags.items()):
+            if set(key_tags) & set(tags):
+                self._inflight.pop(key, None)
+                self._inflight_tags.pop(key, None)
+        if self.client is None:
+            return
+        try:
+            tag_keys = [f"{PREFIX}:tag:{tag}" for tag in tags]
+            async with self.client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+            keys = set(tag_keys)
+            for group in members:
+                keys.update(group)
+            # сначала версии: запись загрузчика, прочитавшего старую версию, после этого не пройдёт
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.eval(
+                    _BUMP_LUA, len(tags), *[CacheKeys.version(t) for t in tags], now_ms(), _version_ttl_ms()
+                )
+                pipe.delete(*keys)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Cache invalidate failed for %s: %s", tags, e)
+
+    # ---------- версии ----------
+
+    async def versions(self, keys: Iterable[str], boundary_tag: Optional[str] = None) -> list:
+        """
+        Текущие значения ключей версий (отсутствующие создаются = now_ms на CACHE_VERSION_TTL) одной командой.
+        boundary_tag: дописать в конец сохранённую границу годности для версии первого ключа
+        ('' — не записана).
+        """
+        keys = list(keys)
+        prefix = CacheKeys.boundary(boundary_tag, "") if boundary_tag else ""
+        values = await self.client.eval(_VERSIONS_LUA, len(keys), *keys, now_ms(), prefix, _version_ttl_ms())
+        return [v.decode() if isinstance(v, bytes) else str(v) for v in values]
+
+    async def version(self, tag: str) -> str:
+        return (await self.versions([CacheKeys.version(tag)]))[0]
+
+    async def set_boundary(self, tag: str, version: str, valid_until: Optional[float], ttl: int) -> None:
+        """Граница годности содержимого, собранного при версии version (None — бессрочно)."""
+        value = "inf" if valid_until is None else repr(valid_until)
+        await self.client.set(CacheKeys.boundary(tag, version), value, ex=ttl)
+
+
+cache = RedisCache()
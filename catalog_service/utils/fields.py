@@ -0,0 +1,40 @@
+# catalog_service/utils/fields.py
+
+"""
+Проекции для списков: load_only по нужным колонкам и sparse fieldsets (?fields=id,title).
+
+Поле ответа может считаться из нескольких колонок (derived: поле -> колонки),
+поэтому колонки для load_only выводятся из выбранных полей, а не наоборот.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], default: Optional[Sequence[str]] = None) -> List[str]:
+    """?fields= -> поля в порядке allowed; пусто — default (или все allowed), id — всегда, чужое — 400."""
+    if not fields:
+        return list(default if default is not None else allowed)
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(requested - set(allowed))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные поля: {', '.join(unknown)}")
+    requested.add("id")
+    return [f for f in allowed if f in requested]
+
+
+def columns_for(model, fields: Iterable[str], derived: Optional[Dict[str, Sequence[str]]] = None) -> list:
+    """Атрибуты модели для load_only(); derived-поля раскрываются в свои колонки."""
+    derived = derived or {}
+    names = []
+    for f in fields:
+        for name in derived.get(f, (f,)):
+            if name not in names:
+                names.append(name)
+    return [getattr(model, name) for name in names]
+
+
+def project(rows: Iterable[dict], fields: Sequence[str]) -> List[dict]:
+    """Срез готовых dict'ов (документы из кэша) по выбранным полям."""
+    return [{f: row[f] for f in fields if f in row} for row in rows]
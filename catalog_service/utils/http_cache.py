@@ -0,0 +1,119 @@
+# catalog_service/utils/http_cache.py
+
+"""
+HTTP-валидаторы публичных GET каталога: ETag / Last-Modified / Cache-Control / Vary.
+
+ETag не хэширует тело — это набор версий сущностей, от которых зависит ответ
+(cache.versions: счётчики ver:{tag}, их двигает cache.invalidate() из админских ручек).
+Проверка If-None-Match — одна команда Redis до любой работы с БД.
+
+- personal: ответ зависит от токена (has_access) — в ETag входит версия прав
+  пользователя, Cache-Control: private. Vary: Authorization ставится всегда, когда
+  ответ вообще может зависеть от токена, в том числе анониму.
+- timed: цены зависят от времени (начало/конец скидки). В ETag входит граница годности
+  списка курсов, записанная при его сборке под текущей версией "courses"; если граница
+  неизвестна или уже прошла — валидаторов не даём. Last-Modified для таких ответов
+  не ставим: содержимое меняется и без изменения версий.
+- Redis недоступен — обычный 200 без валидаторов.
+
+    validator = await conditional(request, [course_tag(course_id)])
+    if validator.matches(request):
+        return validator.not_modified()
+    ...
+    return validator.apply(JSONResponse(body))
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import Request, Response
+
+from utils.cache import cache, CacheKeys
+
+logger = logging.getLogger(__name__)
+
+# тег, под версией которого записывается граница годности цен (services/course_list.py)
+PRICES_TAG = "courses"
+
+
+@dataclass
+class Validator:
+    etag: Optional[str] = None
+    last_modified: Optional[float] = None  # unix-время
+    private: bool = False
+    vary_auth: bool = False
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"Cache-Control": ("private" if self.private else "public") + ", no-cache"}
+        if self.vary_auth:
+            headers["Vary"] = "Authorization"
+        if self.etag:
+            headers["ETag"] = self.etag
+        if self.last_modified is not None:
+            headers["Last-Modified"] = formatdate(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        if self.etag is None:
+            return False
+        inm = request.headers.get("if-none-match")
+        if inm is not None:
+            # для GET сравнение слабое: W/"x" совпадает с "x"
+            candidates = [t.strip().removeprefix("W/") for t in inm.split(",")]
+            return "*" in candidates or self.etag in candidates
+        ims = request.headers.get("if-modified-since")
+        if ims and self.last_modified is not None:
+            try:
+                return int(self.last_modified) <= parsedate_to_datetime(ims).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+    def apply(self, response: Response) -> Response:
+        for name, value in self.headers().items():
+            response.headers[name] = value
+        return response
+
+
+async def conditional(
+    request: Request,
+    tags: Iterable[str],
+    user_id: Optional[int] = None,
+    personal: bool = False,
+    timed: bool = False,
+) -> Validator:
+    tags: List[str] = list(tags)
+    validator = Validator(private=bool(personal and user_id), vary_auth=personal)
+    if cache.client is None:
+        return validator
+
+    if timed:
+        tags = [PRICES_TAG] + [t for t in tags if t != PRICES_TAG]
+    keys = [CacheKeys.version(t) for t in tags]
+    if personal and user_id:
+        keys.append(CacheKeys.entitlements_version(user_id))
+
+    try:
+        values = await cache.versions(keys, boundary_tag=PRICES_TAG if timed else None)
+    except Exception as e:
+        logger.warning("Version read failed for %s: %s", tags, e)
+        return validator
+
+    parts = [format(int(v), "x") for v in values[:len(keys)]]
+    if timed:
+        boundary = values[-1]
+        if not boundary or (boundary != "inf" and float(boundary) <= time.time()):
+            return validator
+        parts.append(boundary if boundary == "inf" else format(int(float(boundary)), "x"))
+    else:
+        # версии (и версия прав) — не меньше времени изменения в мс
+        validator.last_modified = max(int(v) for v in values[:len(keys)]) / 1000 if keys else None
+
+    validator.etag = '"' + ".".join(parts) + '"'
+    return validator
@@ -0,0 +1,222 @@
+# catalog_service/utils/logging_config.py
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from core.config import settings
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:  # orjson опционален
+    def _dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+EXTRA_FIELDS = ("user_id", "client_id", "ip_address", "trace_id")
+
+
+class JSONFormatter(logging.Formatter):
+    """JSON log formatter for structured logging"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_obj = {
+            # время события, а не момента форматирования в потоке listener'а
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno
+        }
+
+        # Add extra fields
+        for field in EXTRA_FIELDS:
+            if hasattr(record, field):
+                log_obj[field] = getattr(record, field)
+
+        # Add exception info if present
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_obj['exception'] = record.exc_text
+
+        return _dumps(log_obj)
+
+
+class LoggingStats:
+    """Счётчики пайплайна: сколько записей отброшено сэмплингом и при переполнении очереди."""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.dropped_by_level: Dict[str, int] = {}
+
+    def as_dict(self) -> dict:
+        return {
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "dropped_by_level": dict(self.dropped_by_level),
+        }
+
+
+stats = LoggingStats()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Сэмплинг по имени логгера: {"utils.monitoring": 0.1} пропускает ~10% записей.
+    WARNING и выше проходят всегда.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        if rate is None or rate >= 1.0 or random.random() < rate:
+            return True
+        stats.sampled_out += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler, который никогда не ждёт: при полной очереди запись отбрасывается и считается."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # В потоке вызывающего только фиксируем message/traceback; JSON собирает listener
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            stats.enqueued += 1
+        except queue.Full:
+            stats.dropped += 1
+            stats.dropped_by_level[record.levelname] = stats.dropped_by_level.get(record.levelname, 0) + 1
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """
+    Handler для QueueListener: копит отформатированные строки и пишет их одним write(),
+    когда набралось batch_size записей или очередь опустела.
+    """
+
+    def __init__(self, log_queue: queue.Queue, stream=None, batch_size: int = 256):
+        super().__init__(stream)
+        self.log_queue = log_queue
+        self.batch_size = batch_size
+        self.buffer: list[str] = []
+        self._reported_drops = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.buffer) >= self.batch_size or self.log_queue.empty():
+            self.flush()
+
+    def flush(self) -> None:
+        if stats.dropped != self._reported_drops:
+            lost = stats.dropped - self._reported_drops
+            self._reported_drops = stats.dropped
+            self.buffer.append(f"logging: queue full, dropped {lost} records")
+        if not self.buffer:
+            return
+        self.acquire()
+        try:
+            self.stream.write("\n".join(self.buffer) + "\n")
+            self.buffer.clear()
+            super().flush()
+        finally:
+            self.release()
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _parse_sample_rates(raw: str) -> Dict[str, float]:
+    rates = {}
+    for part in (raw or "").split(","):
+        if "=" in part:
+            name, rate = part.split("=", 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def get_logging_stats() -> dict:
+    return stats.as_dict()
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # дочитывает очередь до sentinel
+        for handler in _listener.handlers:
+            handler.flush()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def setup_logging():
+    """Неблокирующее логирование: очередь + QueueListener с пакетной записью в stdout."""
+    global _listener
+
+    log_level = logging.INFO
+
+    # JSON в проде, человекочитаемый формат в разработке
+    if settings.FASTAPI_ENV == "production":
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # Event loop только кладёт запись в очередь; stdout пишет поток QueueListener
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(_parse_sample_rates(settings.LOG_SAMPLE_RATES)))
+
+    stream_handler = BatchStreamHandler(log_queue, sys.stdout, batch_size=settings.LOG_BATCH_SIZE)
+    stream_handler.setFormatter(formatter)
+
+    _stop_listener()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+
+    # Configure root logger
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    return root_logger
@@ -0,0 +1,50 @@
+# catalog_service/utils/object_storage.py
+
+"""
+Минимальный S3-клиент для статического экспорта (services/static_export.py).
+
+aiobotocore импортируется лениво: без STATIC_EXPORT_BUCKET сервис работает и без пакета.
+Подходит любой S3-совместимый endpoint (Selectel, MinIO, moto_server в проверке).
+"""
+
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from core.config import settings
+
+
+class ObjectStorage:
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None):
+        self.bucket = bucket
+        self.config = {
+            "endpoint_url": endpoint_url or settings.S3_ENDPOINT_URL,
+            "aws_access_key_id": settings.S3_ACCESS_KEY,
+            "aws_secret_access_key": settings.S3_SECRET_KEY,
+            "region_name": settings.S3_REGION,
+        }
+
+    @asynccontextmanager
+    async def client(self):
+        from aiobotocore.session import get_session
+
+        async with get_session().create_client("s3", **self.config) as client:
+            yield client
+
+    async def put(
+        self, client, key: str, body: bytes, content_type: str,
+        cache_control: str, content_encoding: Optional[str] = None,
+    ) -> None:
+        extra = {"ContentEncoding": content_encoding} if content_encoding else {}
+        await client.put_object(
+            Bucket=self.bucket, Key=key, Body=body,
+            ContentType=content_type, CacheControl=cache_control, **extra,
+        )
+
+    async def get(self, client, key: str) -> Optional[bytes]:
+        """None — объекта нет."""
+        try:
+            res = await client.get_object(Bucket=self.bucket, Key=key)
+        except client.exceptions.NoSuchKey:
+            return None
+        async with res["Body"] as stream:
+            return await stream.read()
@@ -1,28 +1,182 @@
 #catalog_service/utils/rate_limit.py
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from utils.auth import get_current_user_id
+"""
+Rate limit поверх общего Redis (тот же клиент, что у кэша): один счётчик на все
+воркеры и реплики, переживает рестарт.
+
+- moving window: sorted set запросов за последние window секунд; решение — один
+  вызов Lua-скрипта (очистка старых, ZCARD, ZADD), время — Redis TIME, чтобы часы
+  воркеров не расходились;
+- отказ запоминается локально до retry_after: в moving window отклонённый запрос
+  не пишется, значит раньше самой старой записи окно не освободится — поток запросов
+  от уже заблокированного клиента отбивается без Redis;
+- лимит маршрута — аргумент декоратора, переопределяется RATE_LIMITS
+  ("buy_course=3/minute,course_page=120/minute", ключ — scope или имя функции);
+- Redis недоступен — fail-open.
+
+Проверка глобального лимита несколькими процессами — scripts/check_rate_limit.py.
+"""
+
+import functools
+import itertools
+import logging
+import math
+import os
+import re
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
 from fastapi.responses import JSONResponse
 
 from core.config import settings
+from utils.auth_context import get_auth_state
+from utils.cache import cache, PREFIX
+
+logger = logging.getLogger(__name__)
+
+LOCAL_BLOCK_MAX_KEYS = 10000
+
+# KEYS: ключ окна; ARGV: limit, window_ms, member
+# -> {allowed, remaining, retry_after_ms}
+_MOVING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count < limit then
+  redis.call('ZADD', KEYS[1], now, ARGV[3])
+  redis.call('PEXPIRE', KEYS[1], window)
+  return {1, limit - count - 1, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, 0, tonumber(oldest[2]) + window - now}
+"""
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_SPEC_RE = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+
+def parse_limit(spec: str) -> Tuple[int, int]:
+    """"3/minute", "30/2minute", "10 per hour" -> (limit, window_seconds)."""
+    m = _SPEC_RE.match(spec)
+    if not m:
+        raise ValueError(f"Bad rate limit: {spec!r}")
+    count, multiplier, unit = m.groups()
+    return int(count), int(multiplier or 1) * _UNITS[unit]
+
+
+def _parse_overrides(raw: str) -> Dict[str, str]:
+    overrides = {}
+    for part in (raw or "").split(","):
+        if "=" in part:
+            name, spec = part.split("=", 1)
+            overrides[name.strip()] = spec.strip()
+    return overrides
+
 
 def user_id_or_ip(request):
-    try:
-        return str(get_current_user_id(request))
-    except:
-        return get_remote_address(request)
-
-limiter = Limiter(
-    key_func=user_id_or_ip,
-    default_limits=[settings.GLOBAL_RATE_LIMIT],
-    headers_enabled=True,
-    storage_uri="memory://",
-    strategy="fixed-window"
-)
-
-async def custom_rate_limit_handler(request, exc):
+    # без повторного jwt.decode: middleware уже положил результат в request.state
+    auth = get_auth_state(request)
+    if auth.error is None:
+        return str(auth.user_id)
+    return request.client.host if request.client else "127.0.0.1"
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, scope: str, limit: int, window: int, retry_after: float):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    def __init__(self, key_func=user_id_or_ip):
+        self.key_func = key_func
+        self.overrides = _parse_overrides(settings.RATE_LIMITS)
+        self._blocked: Dict[str, float] = {}  # ключ -> monotonic, до которого отказываем локально
+        self._seq = itertools.count()
+        self._member_prefix = f"{os.getpid()}:{id(self):x}:"
+        self.stats = {"allowed": 0, "rejected": 0, "rejected_local": 0, "errors": 0}
+
+    def _remember_block(self, key: str, retry_after: float) -> None:
+        if len(self._blocked) >= LOCAL_BLOCK_MAX_KEYS:
+            now = time.monotonic()
+            self._blocked = {k: t for k, t in self._blocked.items() if t > now}
+            if len(self._blocked) >= LOCAL_BLOCK_MAX_KEYS:
+                self._blocked.clear()
+        self._blocked[key] = time.monotonic() + retry_after
+
+    async def hit(self, scope: str, identity: str, limit: int, window: int) -> Tuple[bool, int, float]:
+        """Одно решение: (allowed, remaining, retry_after_seconds)."""
+        key = f"{PREFIX}:ratelimit:{scope}:{identity}"
+
+        until = self._blocked.get(key)
+        if until is not None:
+            left = until - time.monotonic()
+            if left > 0:
+                self.stats["rejected_local"] += 1
+                return False, 0, left
+            del self._blocked[key]
+
+        if cache.client is None:
+            return True, limit, 0.0
+        member = f"{self._member_prefix}{next(self._seq)}"
+        try:
+            allowed, remaining, retry_ms = await cache.client.eval(
+                _MOVING_WINDOW_LUA, 1, key, limit, window * 1000, member
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning("Rate limit check failed for %s: %s", scope, e)
+            return True, limit, 0.0
+
+        if allowed:
+            self.stats["allowed"] += 1
+            return True, int(remaining), 0.0
+        retry_after = max(int(retry_ms), 1) / 1000
+        self.stats["rejected"] += 1
+        self._remember_block(key, retry_after)
+        return False, 0, retry_after
+
+    def limit(self, spec: str, scope: Optional[str] = None):
+        """Декоратор маршрута; функции нужен параметр request (и, для заголовков, response)."""
+
+        def decorator(func):
+            name = scope or func.__name__
+            limit, window = parse_limit(self.overrides.get(name, spec))
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                request: Request = kwargs["request"]
+                allowed, remaining, retry_after = await self.hit(name, self.key_func(request), limit, window)
+                if not allowed:
+                    raise RateLimitExceeded(name, limit, window, retry_after)
+                response = kwargs.get("response")
+                if response is not None:
+                    response.headers["X-RateLimit-Limit"] = str(limit)
+                    response.headers["X-RateLimit-Remaining"] = str(remaining)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+limiter = RateLimiter()
+
+
+async def custom_rate_limit_handler(request, exc: RateLimitExceeded):
+    retry_after = max(1, math.ceil(exc.retry_after))
     return JSONResponse(
         status_code=429,
-        content={"detail": "⛔ Слишком много запросов. Вы временно заблокированы на 6 минут."},
+        content={"detail": f"⛔ Слишком много запросов. Повторите через {retry_after} сек."},
+        headers={
+            "Retry-After": str(retry_after),
+            "X-RateLimit-Limit": str(exc.limit),
+            "X-RateLimit-Remaining": "0",
+        },
     )
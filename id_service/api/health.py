@@ -1,11 +1,14 @@
 # id_service/api/health.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from core.config import settings
 from db.session import get_async_session
 from utils.rate_limit import rate_limiter
+from utils.logging_config import get_logging_stats
+from utils.sql_stats import sql_metrics
 
 from fastapi.responses import JSONResponse
 
@@ -13,6 +16,15 @@ from fastapi.responses import JSONResponse
 router = APIRouter()
 
 
+def require_internal_token(request: Request) -> None:
+    """Bearer INTERNAL_TOKEN — as in the other services' internal endpoints"""
+    auth = request.headers.get("Authorization", "")
+    if not auth.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="missing bearer token")
+    if auth.split(" ", 1)[1] != settings.INTERNAL_TOKEN:
+        raise HTTPException(status_code=403, detail="forbidden")
+
+
 @router.get("/health")
 async def health():
     """Health check endpoint"""
@@ -47,4 +59,16 @@ async def readiness(session: AsyncSession = Depends(get_async_session)):
         return JSONResponse(
             {"status": "not_ready", "error": str(e)},
             status_code=503
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/metrics/sql", dependencies=[Depends(require_internal_token)])
+async def sql_metrics_snapshot():
+    """Per-route SQL aggregates collected by SqlStatsMiddleware"""
+    return sql_metrics.snapshot()
+
+
+@router.get("/metrics/logging")
+async def logging_metrics_snapshot():
+    """Log pipeline counters: records dropped on queue overflow and by sampling"""
+    return get_logging_stats()
@@ -21,6 +21,7 @@ class Settings(BaseSettings):
     PEPPER_SECRET: str = "dev-pepper"
     COOKIE_SECRET: str = "dev-cookie-secret"
     JWT_PRIVATE_KEY_PASSWORD: str = "dev-jwt-password"
+    INTERNAL_TOKEN: str = "change-me"  # служебные эндпоинты (/metrics/sql)
 
     # Token TTLs (seconds)
     ACCESS_TOKEN_TTL: int = 600
@@ -46,6 +47,14 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS_PER_MINUTE: int = 60
 
+    # Logging (очередь + фоновая запись)
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 256
+    LOG_SAMPLE_RATES: str = ""  # "logger.name=0.1,other=0.5"
+
+    # SQL на запрос: warning, если statement'ов больше порога
+    SQL_SLOW_STATEMENTS: int = 20
+
     # Password policy
     PASSWORD_MIN_LENGTH: int = 8
     PASSWORD_REQUIRE_UPPERCASE: bool = True
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from core.config import settings
+from utils.sql_stats import instrument_engine
 
 # Async SQLAlchemy engine
 engine: AsyncEngine = create_async_engine(
@@ -21,6 +22,7 @@ engine: AsyncEngine = create_async_engine(
     max_overflow=20,
     future=True,
 )
+instrument_engine(engine)
 
 # Session factory
 async_session_maker = async_sessionmaker(
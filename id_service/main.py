@@ -10,7 +10,8 @@
   (исключение: /auth/csrf).
 - AuthCacheHeadersMiddleware: на /auth/** и /oidc/** выставляем Cache-Control: no-store и Pragma: no-cache
   (исключения: discovery и jwks).
-Порядок middleware: SecurityHeaders → JSONContentType → CSRF → AuthCacheHeaders → CORS → TrustedHost(prod).
+- SqlStatsMiddleware: число SQL/время БД на запрос (заголовки X-DB-* в development, агрегаты на /metrics/sql).
+Порядок middleware: SecurityHeaders → JSONContentType → CSRF → AuthCacheHeaders → CORS → SqlStats → TrustedHost(prod).
 """
 
 import logging
@@ -31,6 +32,7 @@ from db.base import Base
 from services.jwk_service import jwk_service
 from services.backchannel_logout import backchannel_logout_service
 from utils import rate_limiter, setup_logging
+from utils.sql_stats import SqlStatsMiddleware
 
 # Routers
 from api.oidc import discovery, authorize, token, userinfo, logout, jwks, revoke
@@ -155,6 +157,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(SqlStatsMiddleware, expose_headers=settings.APP_ENV == "development")
 if settings.APP_ENV == "production":
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=["id.asynq.ru", "*.asynq.ru"])
 
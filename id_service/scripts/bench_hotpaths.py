@@ -0,0 +1,321 @@
+# id_service/scripts/bench_hotpaths.py
+
+"""
+Микробенчмарки горячих функций токен-пути с регрессионным гейтом.
+
+Меряем как pytest-benchmark: прогрев, затем rounds x iterations, по каждому замеру
+min/median/mean/p95/stddev и ops/s. Подготовка аргументов (setup) в замер не входит.
+
+Функции:
+  TokenService.create_tokens / verify_access_token / rotate_refresh_token,
+  SecurityService.verify_password / hash_otp / verify_code_challenge,
+  JWKService.get_jwks, RateLimiter.check_rate_limit.
+
+Нужны локальные Postgres и Redis из docker-compose и dev-сид
+(клиент teach-service, пользователь test@asynq.ru, активный JWK).
+Всё, что бенчмарки пишут в БД, откатывается; ключи лимитера живут одно окно.
+
+Запуск (из id_service):
+  PYTHONPATH=. python scripts/bench_hotpaths.py run --save baseline     # сохранить эталон
+  PYTHONPATH=. python scripts/bench_hotpaths.py run --save current
+  PYTHONPATH=. python scripts/bench_hotpaths.py compare baseline current --threshold 0.15
+Сравнение завершается с кодом 1, если median хоть одной функции вырос больше порога.
+Прогоны хранятся в .benchmarks/<name>.json.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import inspect
+import json
+import math
+import os
+import platform
+import secrets
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".benchmarks")
+SCOPE = "openid email profile offline_access"
+
+
+@dataclass
+class Bench:
+    name: str
+    fn: Callable[..., Any]  # fn(ctx, arg) — sync или async
+    setup: Optional[Callable[..., Awaitable[Any]]] = None  # на каждую итерацию, вне замера
+    rounds: int = 5
+    iterations: int = 200
+
+
+class Context:
+    """Общие объекты для бенчмарков: сессия, пользователь, клиент, заготовленные токены."""
+
+    async def open(self, args) -> None:
+        from sqlalchemy import select
+        from starlette.requests import Request
+
+        from core.security import security
+        from db.session import async_session_maker
+        from models import Client, User
+        from services.jwk_service import jwk_service
+        from services.token_service import token_service
+        from utils.rate_limit import rate_limiter
+
+        self.security = security
+        self.token_service = token_service
+        self.jwk_service = jwk_service
+        self.rate_limiter = rate_limiter
+        self.request_cls = Request
+
+        await jwk_service.ensure_active_key()
+        await rate_limiter.init()
+
+        self.session = async_session_maker()
+        self._user_query = select(User).where(User.email == args.user_email)
+        self._client_query = select(Client).where(Client.client_id == args.client_id)
+        await self.reload()
+
+        tokens = await self.new_tokens()
+        self.access_token = tokens["access_token"]
+        self.password = "Bench123!"
+        self.password_hash = security.hash_password(self.password)
+        self.code_verifier = secrets.token_urlsafe(48)
+        self.code_challenge = base64.urlsafe_b64encode(
+            hashlib.sha256(self.code_verifier.encode()).digest()
+        ).decode().rstrip("=")
+        self.counter = 0
+
+    async def reload(self) -> None:
+        # rollback экспайрит user/client — в async-сессии ленивая догрузка атрибутов невозможна
+        self.user = (await self.session.execute(self._user_query)).scalar_one()
+        self.client = (await self.session.execute(self._client_query)).scalar_one()
+
+    async def new_tokens(self) -> Dict[str, Any]:
+        return await self.token_service.create_tokens(
+            session=self.session, user=self.user, client=self.client, scope=SCOPE,
+            ip_address="127.0.0.1", user_agent="bench",
+        )
+
+    def request(self):
+        # новый «IP» на итерацию — иначе упрёмся в 429 после max_requests
+        self.counter += 1
+        n = self.counter
+        return self.request_cls({
+            "type": "http", "method": "POST", "path": "/api/auth/login-password",
+            "headers": [], "client": (f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}", 40000),
+        })
+
+    async def close(self) -> None:
+        await self.session.rollback()
+        await self.session.close()
+        await self.rate_limiter.close()
+
+
+# ---------------------------
+# Набор бенчмарков
+# ---------------------------
+
+async def _create_tokens(ctx: Context, _):
+    await ctx.new_tokens()
+
+
+async def _verify_access_token(ctx: Context, _):
+    assert await ctx.token_service.verify_access_token(ctx.access_token)
+
+
+async def _fresh_refresh_token(ctx: Context):
+    return (await ctx.new_tokens())["refresh_token"]
+
+
+async def _rotate_refresh_token(ctx: Context, refresh_token: str):
+    tokens, err = await ctx.token_service.rotate_refresh_token(
+        session=ctx.session, refresh_token=refresh_token, client_id=ctx.client.client_id,
+        ip_address="127.0.0.1", user_agent="bench",
+    )
+    assert err is None, err
+
+
+def _verify_password(ctx: Context, _):
+    assert ctx.security.verify_password(ctx.password, ctx.password_hash)
+
+
+def _hash_otp(ctx: Context, _):
+    ctx.security.hash_otp("1234")
+
+
+def _verify_code_challenge(ctx: Context, _):
+    assert ctx.security.verify_code_challenge(ctx.code_verifier, ctx.code_challenge)
+
+
+async def _get_jwks(ctx: Context, _):
+    await ctx.jwk_service.get_jwks()
+
+
+async def _new_request(ctx: Context):
+    return ctx.request()
+
+
+async def _check_rate_limit(ctx: Context, request):
+    await ctx.rate_limiter.check_rate_limit(request, "bench", max_requests=1000)
+
+
+BENCHMARKS: List[Bench] = [
+    Bench("create_tokens", _create_tokens, iterations=100),
+    Bench("verify_access_token", _verify_access_token),
+    Bench("rotate_refresh_token", _rotate_refresh_token, setup=_fresh_refresh_token, iterations=50),
+    Bench("verify_password", _verify_password, iterations=10),  # Argon2id: намеренно дорогой
+    Bench("hash_otp", _hash_otp, iterations=5000),
+    Bench("verify_code_challenge", _verify_code_challenge, iterations=5000),
+    Bench("get_jwks", _get_jwks),
+    Bench("check_rate_limit", _check_rate_limit, setup=_new_request),
+]
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+    median = statistics.median(ordered)
+    return {
+        "samples": len(ordered),
+        "min_us": round(ordered[0] * 1e6, 2),
+        "median_us": round(median * 1e6, 2),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 2),
+        "p95_us": round(p95 * 1e6, 2),
+        "stddev_us": round(statistics.pstdev(ordered) * 1e6, 2),
+        "ops": round(1 / median, 1) if median else 0.0,
+    }
+
+
+async def _measure(ctx: Context, bench: Bench, scale: float) -> Dict[str, float]:
+    is_async = inspect.iscoroutinefunction(bench.fn)
+    iterations = max(1, int(bench.iterations * scale))
+
+    async def once() -> float:
+        arg = await bench.setup(ctx) if bench.setup else None
+        start = time.perf_counter()
+        if is_async:
+            await bench.fn(ctx, arg)
+        else:
+            bench.fn(ctx, arg)
+        return time.perf_counter() - start
+
+    for _ in range(min(10, iterations)):  # прогрев
+        await once()
+
+    samples: List[float] = []
+    for _ in range(bench.rounds):
+        for _ in range(iterations):
+            samples.append(await once())
+        # не даём сессии разрастись: всё записанное за раунд откатываем
+        await ctx.session.rollback()
+        await ctx.reload()
+    return _stats(samples)
+
+
+async def run(args) -> dict:
+    selected = [b for b in BENCHMARKS if not args.only or b.name in args.only]
+    ctx = Context()
+    await ctx.open(args)
+    results = {}
+    try:
+        for bench in selected:
+            results[bench.name] = await _measure(ctx, bench, args.scale)
+            r = results[bench.name]
+            print(f"{bench.name:<24} median {r['median_us']:>12.1f}us  p95 {r['p95_us']:>12.1f}us  {r['ops']:>10.1f} ops/s")
+    finally:
+        await ctx.close()
+        from db.session import engine
+        await engine.dispose()
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": results,
+    }
+
+
+def _path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(BENCH_DIR, f"{name}.json")
+
+
+def _load(name: str) -> dict:
+    with open(_path(name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(args) -> int:
+    base = _load(args.baseline)["benchmarks"]
+    cur = _load(args.current)["benchmarks"]
+    overrides = dict(
+        (name, float(value)) for name, value in (item.split("=", 1) for item in args.threshold_for or [])
+    )
+    metric = f"{args.metric}_us"
+
+    failed = []
+    print(f"{'benchmark':<24}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name in sorted(set(base) | set(cur)):
+        if name not in base or name not in cur:
+            print(f"{name:<24}{'missing in ' + ('baseline' if name not in base else 'current'):>38}")
+            continue
+        b, c = base[name][metric], cur[name][metric]
+        change = (c - b) / b if b else 0.0
+        threshold = overrides.get(name, args.threshold)
+        mark = ""
+        if change > threshold:
+            failed.append(name)
+            mark = f"  REGRESSION (> {threshold:.0%})"
+        print(f"{name:<24}{b:>12.1f}us{c:>12.1f}us{change:>+10.1%}{mark}")
+
+    if failed:
+        print(f"regressed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="id_service hot-path microbenchmarks")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run")
+    r.add_argument("--save", help="имя прогона в .benchmarks/ (или путь к .json)")
+    r.add_argument("--only", nargs="*", help="запустить только эти бенчмарки")
+    r.add_argument("--scale", type=float, default=1.0, help="множитель числа итераций")
+    r.add_argument("--user-email", default="test@asynq.ru")
+    r.add_argument("--client-id", default="teach-service")
+
+    c = sub.add_parser("compare")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.15, help="допустимый рост, доля (0.15 = +15%%)")
+    c.add_argument("--threshold-for", nargs="*", help="переопределения name=0.3 для шумных функций")
+    c.add_argument("--metric", choices=("median", "min", "mean", "p95"), default="median")
+
+    args = p.parse_args(argv)
+    if args.cmd == "compare":
+        return compare(args)
+
+    result = asyncio.run(run(args))
+    if args.save:
+        path = _path(args.save)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+        print(f"saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,423 @@
+# id_service/scripts/loadtest_oidc.py
+
+"""
+Нагрузочный прогон полного OIDC-флоу против запущенного id_service.
+
+Один «флоу» = то, что делает SPA + RP при входе пользователя:
+  csrf -> authorize (302 на /login, pending в Redis) -> login_password (code в redirect_to)
+  -> token (authorization_code + PKCE S256) -> userinfo -> refresh (N ротаций refresh_token)
+
+Нагрузка открытая: флоу стартуют по пуассоновскому потоку с заданной интенсивностью,
+независимо от того, как быстро отвечает сервис; сверх --max-inflight новые флоу
+не ждут, а считаются отброшенными (shed).
+
+Итог: p50/p95/p99 по каждому шагу, доля ошибок, пропускная способность,
+JSON с отсортированными ключами (--out), чтобы прогоны можно было сравнивать diff'ом.
+
+Окружение (локально, не в проде):
+  - Postgres и Redis из docker-compose, APP_ENV=development (нужен сид-клиент teach-service);
+  - SMTP сервиса направлен в sink: SMTP_HOST=127.0.0.1 SMTP_PORT=8025 SMTP_TLS=false,
+    sink поднимает сам скрипт флагом --smtp-sink 127.0.0.1:8025 (нужен aiosmtpd);
+  - login ограничен 10 запросами в минуту на IP, поэтому каждому виртуальному пользователю
+    даём свой X-Forwarded-For, а uvicorn запускаем с --proxy-headers --forwarded-allow-ips='*'.
+
+Запуск (из id_service):
+  PYTHONPATH=. python scripts/loadtest_oidc.py --seed-users 200 --rate 20 --duration 60 \
+      --smtp-sink 127.0.0.1:8025 --out loadtest.json
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import secrets
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+STEPS = ("csrf", "authorize", "login_password", "token", "userinfo", "refresh")
+
+
+class StepFailed(Exception):
+    def __init__(self, step: str, reason: str):
+        super().__init__(f"{step}: {reason}")
+        self.step = step
+        self.reason = reason
+
+
+class Recorder:
+    """Латентности и ошибки по шагам; всё в памяти, считаем в конце прогона."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.flows = Counter()
+
+    def ok(self, step: str, seconds: float) -> None:
+        self.latencies[step].append(seconds)
+
+    def fail(self, step: str, seconds: float, reason: str) -> None:
+        self.latencies[step].append(seconds)
+        self.errors[step][reason] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        steps = {}
+        for step in STEPS:
+            samples = sorted(self.latencies.get(step, []))
+            errors = sum(self.errors[step].values())
+            steps[step] = {
+                "count": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+                "errors_by_reason": dict(sorted(self.errors[step].items())),
+                "p50_ms": _percentile_ms(samples, 50),
+                "p95_ms": _percentile_ms(samples, 95),
+                "p99_ms": _percentile_ms(samples, 99),
+                "max_ms": round(samples[-1] * 1000, 2) if samples else None,
+                "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            }
+        completed = self.flows["completed"]
+        return {
+            "flows": dict(sorted(self.flows.items())),
+            "flow_error_rate": round(self.flows["failed"] / max(1, completed + self.flows["failed"]), 4),
+            "flows_per_s": round(completed / elapsed, 2) if elapsed else 0.0,
+            "steps": steps,
+        }
+
+
+def _percentile_ms(samples: List[float], pct: int) -> Optional[float]:
+    # nearest-rank по уже отсортированной выборке
+    if not samples:
+        return None
+    rank = max(0, min(len(samples) - 1, math.ceil(pct / 100 * len(samples)) - 1))
+    return round(samples[rank] * 1000, 2)
+
+
+def _pkce_pair() -> Tuple[str, str]:
+    verifier = secrets.token_urlsafe(48)  # 64 символа, в пределах 43..128
+    challenge = base64.urlsafe_b64encode(hashlib.sha256(verifier.encode()).digest()).rstrip(b"=").decode()
+    return verifier, challenge
+
+
+class _NoCookiePolicy(DefaultCookiePolicy):
+    # общий клиент не должен копить cookie между флоу (иначе SSO-cookie сделает authorize «тихим»)
+    def set_ok(self, cookie, request):
+        return False
+
+
+class Flow:
+    """Один пользовательский вход; cookie передаём явно, соединения — из общего пула."""
+
+    def __init__(self, client: httpx.AsyncClient, args, recorder: Recorder, user: Tuple[str, str], ip: str):
+        self.client = client
+        self.args = args
+        self.rec = recorder
+        self.email, self.password = user
+        self.headers = {"X-Forwarded-For": ip, "User-Agent": "oidc-loadtest/1.0"}
+
+    async def _call(self, step: str, method: str, url: str, expect: int, **kwargs) -> httpx.Response:
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        start = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.rec.fail(step, time.perf_counter() - start, type(e).__name__)
+            raise StepFailed(step, type(e).__name__)
+        elapsed = time.perf_counter() - start
+        if resp.status_code != expect:
+            self.rec.fail(step, elapsed, f"http_{resp.status_code}")
+            raise StepFailed(step, f"http_{resp.status_code}")
+        self.rec.ok(step, elapsed)
+        return resp
+
+    async def run(self) -> None:
+        a = self.args
+        resp = await self._call("csrf", "GET", "/api/auth/csrf", 200)
+        csrf = resp.cookies.get("csrf_token") or resp.json()["csrf_token"]
+
+        verifier, challenge = _pkce_pair()
+        state = secrets.token_urlsafe(16)
+        resp = await self._call(
+            "authorize", "GET", "/authorize", 302,
+            params={
+                "client_id": a.client_id,
+                "response_type": "code",
+                "redirect_uri": a.redirect_uri,
+                "scope": a.scope,
+                "state": state,
+                "nonce": secrets.token_urlsafe(16),
+                "code_challenge": challenge,
+                "code_challenge_method": "S256",
+            },
+        )
+        # ошибки authorize — тоже 302, но на redirect_uri с ?error=; дальше идём только с /login
+        location = urlparse(resp.headers.get("location", ""))
+        if location.path.rstrip("/") != "/login":
+            reason = parse_qs(location.query).get("error", ["not_login"])[0]
+            self.rec.errors["authorize"][reason] += 1
+            raise StepFailed("authorize", reason)
+
+        resp = await self._call(
+            "login_password", "POST", "/api/auth/login-password", 200,
+            json={
+                "email": self.email,
+                "password": self.password,
+                "remember_me": False,
+                "client_id": a.client_id,
+                "state": state,
+            },
+            headers={"X-CSRF-Token": csrf, "Cookie": f"csrf_token={csrf}"},
+        )
+        redirect_to = resp.json().get("redirect_to") or ""
+        code = parse_qs(urlparse(redirect_to).query).get("code", [None])[0]
+        if not code:
+            self.rec.errors["login_password"]["no_code"] += 1
+            raise StepFailed("login_password", "no_code")
+
+        resp = await self._call(
+            "token", "POST", "/token", 200,
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": a.redirect_uri,
+                "client_id": a.client_id,
+                "code_verifier": verifier,
+            },
+        )
+        tokens = resp.json()
+
+        await self._call(
+            "userinfo", "GET", "/userinfo", 200,
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+
+        refresh_token = tokens.get("refresh_token")
+        for _ in range(a.refresh_rotations if refresh_token else 0):
+            resp = await self._call(
+                "refresh", "POST", "/token", 200,
+                data={"grant_type": "refresh_token", "refresh_token": refresh_token, "client_id": a.client_id},
+            )
+            refresh_token = resp.json().get("refresh_token")
+            if not refresh_token:
+                self.rec.errors["refresh"]["no_refresh_token"] += 1
+                raise StepFailed("refresh", "no_refresh_token")
+
+
+# ---------------------------
+# Пул пользователей
+# ---------------------------
+
+def _user_pool(args) -> List[Tuple[str, str]]:
+    if args.users_file:
+        pool = []
+        with open(args.users_file, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    email, password = line.split(":", 1)
+                    pool.append((email, password))
+        return pool
+    if args.seed_users:
+        return [(f"{args.user_prefix}{i}@loadtest.local", args.password) for i in range(args.seed_users)]
+    return [("test@asynq.ru", "Test123!")]
+
+
+async def seed_users(args) -> None:
+    """Создаёт пользователей пула напрямую в БД id_service (идемпотентно)."""
+    from sqlalchemy.dialects.postgresql import insert
+
+    from core.security import security
+    from db.session import async_session_maker, engine
+    from models import User
+
+    # Argon2id намеренно медленный — один хэш на весь пул (пароль общий)
+    password_hash = security.hash_password(args.password)
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "email": f"{args.user_prefix}{i}@loadtest.local",
+            "username": f"{args.user_prefix}{i}",
+            "password_hash": password_hash,
+            "email_verified": True,
+            "created_at": now,
+        }
+        for i in range(args.seed_users)
+    ]
+    async with async_session_maker() as session:
+        for start in range(0, len(rows), 1000):
+            stmt = insert(User).values(rows[start:start + 1000]).on_conflict_do_nothing()
+            await session.execute(stmt)
+        await session.commit()
+    await engine.dispose()
+    print(f"seeded {len(rows)} users ({args.user_prefix}N@loadtest.local)")
+
+
+# ---------------------------
+# SMTP sink
+# ---------------------------
+
+class _SinkHandler:
+    def __init__(self):
+        self.messages = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def start_smtp_sink(spec: str):
+    try:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.smtp import AuthResult
+    except ImportError:
+        raise SystemExit("--smtp-sink требует aiosmtpd: pip install aiosmtpd")
+
+    host, port = spec.rsplit(":", 1)
+    handler = _SinkHandler()
+    # email_service всегда делает login() — принимаем любые учётные данные
+    controller = Controller(
+        handler,
+        hostname=host,
+        port=int(port),
+        authenticator=lambda *a, **kw: AuthResult(success=True),
+        auth_require_tls=False,
+    )
+    controller.start()
+    return controller, handler
+
+
+# ---------------------------
+# Генератор нагрузки
+# ---------------------------
+
+async def run_load(args) -> dict:
+    pool = _user_pool(args)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    inflight = asyncio.Semaphore(args.max_inflight)
+    tasks = set()
+
+    async def one_flow(idx: int, client: httpx.AsyncClient):
+        user = pool[idx % len(pool)] if args.sequential_users else random.choice(pool)
+        # свой «IP» на пользователя, чтобы не упираться в per-IP лимит login
+        ip = f"10.{(idx >> 16) & 255}.{(idx >> 8) & 255}.{idx & 255}" if args.spoof_ip else "127.0.0.1"
+        try:
+            await Flow(client, args, recorder, user, ip).run()
+            recorder.flows["completed"] += 1
+        except StepFailed:
+            recorder.flows["failed"] += 1
+        finally:
+            inflight.release()
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=args.timeout,
+        limits=limits,
+        follow_redirects=False,
+        cookies=CookieJar(policy=_NoCookiePolicy()),
+    ) as client:
+        # прогрев: соединения и JWKS/ключи на стороне сервиса, в статистику не идёт
+        for i in range(min(args.warmup, len(pool))):
+            await Flow(client, args, Recorder(), pool[i], "10.255.255.254").run()
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        idx = 0
+        next_at = started
+        while True:
+            next_at += random.expovariate(args.rate)
+            if next_at >= deadline:
+                break
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            recorder.flows["started"] += 1
+            if inflight.locked():
+                recorder.flows["shed"] += 1
+                continue
+            await inflight.acquire()
+            task = asyncio.create_task(one_flow(idx, client))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            idx += 1
+
+        if tasks:
+            await asyncio.wait(tasks, timeout=args.timeout * (len(STEPS) + args.refresh_rotations))
+        elapsed = time.perf_counter() - started
+
+    result = recorder.summary(elapsed)
+    result["elapsed_s"] = round(elapsed, 2)
+    return result
+
+
+def _print_table(result: dict) -> None:
+    print(f"{'step':<16}{'count':>8}{'err%':>8}{'p50ms':>10}{'p95ms':>10}{'p99ms':>10}{'rps':>9}")
+    for step, s in result["steps"].items():
+        print(
+            f"{step:<16}{s['count']:>8}{s['error_rate'] * 100:>7.2f}%"
+            f"{s['p50_ms'] or 0:>10.1f}{s['p95_ms'] or 0:>10.1f}{s['p99_ms'] or 0:>10.1f}{s['throughput_rps']:>9.1f}"
+        )
+    print(f"flows: {result['flows']}  flows/s: {result['flows_per_s']}  elapsed: {result['elapsed_s']}s")
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="OIDC authorization-code + PKCE load test for id_service")
+    p.add_argument("--base-url", default="http://localhost:8000")
+    p.add_argument("--client-id", default="teach-service")
+    p.add_argument("--redirect-uri", default="http://localhost:3001/callback")
+    p.add_argument("--scope", default="openid email profile offline_access")
+    p.add_argument("--rate", type=float, default=10.0, help="новых флоу в секунду (пуассон)")
+    p.add_argument("--duration", type=float, default=30.0, help="секунд подачи нагрузки")
+    p.add_argument("--max-inflight", type=int, default=200, help="сверх этого флоу отбрасываются")
+    p.add_argument("--refresh-rotations", type=int, default=2)
+    p.add_argument("--timeout", type=float, default=10.0)
+    p.add_argument("--warmup", type=int, default=3, help="флоу до старта замеров")
+    p.add_argument("--seed-users", type=int, default=0, help="создать N пользователей в БД и гонять их")
+    p.add_argument("--user-prefix", default="lt")
+    p.add_argument("--password", default="Loadtest123!")
+    p.add_argument("--users-file", help="файл email:password по строке")
+    p.add_argument("--sequential-users", action="store_true", help="по кругу, а не случайно")
+    p.add_argument("--no-spoof-ip", dest="spoof_ip", action="store_false")
+    p.add_argument("--smtp-sink", help="host:port для локального aiosmtpd sink")
+    p.add_argument("--out", help="куда записать JSON с результатами")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    sink = None
+    if args.smtp_sink:
+        sink = start_smtp_sink(args.smtp_sink)
+    try:
+        if args.seed_users and not args.users_file:
+            asyncio.run(seed_users(args))
+        result = asyncio.run(run_load(args))
+    finally:
+        if sink:
+            sink[0].stop()
+
+    result["config"] = {
+        k: v for k, v in vars(args).items() if k not in ("password", "out")
+    }
+    result["finished_at"] = datetime.now(timezone.utc).isoformat()
+    if sink:
+        result["smtp_messages"] = sink[1].messages
+
+    _print_table(result)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, sort_keys=True, ensure_ascii=False)
+        print(f"results written to {args.out}")
+
+    return 1 if result["flows"].get("failed") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
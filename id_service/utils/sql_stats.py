@@ -0,0 +1,192 @@
+# id_service/utils/sql_stats.py
+
+"""
+Учёт SQL на запрос: число statement'ов, суммарное время в БД и строки.
+
+instrument_engine(engine) вешает before/after_cursor_execute на sync_engine;
+SqlStatsMiddleware заводит счётчик на запрос (ContextVar), в debug отдаёт его
+заголовками X-DB-Statements / X-DB-Time-Ms / X-DB-Rows, а в проде копит агрегаты
+по шаблонам маршрутов (sql_metrics, отдаются /metrics/sql под internal-токеном;
+запросы мимо роутов — одной строкой "<unmatched>") и пишет warning на запросы
+сверх SQL_SLOW_STATEMENTS.
+
+В тестах бюджет проверяется так:
+    with assert_sql_budget(3):
+        client.post("/token", data=form)
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SqlStats:
+    statements: int = 0
+    db_time: float = 0.0  # секунды
+    rows: int = 0
+    queries: Optional[List[str]] = None  # тексты — только для assert_sql_budget
+
+    def add(self, statement: str, elapsed: float, rows: int) -> None:
+        self.statements += 1
+        self.db_time += elapsed
+        self.rows += rows
+        if self.queries is not None:
+            self.queries.append(statement)
+
+
+_current: ContextVar[Optional[SqlStats]] = ContextVar("sql_stats", default=None)
+# активные assert_sql_budget: TestClient гоняет приложение в другом потоке, ContextVar туда не доходит
+_captures: List[SqlStats] = []
+
+
+def _rowcount(cursor) -> int:
+    rc = getattr(cursor, "rowcount", -1)
+    if rc is not None and rc >= 0:
+        return rc
+    # asyncpg-адаптер для SELECT отдаёт rowcount=-1, но уже держит строки в буфере
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if rows is not None else 0
+
+
+def instrument_engine(engine) -> None:
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.info.get("sql_stats"):
+        return
+    sync_engine.info["sql_stats"] = True
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_stats_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["sql_stats_start"].pop()
+        stats = _current.get()
+        if stats is None and not _captures:
+            return
+        rows = _rowcount(cursor)
+        if stats is not None:
+            stats.add(statement, elapsed, rows)
+        for capture in _captures:
+            capture.add(statement, elapsed, rows)
+
+
+class SqlMetrics:
+    """Агрегаты по маршрутам: запросы, statement'ы (сумма/максимум), время БД, строки."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, float]] = {}
+
+    def observe(self, route: str, stats: SqlStats) -> None:
+        with self._lock:
+            m = self._routes.setdefault(
+                route, {"requests": 0, "statements": 0, "statements_max": 0, "db_time_ms": 0.0, "rows": 0}
+            )
+            m["requests"] += 1
+            m["statements"] += stats.statements
+            m["statements_max"] = max(m["statements_max"], stats.statements)
+            m["db_time_ms"] += stats.db_time * 1000
+            m["rows"] += stats.rows
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            out = {}
+            for route, m in sorted(self._routes.items()):
+                n = m["requests"] or 1
+                out[route] = {
+                    **m,
+                    "db_time_ms": round(m["db_time_ms"], 2),
+                    "statements_avg": round(m["statements"] / n, 2),
+                    "db_time_ms_avg": round(m["db_time_ms"] / n, 2),
+                }
+            return out
+
+
+sql_metrics = SqlMetrics()
+
+
+UNMATCHED = "<unmatched>"
+_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+def _route_name(scope) -> str:
+    # ключ — только шаблон роута: сырой путь и метод приходят от клиента, таблица росла бы без предела
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return UNMATCHED
+    method = scope.get("method", "")
+    return f"{method if method in _METHODS else 'OTHER'} {path}"
+
+
+class SqlStatsMiddleware:
+    """Чистый ASGI: заголовки добавляем в http.response.start, агрегаты — после ответа."""
+
+    def __init__(self, app, expose_headers: bool = False):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = SqlStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            if self.expose_headers and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-db-statements", str(stats.statements).encode()),
+                    (b"x-db-time-ms", f"{stats.db_time * 1000:.2f}".encode()),
+                    (b"x-db-rows", str(stats.rows).encode()),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = _route_name(scope)
+            sql_metrics.observe(route, stats)
+            if stats.statements > settings.SQL_SLOW_STATEMENTS:
+                logger.warning(
+                    "SQL budget: %s issued %d statements (%.1f ms, %d rows)",
+                    route, stats.statements, stats.db_time * 1000, stats.rows,
+                )
+
+
+def get_sql_stats() -> Optional[SqlStats]:
+    return _current.get()
+
+
+@contextmanager
+def assert_sql_budget(max_statements: int, max_rows: Optional[int] = None):
+    """Падает AssertionError, если внутри блока выполнено больше max_statements запросов."""
+    capture = SqlStats(queries=[])
+    _captures.append(capture)
+    try:
+        yield capture
+    finally:
+        _captures.remove(capture)
+    problems = []
+    if capture.statements > max_statements:
+        problems.append(f"{capture.statements} statements > budget {max_statements}")
+    if max_rows is not None and capture.rows > max_rows:
+        problems.append(f"{capture.rows} rows > budget {max_rows}")
+    if problems:
+        listing = "\n".join(f"  {i + 1}. {q}" for i, q in enumerate(capture.queries))
+        raise AssertionError("; ".join(problems) + "\n" + listing)
@@ -1,8 +1,9 @@
 # learning_service/api/admin/blocks.py
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,19 +11,30 @@ from db.dependencies import get_db_session
 from db.tx import commit_or_rollback
 from models.block import Block
 from models.module import Module
-from schemas.block import BlockCreate, BlockSchema, BlockUpdate
+from schemas.block import BlockCreate, BlockListItemSchema, BlockSchema, BlockUpdate
+from utils.fields import columns_for, parse_fields
 
 router_modules = APIRouter(prefix="/modules")
 router_blocks = APIRouter(prefix="/blocks")
 
+BLOCK_LIST_FIELDS = tuple(BlockListItemSchema.model_fields)
+BLOCK_LIST_DEFAULT = tuple(f for f in BLOCK_LIST_FIELDS if f not in ("content", "video_preview"))
 
-@router_modules.get("/{module_id}/blocks/", response_model=List[BlockSchema])
-async def list_blocks(module_id: int, db: AsyncSession = Depends(get_db_session)):
+
+@router_modules.get("/{module_id}/blocks/", response_model=List[BlockListItemSchema])
+async def list_blocks(
+    module_id: int,
+    fields: Optional[str] = Query(None, description="поля через запятую; content — только если запрошен"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    selected = parse_fields(fields, BLOCK_LIST_FIELDS, BLOCK_LIST_DEFAULT)
     m = await db.execute(select(Module.id).where(Module.id == module_id))
     if not m.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Модуль не найден")
-    res = await db.execute(select(Block).where(Block.module_id == module_id).order_by(Block.order.asc()))
-    return res.scalars().all()
+    res = await db.execute(
+        select(*columns_for(Block, selected)).where(Block.module_id == module_id).order_by(Block.order.asc())
+    )
+    return JSONResponse([dict(row._mapping) for row in res])
 
 @router_modules.post("/{module_id}/blocks/", response_model=BlockSchema, status_code=status.HTTP_201_CREATED)
 async def create_block(module_id: int, data: BlockCreate, response: Response, db: AsyncSession = Depends(get_db_session)):
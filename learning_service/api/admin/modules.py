@@ -1,16 +1,18 @@
 # learning_service/api/admin/modules.py
 
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.dependencies import get_db_session
 from db.tx import commit_or_rollback
 from models.module import Module
-from schemas.module import ModuleCreate, ModuleSchema, ModuleUpdate
+from schemas.module import ModuleCreate, ModuleListItemSchema, ModuleSchema, ModuleUpdate
+from utils.fields import columns_for, parse_fields
 
 
 router_courses = APIRouter(prefix="/courses")
@@ -69,8 +71,19 @@ async def delete_module(module_id: int, db: AsyncSession = Depends(get_db_sessio
     await commit_or_rollback(db)
     return
 
-@router_courses.get("/{course_id}/modules/", response_model=List[ModuleSchema])
-async def list_course_modules(course_id: int, db: AsyncSession = Depends(get_db_session)):
+MODULE_LIST_FIELDS = tuple(ModuleListItemSchema.model_fields)
+MODULE_LIST_DEFAULT = tuple(f for f in MODULE_LIST_FIELDS if f != "completion_message")
+
+
+@router_courses.get("/{course_id}/modules/", response_model=List[ModuleListItemSchema])
+async def list_course_modules(
+    course_id: int,
+    fields: Optional[str] = Query(None, description="поля через запятую; completion_message — только если запрошен"),
+    db: AsyncSession = Depends(get_db_session),
+):
     # если в архитектуре курс живет в другом сервисе, можно не 404, но тогда явно это задокументируйте
-    res = await db.execute(select(Module).where(Module.course_id == course_id).order_by(Module.order.asc()))
-    return res.scalars().all()
+    selected = parse_fields(fields, MODULE_LIST_FIELDS, MODULE_LIST_DEFAULT)
+    res = await db.execute(
+        select(*columns_for(Module, selected)).where(Module.course_id == course_id).order_by(Module.order.asc())
+    )
+    return JSONResponse([dict(row._mapping) for row in res])
@@ -1,8 +1,24 @@
 # learning_service/api/health.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from core.logging import get_logging_stats
+from utils.admin_auth import AdminAuth
+from utils.sql_stats import sql_metrics
 
 router = APIRouter()
 
 @router.get("/health")
 async def health(): return {"ok": True}
+
+
+@router.get("/metrics/sql", dependencies=[Depends(AdminAuth())])
+async def sql_metrics_snapshot():
+    # агрегаты SqlStatsMiddleware по маршрутам, с момента старта процесса
+    return sql_metrics.snapshot()
+
+
+@router.get("/metrics/logging")
+async def logging_metrics_snapshot():
+    # очередь логов этого процесса: отброшено при переполнении и сэмплингом
+    return get_logging_stats()
@@ -0,0 +1,37 @@
+# learning_service/api/internal/progress.py
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.dependencies import get_db_session
+from models.module import Module
+from models.progress import UserModuleProgress
+from schemas.progress import CourseProgressSummary, ProgressBatchRequest, ProgressBatchResponse
+
+router = APIRouter(prefix="/progress")
+
+
+@router.post("/batch", response_model=ProgressBatchResponse, summary="Прогресс пользователя по многим курсам")
+async def progress_batch(data: ProgressBatchRequest, db: AsyncSession = Depends(get_db_session)):
+    """Один GROUP BY вместо GET /public/progress/courses/{id} на каждый курс (dashboard каталога)."""
+    courses = {cid: CourseProgressSummary(total_modules=0, completed_modules=0, progress_percent=0.0)
+               for cid in data.course_ids}
+    if not courses:
+        return ProgressBatchResponse(user_id=data.user_id, courses={})
+    res = await db.execute(
+        select(Module.course_id, func.count(Module.id), func.count(UserModuleProgress.id))
+        .outerjoin(
+            UserModuleProgress,
+            and_(UserModuleProgress.module_id == Module.id, UserModuleProgress.user_id == data.user_id),
+        )
+        .where(Module.course_id.in_(list(courses)))
+        .group_by(Module.course_id)
+    )
+    for course_id, total, completed in res.all():
+        courses[course_id] = CourseProgressSummary(
+            total_modules=total,
+            completed_modules=completed,
+            progress_percent=round(completed / total * 100, 2) if total else 0.0,
+        )
+    return ProgressBatchResponse(user_id=data.user_id, courses=courses)
@@ -1,9 +1,10 @@
 # learning_service/api/public/progress.py
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.internal.catalog import invalidate_dashboard
 from api.internal.points import award_points
 from db.dependencies import get_db_session
 from models.module import Module
@@ -50,7 +51,12 @@ async def get_course_progress(course_id: int, request: Request, db: AsyncSession
 
 
 @router.post("/modules/{module_id}/complete/", response_model=CompleteModuleResponse)
-async def complete_module(module_id: int, db: AsyncSession = Depends(get_db_session), user_id: int = Depends(get_current_user_id)):
+async def complete_module(
+    module_id: int,
+    background: BackgroundTasks,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: int = Depends(get_current_user_id),
+):
     m = (await db.execute(select(Module).where(Module.id == module_id))).scalar_one_or_none()
     if not m:
         raise HTTPException(status_code=404, detail="Модуль не найден")
@@ -77,5 +83,8 @@ async def complete_module(module_id: int, db: AsyncSession = Depends(get_db_sess
             awarded = m.sp_award
         except Exception:
             pass
+    if not already:
+        # после ответа: пользователь не ждёт каталог (как и points_service после начисления)
+        background.add_task(invalidate_dashboard, user_id)
 
     return CompleteModuleResponse(success=True, awarded_sp=awarded, already_completed=already, completion_message=m.completion_message)
\ No newline at end of file
@@ -6,8 +6,10 @@ class Settings(BaseSettings):
     FASTAPI_ENV: str = "development"
     DATABASE_URL: str
     JWT_SECRET_KEY: str = "fallback-dev-key"
+    AUTH_CACHE_SIZE: int = 4096
 
     POINTS_SERVICE_URL: str = "http://pointsservice:8003"
+    CATALOG_SERVICE_URL: str = "http://catalogservice:8001"
     INTERNAL_TOKEN: str = "change-me"
 
     POSTGRES_HOST: str = "db"
@@ -18,6 +20,12 @@ class Settings(BaseSettings):
 
     DEBUG: bool = True
 
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 256
+    LOG_SAMPLE_RATES: str = ""  # "logger.name=0.1,other=0.5"
+
+    SQL_SLOW_STATEMENTS: int = 20  # warning, если запрос сделал больше statement'ов
+
     class Config:
         env_file = ".env"
 
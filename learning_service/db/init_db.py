@@ -5,6 +5,7 @@ from urllib.parse import urlparse, urlunparse
 
 from core.base import Base
 from core.config import settings
+from utils.sql_stats import instrument_engine
 
 def get_async_pg_url(url: str) -> str:
     parsed = urlparse(url)
@@ -16,5 +17,6 @@ def get_async_pg_url(url: str) -> str:
 DATABASE_URL = get_async_pg_url(settings.DATABASE_URL)
 engine = create_async_engine(DATABASE_URL, echo=settings.DEBUG)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+instrument_engine(engine)
 
 # Миграции выполняет Alembic через init_db.sh. Здесь без create_all.
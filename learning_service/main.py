@@ -3,17 +3,23 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from core.errors import setup_error_handlers
+from core.logging import setup_logging
 
 from api.admin import modules as admin_modules, blocks as admin_blocks
 from api.public import courses as public_courses, progress as public_progress
+from api.internal import progress as internal_progress
 from api import health as health_api
 from utils.admin_auth import AdminAuth
+from utils.auth_context import AuthContextMiddleware
+from utils.sql_stats import SqlStatsMiddleware
+from core.config import settings
 
 # ⬇️ добавьте
 import os
 from core.base import Base
 from db.init_db import engine
 
+setup_logging()
 app = FastAPI(title="Learning Service")
 
 @app.on_event("startup")
@@ -29,6 +35,8 @@ app.add_middleware(
     allow_origins=["*"], allow_credentials=False,
     allow_methods=["*"], allow_headers=["*"],
 )
+app.add_middleware(AuthContextMiddleware)
+app.add_middleware(SqlStatsMiddleware, expose_headers=settings.DEBUG)
 
 deps = [Depends(AdminAuth())]
 app.include_router(admin_modules.router_courses, prefix="/v1/admin", tags=["Admin - Modules"], dependencies=deps)
@@ -38,4 +46,5 @@ app.include_router(admin_blocks.router_blocks,   prefix="/v1/admin", tags=["Admi
 
 app.include_router(public_courses.router,  prefix="/v1/public", tags=["Public - Courses/Modules"])
 app.include_router(public_progress.router, prefix="/v1/public", tags=["Public - Progress"])
+app.include_router(internal_progress.router, prefix="/v1/internal", tags=["Internal - Progress"], dependencies=deps)
 app.include_router(health_api.router, tags=["Health"])
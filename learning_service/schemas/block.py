@@ -39,4 +39,15 @@ class BlockSchema(BaseModel):
     order: int
     language: Optional[str]
     video_preview: Optional[str]
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class BlockListItemSchema(BaseModel):
+    """Строка списка блоков модуля: без content/video_preview (они — в GET /blocks/{id} или через ?fields=)."""
+    id: int
+    module_id: int
+    type: str
+    title: Optional[str] = None
+    order: int
+    language: Optional[str] = None
+    content: Optional[str] = None
+    video_preview: Optional[str] = None
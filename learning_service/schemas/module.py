@@ -30,6 +30,16 @@ class ModuleSchema(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class ModuleListItemSchema(BaseModel):
+    """Строка списка модулей курса: completion_message — только через ?fields= или GET /modules/{id}."""
+    id: int
+    course_id: int
+    title: str
+    group_title: Optional[str] = None
+    order: int
+    sp_award: int
+    completion_message: Optional[str] = None
+
 class GroupWithModules(BaseModel):
     group_title: Optional[str]
     modules: List[ModuleSchema]
@@ -1,7 +1,7 @@
 # learning_service/schemas/progress.py
 
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 
 class CourseProgressResponse(BaseModel):
     course_id: int
@@ -15,3 +15,16 @@ class CompleteModuleResponse(BaseModel):
     awarded_sp: int
     already_completed: bool
     completion_message: Optional[str] = None
+
+class ProgressBatchRequest(BaseModel):
+    user_id: int
+    course_ids: List[int] = Field(max_length=1000)
+
+class CourseProgressSummary(BaseModel):
+    total_modules: int
+    completed_modules: int
+    progress_percent: float
+
+class ProgressBatchResponse(BaseModel):
+    user_id: int
+    courses: Dict[int, CourseProgressSummary]  # курсы без модулей — с нулями
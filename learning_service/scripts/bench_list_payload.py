@@ -0,0 +1,108 @@
+# learning_service/scripts/bench_list_payload.py
+
+"""
+Админские списки блоков и модулей: байты ответа и время (SQL + сериализация) до и после проекций.
+
+blocks before:  GET /v1/admin/modules/{id}/blocks/ как было — select(Block), BlockSchema с content.
+blocks after:   list_blocks() — только колонки строки списка (без content/video_preview).
+blocks fields:  то же с ?fields=id,type,order (то, что рисует таблица блоков в админке).
+modules before/after/fields — то же для GET /v1/admin/courses/{id}/modules/.
+
+Берутся модуль с наибольшим объёмом content и курс с наибольшим числом модулей
+(или --module / --course). Печатается медиана по --rounds прогонам.
+
+Запуск: PYTHONPATH=. python scripts/bench_list_payload.py [--rounds 50] [--module ID] [--course ID]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+
+from api.admin.blocks import list_blocks
+from api.admin.modules import list_course_modules
+from db.init_db import async_session_maker, engine
+from models.block import Block
+from models.module import Module
+from schemas.block import BlockSchema
+from schemas.module import ModuleSchema
+
+
+async def _pick(args):
+    async with async_session_maker() as db:
+        module_id = args.module or (await db.execute(
+            select(Block.module_id).group_by(Block.module_id)
+            .order_by(func.sum(func.length(func.coalesce(Block.content, ""))).desc()).limit(1)
+        )).scalar()
+        course_id = args.course or (await db.execute(
+            select(Module.course_id).group_by(Module.course_id).order_by(func.count().desc()).limit(1)
+        )).scalar()
+    return module_id, course_id
+
+
+async def blocks_before(module_id: int) -> bytes:
+    async with async_session_maker() as db:
+        res = await db.execute(select(Block).where(Block.module_id == module_id).order_by(Block.order.asc()))
+        rows = [BlockSchema.model_validate(b) for b in res.scalars().all()]
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+async def blocks_after(module_id: int, fields=None) -> bytes:
+    async with async_session_maker() as db:
+        return (await list_blocks(module_id, fields=fields, db=db)).body
+
+
+async def modules_before(course_id: int) -> bytes:
+    async with async_session_maker() as db:
+        res = await db.execute(select(Module).where(Module.course_id == course_id).order_by(Module.order.asc()))
+        rows = [ModuleSchema.model_validate(m) for m in res.scalars().all()]
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+async def modules_after(course_id: int, fields=None) -> bytes:
+    async with async_session_maker() as db:
+        return (await list_course_modules(course_id, fields=fields, db=db)).body
+
+
+async def _measure(name: str, make, rounds: int) -> None:
+    times, size = [], 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = await make()
+        times.append(time.perf_counter() - start)
+        size = len(body)
+    print(f"{name:<15} {size:>10} B  {statistics.median(times) * 1000:8.2f} ms")
+
+
+async def main(args) -> None:
+    try:
+        module_id, course_id = await _pick(args)
+        if module_id is None or course_id is None:
+            print("нет модулей/блоков в learning_*")
+            return
+        print(f"модуль {module_id}, курс {course_id}")
+        cases = [
+            ("blocks before", lambda: blocks_before(module_id)),
+            ("blocks after", lambda: blocks_after(module_id)),
+            ("blocks fields", lambda: blocks_after(module_id, "id,type,order")),
+            ("modules before", lambda: modules_before(course_id)),
+            ("modules after", lambda: modules_after(course_id)),
+            ("modules fields", lambda: modules_after(course_id, "id,title,order,sp_award")),
+        ]
+        for name, make in cases:
+            await make()  # прогрев пула соединений
+            await _measure(name, make, args.rounds)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Проекции админских списков: байты и время")
+    p.add_argument("--rounds", type=int, default=50)
+    p.add_argument("--module", type=int, default=None)
+    p.add_argument("--course", type=int, default=None)
+    asyncio.run(main(p.parse_args()))
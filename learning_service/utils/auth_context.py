@@ -0,0 +1,107 @@
+# learning_service/utils/auth_context.py
+
+"""
+Разбор Authorization один раз на запрос.
+
+AuthContextMiddleware проверяет bearer-JWT до роутинга и кладёт результат
+в request.state.auth. get_current_user_id читает его оттуда, поэтому
+повторные зависимости в одном запросе не декодируют токен заново.
+Проверенные токены держим в ограниченном LRU по sha256 от токена до их exp.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+from jose import JWTError, jwt
+
+from core.config import settings
+
+ALGORITHM = "HS256"
+
+
+@dataclass(frozen=True)
+class AuthState:
+    user_id: Optional[int] = None
+    error: Optional[str] = None  # None | "missing" | "invalid"
+
+
+class TokenCache:
+    """LRU проверенных токенов: digest -> (payload, exp)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[bytes, Tuple[Dict[str, Any], Optional[float]]]" = OrderedDict()
+
+    def get(self, digest: bytes, now: float) -> Optional[Dict[str, Any]]:
+        item = self._data.get(digest)
+        if item is None:
+            return None
+        payload, exp = item
+        if exp is not None and exp <= now:
+            del self._data[digest]
+            return None
+        self._data.move_to_end(digest)
+        return payload
+
+    def put(self, digest: bytes, payload: Dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        self._data[digest] = (payload, float(exp) if exp is not None else None)
+        self._data.move_to_end(digest)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+token_cache = TokenCache(settings.AUTH_CACHE_SIZE)
+
+
+def resolve_auth(auth_header: Optional[str]) -> AuthState:
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return AuthState(error="missing")
+
+    token = auth_header.split(" ", 1)[1]
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest, time.time())
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return AuthState(error="invalid")
+        token_cache.put(digest, payload)
+    try:
+        return AuthState(user_id=int(payload["user_id"]))
+    except (KeyError, TypeError, ValueError):
+        return AuthState(error="invalid")
+
+
+def get_auth_state(request: Request) -> AuthState:
+    """Состояние из middleware; без middleware (скрипты, тесты) — разбираем на месте."""
+    state = request.scope.setdefault("state", {})
+    auth = state.get("auth")
+    if auth is None:
+        auth = resolve_auth(request.headers.get("Authorization"))
+        state["auth"] = auth
+    return auth
+
+
+class AuthContextMiddleware:
+    """Чистый ASGI: без BaseHTTPMiddleware, чтобы не оборачивать тело ответа."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            header = None
+            for key, value in scope["headers"]:
+                if key == b"authorization":
+                    header = value.decode("latin-1")
+                    break
+            scope.setdefault("state", {})["auth"] = resolve_auth(header)
+        await self.app(scope, receive, send)
@@ -1,22 +1,15 @@
 # learning_service/utils/catalog_client.py
 
 
-from jose import JWTError, jwt
 from fastapi import Request, HTTPException
 from starlette.status import HTTP_401_UNAUTHORIZED
 from typing import Optional
-from core.config import settings
-
-JWT_SECRET_KEY = settings.JWT_SECRET_KEY
-ALGORITHM = "HS256"
+from utils.auth_context import get_auth_state
 
 def get_current_user_id(request: Request) -> Optional[int]:
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
+    auth = get_auth_state(request)
+    if auth.error == "missing":
         raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Нет токена")
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("user_id")
-    except JWTError:
+    if auth.error:
         raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Недействительный токен")
+    return auth.user_id
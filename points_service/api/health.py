@@ -3,6 +3,8 @@
 """
 Публичный эндпоинт /health для проверки состояния сервиса.
 Проверяет доступность БД. Используется для liveness/readiness в оркестраторе.
+/metrics/sql — агрегаты SQL по маршрутам (SqlStatsMiddleware), только с INTERNAL_TOKEN.
+/metrics/logging — счётчики очереди логов (отброшено, сэмплинг).
 """
 
 import logging
@@ -11,6 +13,9 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.dependencies import get_db_session
+from utils.auth import InternalAuth
+from utils.logging_config import get_logging_stats
+from utils.sql_stats import sql_metrics
 
 log = logging.getLogger(__name__)
 router = APIRouter()
@@ -23,4 +28,12 @@ async def health(db: AsyncSession = Depends(get_db_session)):
     except Exception as e:
         log.exception("Health DB check failed")
         # краткий ответ без секретов
-        raise HTTPException(status_code=503, detail={"message": "db_unavailable"})
\ No newline at end of file
+        raise HTTPException(status_code=503, detail={"message": "db_unavailable"})
+
+@router.get("/metrics/sql", dependencies=[Depends(InternalAuth())])
+async def sql_metrics_snapshot():
+    return sql_metrics.snapshot()
+
+@router.get("/metrics/logging")
+async def logging_metrics_snapshot():
+    return get_logging_stats()
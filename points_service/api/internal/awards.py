@@ -6,7 +6,7 @@
 Используется: learning_service (за завершение модулей), другие сервисы.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
 
@@ -14,9 +14,10 @@ from db.dependencies import get_db_session
 from models.points import UserPoints, PointsTransaction
 from schemas.points import (
     InternalAwardRequest, InternalSpendRequest, InternalRefundRequest,
-    InternalMutationResponse, TransactionSchema
+    InternalMutationResponse, TransactionSchema, BalanceResponse
 )
 from utils.auth import InternalAuth
+from utils.catalog_client import invalidate_dashboard
 
 router = APIRouter(prefix="/points", dependencies=[Depends(InternalAuth())])
 
@@ -53,7 +54,7 @@ async def _get_tx_by_key(db, ik: str, user_id: int) -> PointsTransaction:
     return q.scalar_one()
 
 @router.post("/award", response_model=InternalMutationResponse)
-async def award_points(data: InternalAwardRequest, db: AsyncSession = Depends(get_db_session)):
+async def award_points(data: InternalAwardRequest, background: BackgroundTasks, db: AsyncSession = Depends(get_db_session)):
     async with db.begin():
         await _ensure_wallet(db, data.user_id)
         res = await db.execute(UPSERT_AWARD_REFUND, {
@@ -63,13 +64,14 @@ async def award_points(data: InternalAwardRequest, db: AsyncSession = Depends(ge
         })
         balance = int(res.scalar() or 0)
         tx = await _get_tx_by_key(db, data.idempotency_key)
+    background.add_task(invalidate_dashboard, data.user_id)
     return InternalMutationResponse(
         success=True, balance=balance,
         transaction=TransactionSchema.model_validate(tx, from_attributes=True)
     )
     
 @router.post("/spend", response_model=InternalMutationResponse)
-async def spend_points(data: InternalSpendRequest, db: AsyncSession = Depends(get_db_session)):
+async def spend_points(data: InternalSpendRequest, background: BackgroundTasks, db: AsyncSession = Depends(get_db_session)):
     async with db.begin():
         await _ensure_wallet(db, data.user_id)
 
@@ -109,13 +111,14 @@ async def spend_points(data: InternalSpendRequest, db: AsyncSession = Depends(ge
         # 5) Читаем вставленную транзакцию
         tx = await _get_tx_by_key(db, data.idempotency_key)
 
+    background.add_task(invalidate_dashboard, data.user_id)
     return InternalMutationResponse(
         success=True, balance=balance,
         transaction=TransactionSchema.model_validate(tx, from_attributes=True)
     )
     
 @router.post("/refund", response_model=InternalMutationResponse)
-async def refund_points(data: InternalRefundRequest, db: AsyncSession = Depends(get_db_session)):
+async def refund_points(data: InternalRefundRequest, background: BackgroundTasks, db: AsyncSession = Depends(get_db_session)):
     async with db.begin():
         await _ensure_wallet(db, data.user_id)
         res = await db.execute(UPSERT_AWARD_REFUND, {
@@ -125,7 +128,14 @@ async def refund_points(data: InternalRefundRequest, db: AsyncSession = Depends(
         })
         balance = int(res.scalar() or 0)
         tx = await _get_tx_by_key(db, data.idempotency_key)
+    background.add_task(invalidate_dashboard, data.user_id)
     return InternalMutationResponse(
         success=True, balance=balance,
         transaction=TransactionSchema.model_validate(tx, from_attributes=True)
-    )
\ No newline at end of file
+    )
+
+@router.get("/balance/{user_id}", response_model=BalanceResponse)
+async def get_user_balance(user_id: int, db: AsyncSession = Depends(get_db_session)):
+    """Баланс любого пользователя — для сервисов (dashboard каталога)."""
+    res = await db.execute(select(UserPoints.balance).where(UserPoints.user_id == user_id))
+    return BalanceResponse(balance=int(res.scalar() or 0))
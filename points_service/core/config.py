@@ -14,12 +14,21 @@ class Settings(BaseSettings):
 
     JWT_SECRET_KEY: str = "dev-secret"
     JWT_ALGORITHM: str = "HS256"
+    AUTH_CACHE_SIZE: int = 4096
 
     INTERNAL_TOKEN: str = "change-me"
+    CATALOG_SERVICE_URL: str = "http://catalogservice:8001"  # сброс dashboard при изменении баланса
 
     DEBUG: bool = False
     CORS_ALLOW_ORIGINS: str = "*"  # comma-separated
 
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 256
+    # access-лог пишется на каждый запрос — по умолчанию оставляем 10% INFO-записей
+    LOG_SAMPLE_RATES: str = "utils.monitoring=0.1"
+
+    SQL_SLOW_STATEMENTS: int = 20  # warning, если запрос сделал больше statement'ов
+
     class Config:
         env_file = "points_service/.env"
 
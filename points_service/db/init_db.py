@@ -10,6 +10,7 @@ from urllib.parse import urlparse, urlunparse
 
 from core.config import settings
 from core.base import Base
+from utils.sql_stats import instrument_engine
 
 def get_async_pg_url(url: str) -> str:
     p = urlparse(url)
@@ -20,6 +21,7 @@ def get_async_pg_url(url: str) -> str:
 DATABASE_URL = get_async_pg_url(settings.DATABASE_URL)
 engine = create_async_engine(DATABASE_URL, echo=settings.DEBUG)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+instrument_engine(engine)
 
 async def init_db():
     from models import points as _points  # noqa
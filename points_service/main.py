@@ -19,11 +19,14 @@ from schemas.errors import ErrorResponse, ErrorBody
 from core.config import settings
 from db.init_db import init_db
 from utils.monitoring import log_requests
+from utils.logging_config import setup_logging
+from utils.auth_context import AuthContextMiddleware
+from utils.sql_stats import SqlStatsMiddleware
 from api import health as health_api
 from api.public import balance as public_balance
 from api.internal import awards as internal_awards
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+setup_logging()
 
 app = FastAPI(title="Points Service")
 
@@ -64,6 +67,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(AuthContextMiddleware)
+app.add_middleware(SqlStatsMiddleware, expose_headers=settings.DEBUG)
 
 app.include_router(public_balance.router, prefix="/v1/public", tags=["Public - Points"])
 app.include_router(internal_awards.router, prefix="/v1/internal", tags=["Internal - Points"])
@@ -8,22 +8,16 @@
 """
 
 from fastapi import Request, HTTPException
-from jose import jwt, JWTError
 from core.config import settings
+from utils.auth_context import get_auth_state
 
 def get_current_user_id(request: Request) -> int:
-    auth = request.headers.get("Authorization", "")
-    if not auth.startswith("Bearer "):
+    auth = get_auth_state(request)
+    if auth.error == "missing":
         raise HTTPException(status_code=401, detail="missing bearer token")
-    token = auth.split(" ", 1)[1]
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        uid = payload.get("user_id")
-        if uid is None:
-            raise ValueError
-        return int(uid)
-    except (JWTError, ValueError):
+    if auth.error:
         raise HTTPException(status_code=401, detail="invalid jwt")
+    return auth.user_id
 
 class InternalAuth:
     def __call__(self, request: Request):
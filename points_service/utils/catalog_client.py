@@ -0,0 +1,24 @@
+# points_service/utils/catalog_client.py
+
+"""
+Назначение: уведомления catalog_service об изменении баланса.
+Используется: internal-эндпоинтами начисления/списания (фоном, после ответа).
+"""
+
+import logging
+
+import httpx
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+async def invalidate_dashboard(user_id: int) -> None:
+    """Сбросить закэшированный dashboard пользователя в каталоге. Ошибки не пробрасывает."""
+    url = f"{settings.CATALOG_SERVICE_URL}/v1/internal/dashboard/invalidate"
+    headers = {"Authorization": f"Bearer {settings.INTERNAL_TOKEN}"}
+    try:
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            r = await client.post(url, json={"user_id": user_id}, headers=headers)
+            r.raise_for_status()
+    except Exception as e:
+        logger.warning("Dashboard invalidate failed for user %s: %s", user_id, e)